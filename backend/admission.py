@@ -0,0 +1,201 @@
+"""Admission control for crawling endpoints: per-client quotas and load shedding.
+
+Every crawl is charged to its client (the `X-API-Key` header, or the client
+IP) at a cost of sites x limit rows. Each client has a token bucket that
+refills at `client_rate` rows per second up to `client_burst`. A client whose
+bucket cannot pay is turned away with `429` and a `Retry-After` saying when it
+can. Admitted crawls then need one of `max_in_flight` process-wide slots. Up
+to `max_waiting` requests wait up to `max_wait` seconds for one; beyond that
+they are shed with `503` instead of piling up behind a saturated process.
+
+Buckets and slots are per worker process. Decisions are counted and exposed
+by `snapshot()` (served at `/debug/admission`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+CLIENT_RATE_ENV = "JOB_SCRAPER_CLIENT_RATE"
+CLIENT_BURST_ENV = "JOB_SCRAPER_CLIENT_BURST"
+MAX_IN_FLIGHT_ENV = "JOB_SCRAPER_MAX_IN_FLIGHT"
+MAX_WAITING_ENV = "JOB_SCRAPER_MAX_WAITING"
+
+# Rows per second; one full three-board search (600 rows) every 12 seconds.
+DEFAULT_CLIENT_RATE = 50.0
+# Five full three-board searches back to back.
+DEFAULT_CLIENT_BURST = 3000.0
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_MAX_WAITING = 32
+DEFAULT_MAX_WAIT = 10.0
+MAX_TRACKED_CLIENTS = 10_000
+
+ADMITTED = "admitted"
+QUEUED = "queued"
+REJECTED_QUOTA = "rejected_quota"
+SHED_QUEUE_FULL = "shed_queue_full"
+SHED_TIMEOUT = "shed_timeout"
+
+
+class AdmissionRejected(Exception):
+    """A request was turned away; `status_code` is 429 (quota) or 503 (overload)."""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+class AdmissionController:
+    """Per-client token buckets plus a bounded, shedding pool of crawl slots."""
+
+    def __init__(
+        self,
+        *,
+        client_rate: float = DEFAULT_CLIENT_RATE,
+        client_burst: float = DEFAULT_CLIENT_BURST,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_waiting: int = DEFAULT_MAX_WAITING,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.decisions: Counter[str] = Counter()
+        self.in_flight = 0
+        self.waiting = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    @classmethod
+    def from_env(cls) -> AdmissionController:
+        def number(name: str, default: float) -> float:
+            value = os.environ.get(name, "").strip()
+            return float(value) if value else default
+
+        return cls(
+            client_rate=number(CLIENT_RATE_ENV, DEFAULT_CLIENT_RATE),
+            client_burst=number(CLIENT_BURST_ENV, DEFAULT_CLIENT_BURST),
+            max_in_flight=int(number(MAX_IN_FLIGHT_ENV, DEFAULT_MAX_IN_FLIGHT)),
+            max_waiting=int(number(MAX_WAITING_ENV, DEFAULT_MAX_WAITING)),
+        )
+
+    def charge(self, client: str, cost: float) -> None:
+        """Take `cost` tokens from `client`'s bucket or raise a 429 rejection.
+
+        Costs above the burst are capped at it, so the largest requests are
+        still possible, just only with a full bucket.
+        """
+        cost = min(cost, self.client_burst)
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = _Bucket(self.client_burst, now)
+            while len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            elapsed = max(now - bucket.updated_at, 0.0)
+            bucket.tokens = min(self.client_burst, bucket.tokens + elapsed * self.client_rate)
+            bucket.updated_at = now
+        if bucket.tokens < cost:
+            self.decisions[REJECTED_QUOTA] += 1
+            retry_after = math.ceil((cost - bucket.tokens) / self.client_rate)
+            raise AdmissionRejected(429, max(retry_after, 1), "Client quota exhausted")
+        bucket.tokens -= cost
+
+    def refund(self, client: str, cost: float) -> None:
+        """Give back a charge whose request was shed before it ran."""
+        bucket = self._buckets.get(client)
+        if bucket is not None:
+            bucket.tokens = min(self.client_burst, bucket.tokens + min(cost, self.client_burst))
+
+    def check_capacity(self) -> None:
+        """Raise a 503 rejection now if a new request could not even queue."""
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            self.decisions[SHED_QUEUE_FULL] += 1
+            raise AdmissionRejected(503, math.ceil(self.max_wait), "Server is at capacity")
+
+    @asynccontextmanager
+    async def slot(self, *, wait_forever: bool = False) -> AsyncIterator[None]:
+        """Hold one in-flight slot, queueing for at most `max_wait` seconds.
+
+        `wait_forever` neither sheds nor times out; it is for work already
+        committed to, such as a batch whose response has started streaming
+        (call `check_capacity` before committing).
+        """
+        if self._slots.locked():
+            if not wait_forever:
+                self.check_capacity()
+            self.decisions[QUEUED] += 1
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                timeout = None if wait_forever else self.max_wait
+                await asyncio.wait_for(self._slots.acquire(), timeout)
+            except TimeoutError:
+                self.decisions[SHED_TIMEOUT] += 1
+                raise AdmissionRejected(
+                    503, math.ceil(self.max_wait), "Timed out waiting for capacity"
+                ) from None
+            finally:
+                self.waiting -= 1
+                waited = time.perf_counter() - started
+                self.queue_wait_total += waited
+                self.queue_wait_max = max(self.queue_wait_max, waited)
+        else:
+            await self._slots.acquire()
+        self.decisions[ADMITTED] += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    @asynccontextmanager
+    async def admit(self, client: str, cost: float) -> AsyncIterator[None]:
+        """Charge `client` and hold a slot; shed requests are refunded."""
+        self.charge(client, cost)
+        try:
+            async with self.slot():
+                yield
+        except AdmissionRejected:
+            self.refund(client, cost)
+            raise
+
+    def snapshot(self) -> dict[str, Any]:
+        queued = self.decisions[QUEUED]
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_waiting": self.max_waiting,
+            "tracked_clients": len(self._buckets),
+            "decisions": {
+                name: self.decisions[name]
+                for name in (ADMITTED, QUEUED, REJECTED_QUOTA, SHED_QUEUE_FULL, SHED_TIMEOUT)
+            },
+            "queue_wait_seconds": {
+                "mean": round(self.queue_wait_total / queued, 4) if queued else 0.0,
+                "max": round(self.queue_wait_max, 4),
+            },
+        }
@@ -0,0 +1,101 @@
+"""Peak RSS of large exports: list-based pipeline vs large-result mode.
+
+Each scenario runs in a fresh process against a synthetic scraper (no
+network), encodes CSV into a null sink and reports the process's peak RSS.
+The list pipeline grows with the limit; large-result mode should stay flat.
+
+    uv run python benchmarks/bench_large_export.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import resource
+import subprocess
+import sys
+from contextlib import aclosing
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+LIMITS = (1_000, 5_000, 10_000, 20_000)
+PAGE_SIZE = 100
+
+
+def _register_synthetic_scraper() -> None:
+    from scrapers import SCRAPER_REGISTRY, BaseJobScraper, JobRecord
+
+    class SyntheticScraper(BaseJobScraper):
+        def __init__(self, client):
+            super().__init__("synthetic", client)
+
+        async def stream(self, *, role, location, country, limit):
+            for page in range(2 * limit // PAGE_SIZE):
+                # Every other page repeats the previous one to exercise dedupe.
+                first = page // 2 * PAGE_SIZE
+                yield [
+                    JobRecord(
+                        title=f"{role} {index}",
+                        company=f"Company {index % 997}",
+                        location="Berlin, Germany",
+                        url=f"https://example.com/jobs/{index:08d}?utm_source=job-scraper&ref=search-results",
+                        source=self.site_name,
+                    )
+                    for index in range(first, first + PAGE_SIZE)
+                ]
+                await asyncio.sleep(0)
+
+    SCRAPER_REGISTRY.register("synthetic", SyntheticScraper)
+
+
+async def _list_pipeline(limit: int) -> int:
+    import exporters
+    from job_scraper_manager import JobScraperManager
+    from main import _frame_from_records
+
+    manager = JobScraperManager("germany")
+    records, _ = await manager.scrape_jobs(role="analyst", sites=["synthetic"], location=None, limit=limit)
+    frame = _frame_from_records([record.to_dict() for record in records], limit)
+    return sum(len(chunk) for chunk in exporters.encode("csv", frame.to_dict(orient="records")))
+
+
+async def _large_result_mode(limit: int) -> int:
+    import exporters
+    from job_scraper_manager import JobScraperManager
+    from large_results import SpillBuffer
+
+    manager = JobScraperManager("germany")
+    with SpillBuffer() as spill:
+        pages = manager.stream_jobs(role="analyst", sites=["synthetic"], location=None, limit=limit)
+        async with aclosing(pages):
+            async for page in pages:
+                spill.write(exporters.unique_rows(page, dedupe=False))
+        return sum(len(chunk) for chunk in exporters.encode("csv", spill.rows(), dedupe=False))
+
+
+def _child(mode: str, limit: int) -> None:
+    _register_synthetic_scraper()
+    import main  # noqa: F401  (imports pandas/FastAPI so both modes share a baseline)
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pipeline = _list_pipeline if mode == "list" else _large_result_mode
+    size = asyncio.run(pipeline(limit))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux.
+    print(f"{mode:>6} {limit:>7} {size / 1e6:>8.1f} {baseline / 1024:>9.1f} {peak / 1024:>8.1f} {(peak - baseline) / 1024:>7.1f}")
+
+
+def main() -> None:
+    print(f"{'mode':>6} {'limit':>7} {'csv MB':>8} {'base MiB':>9} {'peak MiB':>8} {'growth':>7}")
+    for mode in ("list", "large"):
+        for limit in LIMITS:
+            subprocess.run([sys.executable, __file__, mode, str(limit)], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        _child(sys.argv[1], int(sys.argv[2]))
+    else:
+        main()
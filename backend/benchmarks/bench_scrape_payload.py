@@ -0,0 +1,78 @@
+"""Payload size and encoding time of `/scrape` responses.
+
+Run from the backend directory:
+
+    uv run python benchmarks/bench_scrape_payload.py
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import response_encoding  # noqa: E402
+from main import ScrapeResponse, _frame_from_records  # noqa: E402
+from scrapers import JobRecord  # noqa: E402
+
+ROW_COUNTS = (60, 200)
+REPEAT = 50
+SOURCES = ("indeed", "linkedin", "glassdoor")
+
+
+def _records(count: int) -> list[JobRecord]:
+    return [
+        JobRecord(
+            title=f"Senior Data Scientist {index}",
+            company=f"Company {index % 37}",
+            location=("New York, NY", "Remote", "Austin, TX")[index % 3],
+            url=f"https://example.com/jobs/{index:06d}?utm_source=job-scraper&ref=search",
+            source=SOURCES[index % len(SOURCES)],
+        )
+        for index in range(count)
+    ]
+
+
+def _payload(count: int) -> ScrapeResponse:
+    frame = _frame_from_records(_records(count), count)
+    return ScrapeResponse(
+        country="usa",
+        role="data scientist",
+        location="New York",
+        sites=list(SOURCES),
+        dataframe={
+            "columns": list(frame.columns),
+            "rows": frame.to_dict(orient="records"),
+            "row_count": len(frame),
+        },
+        result_id="0" * 32,
+        total_rows=count,
+    )
+
+
+def _timed(func, *args) -> tuple[object, float]:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main() -> None:
+    print(f"encoders: {', '.join(response_encoding.ENCODERS)}")
+    print(f"{'rows':>5} {'encoding':>9} {'bytes':>8} {'ratio':>6} {'ms':>7}")
+    for count in ROW_COUNTS:
+        payload = _payload(count)
+        body, serialize_ms = _timed(lambda: payload.model_dump_json().encode())
+        print(f"{count:>5} {'identity':>9} {len(body):>8} {1.0:>6.2f} {serialize_ms:>7.3f}")
+        for name, encoder in response_encoding.ENCODERS.items():
+            compressed, compress_ms = _timed(encoder, body)
+            ratio = len(compressed) / len(body)
+            print(f"{count:>5} {name:>9} {len(compressed):>8} {ratio:>6.2f} {compress_ms:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
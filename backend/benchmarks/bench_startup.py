@@ -0,0 +1,99 @@
+"""Cold-start cost of an API worker: import time and baseline RSS.
+
+Each scenario runs in a fresh interpreter. `lazy` imports `main` as a worker
+does; `warm` additionally loads what `JOB_SCRAPER_WARMUP` preloads (pandas and
+every scraper module) without touching the network. The slowest imports come
+from `python -X importtime`.
+
+    uv run python benchmarks/bench_startup.py
+"""
+
+from __future__ import annotations
+
+import re
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+RUNS = 5
+TOP_IMPORTS = 15
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "bs4")
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _child(mode: str) -> None:
+    started = time.perf_counter()
+    import main  # noqa: F401
+
+    if mode == "warm":
+        import pandas  # noqa: F401
+
+        from scrapers import SCRAPER_REGISTRY
+
+        for site in SCRAPER_REGISTRY.names():
+            SCRAPER_REGISTRY.get(site)
+            if site == "linkedin":
+                import bs4  # noqa: F401
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is KiB on Linux.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    loaded = ",".join(module for module in HEAVY_MODULES if module in sys.modules) or "-"
+    print(f"{elapsed * 1000:.1f} {rss:.1f} {loaded}")
+
+
+def _scenario(mode: str) -> tuple[float, float, str]:
+    runs = []
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, __file__, mode],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        ).stdout.split()
+        runs.append((float(output[0]), float(output[1]), output[2]))
+    runs.sort()
+    return runs[len(runs) // 2]
+
+
+def _top_imports() -> list[tuple[int, str]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    ).stderr
+    # Modules imported directly by main (nested one level below it), with
+    # their cumulative microseconds.
+    entries = [
+        (int(match[2]), match[4])
+        for match in _IMPORTTIME.finditer(stderr)
+        if len(match[3]) == 3
+    ]
+    return sorted(entries, reverse=True)[:TOP_IMPORTS]
+
+
+def main() -> None:
+    print(f"{'mode':>6} {'import ms':>10} {'RSS MiB':>8}  heavy modules loaded")
+    for mode in ("lazy", "warm"):
+        elapsed, rss, loaded = _scenario(mode)
+        print(f"{mode:>6} {elapsed:>10.1f} {rss:>8.1f}  {loaded}")
+
+    print("\nSlowest imports of main (-X importtime, cumulative):")
+    for micros, module in _top_imports():
+        print(f"{micros / 1000:>10.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        _child(sys.argv[1])
+    else:
+        main()
@@ -0,0 +1,273 @@
+"""Country registry: aliases, ISO codes and per-country scraper configuration.
+
+Adding a country, or a board's regional domain, only means adding data to
+`COUNTRIES`. Everything derived from it (the alias index, request headers and
+scraper keyword arguments) is computed once when the registry is built.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+DEFAULT_COUNTRY = "usa"
+
+COUNTRIES: list[dict[str, Any]] = [
+    {
+        "key": "usa",
+        "name": "United States",
+        "iso_code": "US",
+        "aliases": ["us", "united states", "united states of america", "america"],
+        "locale": "en-US",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.com"},
+            "indeed": {
+                "domain": "www.indeed.com",
+                "api_country_code": "US",
+                "shard_locations": [
+                    "New York, NY",
+                    "San Francisco, CA",
+                    "Chicago, IL",
+                    "Austin, TX",
+                    "Seattle, WA",
+                    "Boston, MA",
+                ],
+            },
+        },
+    },
+    {
+        "key": "canada",
+        "name": "Canada",
+        "iso_code": "CA",
+        "aliases": ["can"],
+        "locale": "en-CA",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.ca"},
+            "indeed": {
+                "domain": "ca.indeed.com",
+                "api_country_code": "CA",
+                "shard_locations": [
+                    "Toronto, ON",
+                    "Vancouver, BC",
+                    "Montreal, QC",
+                    "Calgary, AB",
+                    "Ottawa, ON",
+                ],
+            },
+        },
+    },
+    {
+        "key": "uk",
+        "name": "United Kingdom",
+        "iso_code": "GB",
+        "aliases": ["united kingdom", "great britain", "britain", "england", "gbr"],
+        "locale": "en-GB",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.co.uk"},
+            "indeed": {
+                "domain": "uk.indeed.com",
+                "api_country_code": "UK",
+                "shard_locations": [
+                    "London",
+                    "Manchester",
+                    "Birmingham",
+                    "Edinburgh",
+                    "Bristol",
+                ],
+            },
+        },
+    },
+    {
+        "key": "germany",
+        "name": "Germany",
+        "iso_code": "DE",
+        "aliases": ["deutschland", "deu"],
+        "locale": "de-DE",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.de"},
+            "indeed": {
+                "domain": "de.indeed.com",
+                "api_country_code": "DE",
+                "shard_locations": [
+                    "Berlin",
+                    "München",
+                    "Hamburg",
+                    "Frankfurt am Main",
+                    "Köln",
+                ],
+            },
+        },
+    },
+    {
+        "key": "france",
+        "name": "France",
+        "iso_code": "FR",
+        "aliases": ["fra"],
+        "locale": "fr-FR",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.fr"},
+            "indeed": {
+                "domain": "fr.indeed.com",
+                "api_country_code": "FR",
+                "shard_locations": [
+                    "Paris",
+                    "Lyon",
+                    "Toulouse",
+                    "Marseille",
+                    "Lille",
+                ],
+            },
+        },
+    },
+    {
+        "key": "india",
+        "name": "India",
+        "iso_code": "IN",
+        "aliases": ["ind", "bharat"],
+        "locale": "en-IN",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.co.in"},
+            "indeed": {
+                "domain": "in.indeed.com",
+                "api_country_code": "IN",
+                "shard_locations": [
+                    "Bengaluru, Karnataka",
+                    "Mumbai, Maharashtra",
+                    "Hyderabad, Telangana",
+                    "Pune, Maharashtra",
+                    "Delhi",
+                ],
+            },
+        },
+    },
+    {
+        "key": "australia",
+        "name": "Australia",
+        "iso_code": "AU",
+        "aliases": ["aus"],
+        "locale": "en-AU",
+        "sites": {
+            "glassdoor": {"domain": "www.glassdoor.com.au"},
+            "indeed": {
+                "domain": "au.indeed.com",
+                "api_country_code": "AU",
+                "shard_locations": [
+                    "Sydney NSW",
+                    "Melbourne VIC",
+                    "Brisbane QLD",
+                    "Perth WA",
+                    "Adelaide SA",
+                ],
+            },
+        },
+    },
+]
+
+
+class UnknownCountryError(ValueError):
+    """Raised when a country name, alias or code is not in the registry."""
+
+
+@dataclass(frozen=True)
+class CountryProfile:
+    key: str
+    name: str
+    iso_code: str
+    aliases: tuple[str, ...]
+    locale: str
+    headers: Mapping[str, str] = field(repr=False)
+    site_options: Mapping[str, Mapping[str, Any]] = field(repr=False)
+    regional_sites: frozenset[str] = field(default=frozenset(), repr=False)
+
+    @property
+    def region_names(self) -> tuple[str, ...]:
+        """Every name a location could use to mean "anywhere in this country"."""
+        return (self.key, self.name, self.iso_code, *self.aliases)
+
+    def supports(self, site: str) -> bool:
+        # Boards configured per country somewhere (regional domains) need an
+        # entry here; boards no country configures work everywhere.
+        return site in self.site_options or site not in self.regional_sites
+
+    def scraper_options(self, site: str) -> dict[str, Any]:
+        """Keyword arguments for constructing `site`'s scraper in this country."""
+        return dict(self.site_options.get(site, {}))
+
+
+def normalize_country(value: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("U.S.A." -> "usa")."""
+    value = re.sub(r"[.\-_,']", "", value.lower())
+    return " ".join(value.split())
+
+
+def _accept_language(locale: str) -> str:
+    language = locale.split("-")[0]
+    if language == "en":
+        return f"{locale},en;q=0.9"
+    return f"{locale},{language};q=0.9,en;q=0.8"
+
+
+def _build_profile(entry: Mapping[str, Any], regional_sites: frozenset[str]) -> CountryProfile:
+    site_options = {
+        site: MappingProxyType(dict(options))
+        for site, options in entry.get("sites", {}).items()
+    }
+    return CountryProfile(
+        key=entry["key"],
+        name=entry["name"],
+        iso_code=entry["iso_code"].upper(),
+        aliases=tuple(entry.get("aliases", ())),
+        locale=entry["locale"],
+        headers=MappingProxyType(
+            {
+                "user-agent": USER_AGENT,
+                "accept-language": _accept_language(entry["locale"]),
+            }
+        ),
+        site_options=MappingProxyType(site_options),
+        regional_sites=regional_sites,
+    )
+
+
+class CountryRegistry:
+    """Resolves free-text country names, aliases and ISO codes to profiles."""
+
+    def __init__(self, entries: Iterable[Mapping[str, Any]], *, default: str = DEFAULT_COUNTRY):
+        entries = list(entries)
+        regional_sites = frozenset(site for entry in entries for site in entry.get("sites", {}))
+        self._profiles: dict[str, CountryProfile] = {}
+        self._index: dict[str, CountryProfile] = {}
+        for entry in entries:
+            profile = _build_profile(entry, regional_sites)
+            self._profiles[profile.key] = profile
+            for alias in (profile.key, profile.name, profile.iso_code, *profile.aliases):
+                self._index[normalize_country(alias)] = profile
+        self.default = self._profiles[default]
+
+    def resolve(self, value: str | None) -> CountryProfile:
+        """Return the profile for `value`; blank values resolve to the default."""
+        normalized = normalize_country(value or "")
+        if not normalized:
+            return self.default
+        try:
+            return self._index[normalized]
+        except KeyError:
+            raise UnknownCountryError(
+                f"Unsupported country '{value}'. Choose from {', '.join(self.names())}."
+            ) from None
+
+    def names(self) -> list[str]:
+        return [profile.name for profile in self._profiles.values()]
+
+    def __iter__(self):
+        return iter(self._profiles.values())
+
+
+COUNTRY_REGISTRY = CountryRegistry(COUNTRIES)
@@ -0,0 +1,176 @@
+"""Streaming CSV / Arrow IPC / Parquet encoders for scrape results.
+
+Rows are encoded in fixed-size chunks and each chunk is yielded as soon as it
+is written, so memory stays bounded by `chunk_size` rather than the number of
+rows. The column schema matches the DataFrame built by `_frame_from_records`.
+pyarrow is optional and only needed for the Arrow and Parquet formats.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import fields
+from typing import Any, Iterable, Iterator, Mapping
+
+from scrapers import JobRecord
+
+RESULT_COLUMNS = [field.name for field in fields(JobRecord)]
+DEDUPE_COLUMNS = ("title", "company", "url", "source")
+DEFAULT_CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportUnavailableError(RuntimeError):
+    """Raised when a format needs an optional dependency that is not installed."""
+
+
+def unique_rows(
+    records: Iterable[JobRecord | Mapping[str, Any]],
+    limit: int | None = None,
+    *,
+    dedupe: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """Yield result rows in schema order, dropping duplicates like `_frame_from_records`.
+
+    Pass `dedupe=False` for records that were already deduplicated upstream;
+    the exact seen-set here grows with the number of rows.
+    """
+    seen: set[tuple[Any, ...]] = set()
+    emitted = 0
+    for record in records:
+        if limit is not None and emitted >= limit:
+            return
+        row = record.to_dict() if isinstance(record, JobRecord) else record
+        if dedupe:
+            key = tuple(row.get(column) for column in DEDUPE_COLUMNS)
+            if key in seen:
+                continue
+            seen.add(key)
+        emitted += 1
+        yield {column: row.get(column) for column in RESULT_COLUMNS}
+
+
+def _chunks(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain.
+
+    `tell()` keeps counting across drains because the Parquet writer records
+    absolute offsets in its footer.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._pending.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ExportUnavailableError(
+            "Arrow and Parquet exports require pyarrow (install the 'export' extra)."
+        ) from None
+    return pyarrow
+
+
+def arrow_schema():
+    pa = _require_pyarrow()
+    return pa.schema([(column, pa.string()) for column in RESULT_COLUMNS])
+
+
+def iter_csv(rows: Iterable[dict[str, Any]], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RESULT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    for chunk in _chunks(rows, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+
+
+def iter_arrow(rows: Iterable[dict[str, Any]], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    pa = _require_pyarrow()
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for chunk in _chunks(rows, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(rows: Iterable[dict[str, Any]], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in _chunks(rows, chunk_size):
+            # One row group per chunk keeps the writer's buffers bounded.
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "csv": iter_csv,
+    "arrow": iter_arrow,
+    "parquet": iter_parquet,
+}
+
+
+def encode(
+    export_format: str,
+    records: Iterable[JobRecord | Mapping[str, Any]],
+    *,
+    limit: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dedupe: bool = True,
+) -> Iterator[bytes]:
+    """Return a byte-chunk iterator for `records` in `export_format`.
+
+    Optional dependencies are checked eagerly so callers can report a missing
+    pyarrow before any response bytes are sent.
+    """
+    if export_format != "csv":
+        _require_pyarrow()
+    chunks = ENCODERS[export_format](unique_rows(records, limit, dedupe=dedupe), chunk_size=chunk_size)
+    return (chunk for chunk in chunks if chunk)
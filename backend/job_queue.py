@@ -0,0 +1,337 @@
+"""Background scrape jobs: submit a search now, poll for its result later.
+
+`POST /scrape/jobs` only records the search and returns an id; a fixed pool of
+worker tasks runs queued jobs one at a time each, so a long crawl never holds
+an HTTP request open. Jobs and their results are stored in SQLite. Set
+`JOB_SCRAPER_JOBS_PATH` to keep them on disk (it defaults to the shared-state
+file when `JOB_SCRAPER_SHARED_STATE` is set): finished results then survive a
+restart and are visible to every worker process using the file. Finished jobs
+are deleted once their retention ends.
+
+Workers claim jobs from the table itself, so a job queued by any process is
+run by whichever worker is free first, even if the process that queued it has
+died. A running job records its owner and a heartbeat that the owner
+refreshes. Only a job whose owner has stopped heartbeating is claimed again,
+so a worker never re-runs jobs its siblings are still running. Every SQLite
+call runs in a thread, off the event loop. Without a file the store is
+in-memory and per process, which only suits one worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from shared_state import SharedState, initialize_wal
+
+JOBS_PATH_ENV = "JOB_SCRAPER_JOBS_PATH"
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUED = 100
+DEFAULT_RETENTION = 3600.0
+# A running job whose owner has not heartbeated for this long is abandoned.
+DEFAULT_LEASE = 60.0
+# How often idle workers look for jobs queued by other processes.
+DEFAULT_POLL_INTERVAL = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scrape_jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        params TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        expires_at REAL,
+        owner TEXT,
+        heartbeat REAL
+    );
+    CREATE INDEX IF NOT EXISTS scrape_jobs_status ON scrape_jobs (status, created_at);
+"""
+# Columns added after the table was first created, for existing job files.
+MIGRATIONS = {"owner": "TEXT", "heartbeat": "REAL"}
+
+COLUMNS = "id, status, params, result, error, created_at, started_at, finished_at, expires_at"
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """Raised by `submit` when `max_queued` jobs are already waiting."""
+
+
+@dataclass
+class ScrapeJob:
+    id: str
+    status: str
+    params: dict[str, Any]
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    expires_at: float | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    @classmethod
+    def _from_row(cls, row: tuple) -> ScrapeJob:
+        id, status, params, result, error, created_at, started_at, finished_at, expires_at = row
+        return cls(
+            id=id,
+            status=status,
+            params=json.loads(params),
+            result=json.loads(result) if result is not None else None,
+            error=error,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+            expires_at=expires_at,
+        )
+
+
+class ScrapeJobQueue:
+    """Bounded queue of scrape jobs run by a fixed pool of worker tasks.
+
+    `run` receives a job's params and returns its JSON-serializable result;
+    any exception it raises marks the job failed with the exception message.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[dict[str, Any]], Awaitable[dict[str, Any]]],
+        *,
+        path: str | os.PathLike[str] = ":memory:",
+        workers: int = DEFAULT_WORKERS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        retention: float = DEFAULT_RETENTION,
+        lease: float = DEFAULT_LEASE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.run = run
+        self.path = str(path)
+        self.workers = max(workers, 1)
+        self.max_queued = max_queued
+        self.retention = retention
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            initialize_wal(self._conn, SCHEMA)
+        else:
+            self._conn.executescript(SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(scrape_jobs)")}
+        for column, kind in MIGRATIONS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE scrape_jobs ADD COLUMN {column} {kind}")
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @classmethod
+    def from_env(
+        cls,
+        run: Callable[[dict[str, Any]], Awaitable[dict[str, Any]]],
+        *,
+        shared_state: SharedState | None = None,
+    ) -> ScrapeJobQueue:
+        path = os.environ.get(JOBS_PATH_ENV, "").strip()
+        if not path and shared_state is not None:
+            # Workers sharing state must also share jobs, or a poll landing
+            # on another worker would not find the job.
+            path = shared_state.path
+        return cls(run, path=path or ":memory:")
+
+    async def start(self) -> None:
+        """Start the workers; they also pick up jobs abandoned by a stopped owner."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self.purge)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        """Cancel the workers and hand their interrupted jobs back to the queue."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self._execute, (
+            "UPDATE scrape_jobs SET status = ?, started_at = NULL, owner = NULL"
+            " WHERE status = ? AND owner = ?"
+        ), (QUEUED, RUNNING, self.owner))
+        self._wakeup = None
+
+    async def submit(self, params: dict[str, Any]) -> ScrapeJob:
+        if self._wakeup is None:
+            raise RuntimeError("ScrapeJobQueue.start() has not been called")
+        job = ScrapeJob(id=uuid.uuid4().hex, status=QUEUED, params=params, created_at=time.time())
+        await asyncio.to_thread(self._insert, job)
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> ScrapeJob | None:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def depth(self) -> int:
+        """Jobs waiting for a worker, in every process sharing the store."""
+        return await asyncio.to_thread(self._depth)
+
+    def purge(self) -> int:
+        """Delete finished jobs whose retention has ended."""
+        return self._execute(
+            "DELETE FROM scrape_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _depth(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM scrape_jobs WHERE status = ?",
+                (QUEUED,),
+            ).fetchone()[0]
+
+    def _insert(self, job: ScrapeJob) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                depth = self._conn.execute(
+                    "SELECT COUNT(*) FROM scrape_jobs WHERE status = ?",
+                    (QUEUED,),
+                ).fetchone()[0]
+                if depth >= self.max_queued:
+                    raise QueueFullError(f"{depth} scrape jobs are already queued")
+                self._conn.execute(
+                    "INSERT INTO scrape_jobs (id, status, params, created_at) VALUES (?, ?, ?, ?)",
+                    (job.id, job.status, json.dumps(job.params), job.created_at),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _get(self, job_id: str) -> ScrapeJob | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {COLUMNS} FROM scrape_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = ScrapeJob._from_row(row)
+        if job.expires_at is not None and job.expires_at <= time.time():
+            return None
+        return job
+
+    def _claim(self) -> tuple[str, dict[str, Any]] | None:
+        """Take the oldest queued job, or one whose owner stopped heartbeating."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, params, status FROM scrape_jobs"
+                    " WHERE status = ? OR (status = ? AND (heartbeat IS NULL OR heartbeat < ?))"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now - self.lease),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE scrape_jobs SET status = ?, started_at = ?, owner = ?, heartbeat = ?"
+                        " WHERE id = ?",
+                        (RUNNING, now, self.owner, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        if row[2] == RUNNING:
+            logger.info(f"Reclaimed scrape job {row[0]} from a stopped worker")
+        return row[0], json.loads(row[1])
+
+    def _finish(self, job_id: str, result: str | None, error: str | None) -> None:
+        finished = time.time()
+        self._execute(
+            "UPDATE scrape_jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ?"
+            " WHERE id = ? AND owner = ?",
+            (
+                FAILED if error is not None else SUCCEEDED,
+                result,
+                error,
+                finished,
+                finished + self.retention,
+                job_id,
+                self.owner,
+            ),
+        )
+        self.purge()
+
+    async def _work(self) -> None:
+        assert self._wakeup is not None
+        wakeup = self._wakeup
+        while True:
+            # Cleared before looking, so a job submitted meanwhile is either
+            # claimed now or wakes this worker.
+            wakeup.clear()
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except sqlite3.Error:
+                logger.exception("Could not claim a scrape job")
+                claimed = None
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+                except TimeoutError:
+                    pass
+                continue
+            job_id, params = claimed
+            try:
+                await self._run_job(job_id, params)
+            except Exception:
+                logger.exception(f"Scrape job {job_id} could not be recorded")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            await asyncio.to_thread(
+                self._execute,
+                "UPDATE scrape_jobs SET heartbeat = ? WHERE status = ? AND owner = ?",
+                (time.time(), RUNNING, self.owner),
+            )
+
+    async def _run_job(self, job_id: str, params: dict[str, Any]) -> None:
+        result, error = None, None
+        try:
+            result = json.dumps(await self.run(params))
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+        await asyncio.to_thread(self._finish, job_id, result, error)
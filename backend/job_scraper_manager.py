@@ -1,79 +1,197 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Iterable
+import hashlib
+import heapq
+import json
+import time
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, nullcontext
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, ClassVar, Iterable, Mapping, Sequence
 
 import httpx
 
-from scrapers import GlassdoorScraper, IndeedScraper, JobRecord, LinkedInScraper
-
-REQUEST_HEADERS = {
-    "user-agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    ),
-    "accept-language": "en-US,en;q=0.9",
-}
-
-COUNTRY_CONFIG = {
-    "usa": {
-        "glassdoor_domain": "www.glassdoor.com",
-        "indeed_domain": "www.indeed.com",
-        "indeed_api_code": "US",
-    },
-    "united states": {
-        "glassdoor_domain": "www.glassdoor.com",
-        "indeed_domain": "www.indeed.com",
-        "indeed_api_code": "US",
-    },
-    "us": {
-        "glassdoor_domain": "www.glassdoor.com",
-        "indeed_domain": "www.indeed.com",
-        "indeed_api_code": "US",
-    },
-    "canada": {
-        "glassdoor_domain": "www.glassdoor.ca",
-        "indeed_domain": "ca.indeed.com",
-        "indeed_api_code": "CA",
-    },
-    "uk": {
-        "glassdoor_domain": "www.glassdoor.co.uk",
-        "indeed_domain": "uk.indeed.com",
-        "indeed_api_code": "UK",
-    },
-    "united kingdom": {
-        "glassdoor_domain": "www.glassdoor.co.uk",
-        "indeed_domain": "uk.indeed.com",
-        "indeed_api_code": "UK",
-    },
-    "germany": {
-        "glassdoor_domain": "www.glassdoor.de",
-        "indeed_domain": "de.indeed.com",
-        "indeed_api_code": "DE",
-    },
-    "india": {
-        "glassdoor_domain": "www.glassdoor.co.in",
-        "indeed_domain": "in.indeed.com",
-        "indeed_api_code": "IN",
-    },
-    "australia": {
-        "glassdoor_domain": "www.glassdoor.com.au",
-        "indeed_domain": "au.indeed.com",
-        "indeed_api_code": "AU",
-    },
-}
-
-DEFAULT_COUNTRY = "usa"
-SUPPORTED_SITES = ("linkedin", "indeed", "glassdoor")
+import profiling
+from countries import COUNTRY_REGISTRY, CountryProfile
+from large_results import BloomFilter
+from scrapers import NO_FILTERS, SCRAPER_REGISTRY, BaseJobScraper, JobRecord, SearchFilters, SearchQuery
+from search_cache import CachedSite, SearchCache
+from shared_state import SharedState
+
+# Snapshot used for request defaults; validation asks the registry directly
+# so scrapers registered later are accepted too.
+SUPPORTED_SITES = SCRAPER_REGISTRY.names()
+DEFAULT_BATCH_CONCURRENCY = 8
+# Boards return their most relevant (or newest) jobs first; JobRecord has no
+# posting date, so a board's own order stands in for recency. Its bonus halves
+# every BOARD_RANK_HALF_LIFE rows and is small next to the title match (0-1).
+BOARD_RANK_WEIGHT = 0.25
+BOARD_RANK_HALF_LIFE = 25
+
+
+@dataclass(frozen=True)
+class ScrapeQuery:
+    """One search in a `JobScraperManager.scrape_many` batch."""
+
+    country: str
+    role: str
+    location: str | None = None
+    limit: int = 60
+    sites: tuple[str, ...] = SUPPORTED_SITES
+    filters: SearchFilters = NO_FILTERS
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Connection pool shared by every per-request client.
+
+    Closing a client leaves the pool open; `JobScraperManager.close_pool`
+    closes it at shutdown.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+@dataclass
+class BatchResult:
+    index: int
+    query: ScrapeQuery
+    records: list[JobRecord] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    fetched_at: dict[str, float] = field(default_factory=dict)
+
+
+def plan_quotas(sites: Sequence[str], limit: int) -> dict[str, int]:
+    """Split `limit` rows evenly across `sites`, earlier sites taking the remainder."""
+    return dict(zip(sites, _split(limit, len(sites))))
+
+
+def relevance(query: SearchQuery, record: JobRecord, position: int) -> float:
+    """Score a record against the search: title match plus the board's ranking."""
+    return query.title_score(record.title) + BOARD_RANK_WEIGHT * 0.5 ** (position / BOARD_RANK_HALF_LIFE)
+
+
+def merge_ranked(
+    by_site: Mapping[str, Sequence[JobRecord]],
+    query: SearchQuery,
+    limit: int,
+) -> list[JobRecord]:
+    """The `limit` most relevant records across sites, best first.
+
+    Each site's records are scored and sorted. Every site keeps up to its
+    even share of `limit` (fairness: one board with strong titles cannot
+    crowd out the others); the slots sites cannot fill go to the best
+    remaining records of any site. The per-site lists are then k-way merged
+    by score.
+    """
+    ranked = {
+        site: sorted(
+            ((relevance(query, record, position), record) for position, record in enumerate(records)),
+            key=lambda item: -item[0],
+        )
+        for site, records in by_site.items()
+    }
+    taken = {
+        site: min(len(ranked[site]), share)
+        for site, share in plan_quotas(list(ranked), limit).items()
+    }
+    spare = limit - sum(taken.values())
+    # Heads of what each site has left, best first.
+    heads = [
+        (-items[taken[site]][0], order, site)
+        for order, (site, items) in enumerate(ranked.items())
+        if taken[site] < len(items)
+    ]
+    heapq.heapify(heads)
+    while spare > 0 and heads:
+        _, order, site = heapq.heappop(heads)
+        taken[site] += 1
+        spare -= 1
+        if taken[site] < len(ranked[site]):
+            heapq.heappush(heads, (-ranked[site][taken[site]][0], order, site))
+    merged = heapq.merge(
+        *(ranked[site][: taken[site]] for site in ranked),
+        key=lambda item: -item[0],
+    )
+    return [record for _, record in merged]
+
+
+def _split(total: int, parts: int) -> list[int]:
+    if parts <= 0:
+        return []
+    base, remainder = divmod(total, parts)
+    return [base + (1 if index < remainder else 0) for index in range(parts)]
+
+
+class _SiteRun:
+    """Per-site crawl state while the manager fills quotas."""
+
+    def __init__(self, site: str, scraper: BaseJobScraper, quota: int):
+        self.site = site
+        self.scraper = scraper
+        self.quota = quota
+        self.pages: AsyncIterator[list[JobRecord]] | None = None
+        self.records: list[JobRecord] = []
+        self.seen: set[tuple[str, str, str]] = set()
+        self.done = False
+        self.error: Exception | None = None
+        self.pages_pulled = 0
+
+    async def next_page(self) -> list[JobRecord]:
+        page_number = self.pages_pulled
+        self.pages_pulled += 1
+        with profiling.site_page(self.site, page_number):
+            return await anext(self.pages)
+
+    @property
+    def filled(self) -> bool:
+        return len(self.records) >= self.quota
+
+    def add(self, page: list[JobRecord]) -> None:
+        # Rows past the quota are kept: a later quota increase uses them before
+        # another page is requested, and `merge_ranked` may pick them over
+        # within-quota rows. `rows` trims them off for quota accounting.
+        for record in page:
+            key = self.scraper._dedupe_key(record)
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            self.records.append(record)
+
+    @property
+    def rows(self) -> list[JobRecord]:
+        return self.records[: self.quota]
 
 
 class JobScraperManager:
     """Coordinates LinkedIn/Indeed/Glassdoor scrapers for unified output."""
 
-    def __init__(self, country: str):
-        normalized = country.strip().lower()
-        self.country = normalized or DEFAULT_COUNTRY
-        self.country_config = COUNTRY_CONFIG.get(self.country, COUNTRY_CONFIG[DEFAULT_COUNTRY])
+    # Process-wide pool installed by `warm_up` or `use_proxies`; None means
+    # every client opens (and closes) its own connections.
+    _pool: ClassVar[_SharedTransport | None] = None
+
+    def __init__(
+        self,
+        country: str,
+        *,
+        shared_state: SharedState | None = None,
+        cache: SearchCache | None = None,
+    ):
+        # Raises UnknownCountryError rather than silently searching the USA.
+        self.profile: CountryProfile = COUNTRY_REGISTRY.resolve(country)
+        self.country = self.profile.key
+        self.shared_state = shared_state
+        if cache is None and shared_state is not None:
+            cache = SearchCache(shared_state=shared_state)
+        self.cache = cache
+        # When each site's rows in the last scrape_jobs() result were fetched.
+        self.fetched_at: dict[str, float] = {}
 
     async def scrape_jobs(
         self,
@@ -82,58 +200,516 @@ class JobScraperManager:
         sites: Iterable[str],
         location: str | None,
         limit: int,
+        filters: SearchFilters | None = None,
     ) -> tuple[list[JobRecord], dict[str, str]]:
-        async with httpx.AsyncClient(
-            timeout=30,  # Increased from 20 to 30 seconds
-            headers=REQUEST_HEADERS,
-            follow_redirects=True,
-        ) as client:
-            scrapers = self._build_scrapers(client)
-            selected_sites = [
-                site.lower().strip()
-                for site in sites
-                if site.lower().strip() in scrapers
+        sites = list(sites)
+        query = self.parse_query(role, location, filters)
+
+        async def scrape(sites: list[str], limit: int, runs: list[_SiteRun]):
+            return await self._crawl(query, sites, limit, runs=runs)
+
+        records, errors, self.fetched_at = await self._cached(query, sites, limit, scrape)
+        return records, errors
+
+    async def stream_jobs(
+        self,
+        *,
+        role: str,
+        sites: Iterable[str],
+        location: str | None,
+        limit: int,
+        errors: dict[str, str] | None = None,
+        filters: SearchFilters | None = None,
+    ) -> AsyncIterator[list[JobRecord]]:
+        """Yield deduplicated pages without retaining the result set.
+
+        Used for limits far beyond what fits comfortably in a list. Quotas are
+        planned and redistributed like `scrape_jobs`, but dedupe state is a
+        `BloomFilter` sized for `limit`, and rows past a site's quota are
+        dropped rather than kept for later. Site failures are written into
+        `errors`. Results bypass the shared cache.
+        """
+        sites = list(sites)
+        errors = {} if errors is None else errors
+        query = self.parse_query(role, location, filters)
+        async with self._open_client(self.shared_state, self.profile.headers) as client:
+            scrapers = self._build_scrapers(client, sites)
+            selected = self._select_sites(scrapers, sites, errors)
+            runs = [
+                _SiteRun(site, scrapers[site], quota)
+                for site, quota in plan_quotas(selected, limit).items()
             ]
+            emitted = {run.site: 0 for run in runs}
+            seen = BloomFilter(limit)
+            try:
+                while True:
+                    pending = [run for run in runs if not run.done and emitted[run.site] < run.quota]
+                    if pending:
+                        pages = await asyncio.gather(*(self._next_page(run, query) for run in pending))
+                        for run, page in zip(pending, pages):
+                            fresh = []
+                            with profiling.stage("dedupe"):
+                                for record in page:
+                                    if emitted[run.site] >= run.quota:
+                                        break
+                                    if seen.add((*run.scraper._dedupe_key(record), record.source)):
+                                        fresh.append(record)
+                                        emitted[run.site] += 1
+                            if fresh:
+                                yield fresh
+                        continue
+                    shortfall = limit - sum(emitted.values())
+                    live = [run for run in runs if not run.done]
+                    if shortfall <= 0 or not live:
+                        break
+                    for run, extra in zip(live, _split(shortfall, len(live))):
+                        run.quota += extra
+            finally:
+                await asyncio.gather(
+                    *(run.pages.aclose() for run in runs if run.pages is not None),
+                    return_exceptions=True,
+                )
+            for run in runs:
+                if run.error is not None:
+                    errors[run.site] = str(run.error)
+
+    def parse_query(
+        self,
+        role: str,
+        location: str | None,
+        filters: SearchFilters | None = None,
+    ) -> SearchQuery:
+        """Canonical form of a search in this country.
+
+        A location naming the country itself ("USA" in a USA search) is the
+        same search as no location.
+        """
+        return SearchQuery.parse(
+            role,
+            location,
+            self.country,
+            region_names=self.profile.region_names,
+            filters=filters,
+        )
+
+    @classmethod
+    async def scrape_many(
+        cls,
+        queries: Sequence[ScrapeQuery],
+        *,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        shared_state: SharedState | None = None,
+        cache: SearchCache | None = None,
+        slot: Callable[[], AbstractAsyncContextManager[None]] | None = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Run many searches over one client, yielding results as they complete.
+
+        Queries share a single connection pool and one client and scraper set
+        per country (sending that country's headers), so Glassdoor tokens and
+        location lookups are resolved once per batch.
+        `concurrency` bounds the number of scraper runs in flight across every
+        query and site; `slot`, if given, is entered around each query while it
+        runs (admission control counts each query as one crawl). Unknown
+        countries raise UnknownCountryError up front.
+        """
+        managers: dict[str, JobScraperManager] = {}
+        for query in queries:
+            manager = cls(query.country, shared_state=shared_state, cache=cache)
+            managers.setdefault(manager.country, manager)
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        async with AsyncExitStack() as stack:
+            clients = {
+                country: await stack.enter_async_context(
+                    cls._open_client(shared_state, manager.profile.headers)
+                )
+                for country, manager in managers.items()
+            }
+            scraper_sets: dict[str, dict] = {}
+
+            async def run(index: int, query: ScrapeQuery) -> BatchResult:
+                manager = managers[COUNTRY_REGISTRY.resolve(query.country).key]
+                sites = list(query.sites)
+                scrapers = scraper_sets.setdefault(manager.country, {})
+                missing = [site for site in sites if site not in scrapers]
+                scrapers.update(manager._build_scrapers(clients[manager.country], missing))
+                search = manager.parse_query(query.role, query.location, query.filters)
+                async with slot() if slot is not None else nullcontext():
+                    records, errors, fetched_at = await manager._cached(
+                        search,
+                        sites,
+                        query.limit,
+                        lambda sites, limit, runs: manager._run_sites(
+                            scrapers,
+                            search,
+                            sites,
+                            limit,
+                            semaphore=semaphore,
+                            runs=runs,
+                        ),
+                    )
+                return BatchResult(
+                    index=index,
+                    query=query,
+                    records=records,
+                    errors=errors,
+                    fetched_at=fetched_at,
+                )
+
             tasks = [
-                self._run_scraper(scrapers[site], role, location, limit)
-                for site in selected_sites
+                asyncio.create_task(run(index, query))
+                for index, query in enumerate(queries)
             ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    yield await completed
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
-        aggregated: list[JobRecord] = []
+    @classmethod
+    async def warm_up(
+        cls,
+        countries: Iterable[str],
+        *,
+        shared_state: SharedState | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> dict[str, str]:
+        """Prepare the process for its first searches in `countries`.
+
+        Imports every supported scraper, installs a connection pool shared by
+        all later clients, opens a connection to each board and prefetches
+        Glassdoor tokens. Returns failures as {"country:site": message};
+        warmup never raises for an unreachable board.
+        """
+        if cls._pool is None:
+            cls._pool = _SharedTransport(transport)
+        managers: dict[str, JobScraperManager] = {}
+        for country in countries:
+            manager = cls(country, shared_state=shared_state)
+            managers.setdefault(manager.country, manager)
         errors: dict[str, str] = {}
-        for site, result in zip(selected_sites, results):
-            if isinstance(result, Exception):
-                errors[site] = str(result)
-                continue
-            aggregated.extend(result)
-        return aggregated, errors
 
-    def _build_scrapers(self, client: httpx.AsyncClient):
-        config = self.country_config
+        async def warm(country: str, site: str, scraper: BaseJobScraper) -> None:
+            try:
+                await scraper.warm_up()
+            except Exception as exc:
+                errors[f"{country}:{site}"] = str(exc)
+
+        for country, manager in managers.items():
+            async with cls._open_client(shared_state, manager.profile.headers) as client:
+                scrapers = manager._build_scrapers(client, SCRAPER_REGISTRY.names())
+                await asyncio.gather(
+                    *(warm(country, site, scraper) for site, scraper in scrapers.items())
+                )
+        return errors
+
+    @classmethod
+    def use_proxies(cls, transport: httpx.AsyncBaseTransport) -> None:
+        """Send every later client's requests through `transport` (a proxy pool)."""
+        cls._pool = _SharedTransport(transport)
+
+    @classmethod
+    async def close_pool(cls) -> None:
+        pool, cls._pool = cls._pool, None
+        if pool is not None:
+            await pool.transport.aclose()
+
+    async def _cached(
+        self,
+        query: SearchQuery,
+        sites: list[str],
+        limit: int,
+        scrape: Callable[
+            [list[str], int, list[_SiteRun]],
+            Awaitable[tuple[list[JobRecord], dict[str, str]]],
+        ],
+    ) -> tuple[list[JobRecord], dict[str, str], dict[str, float]]:
+        """Answer from the search cache, crawling only the sites it cannot serve.
+
+        `scrape(sites, limit, runs)` crawls the sites this request has to wait
+        for: those never fetched or past the hard TTL. Sites past the soft TTL
+        are served as cached and re-crawled in the background. If the caller
+        is cancelled mid-crawl, the rows its sites had already fetched are
+        still cached (as partial entries). Returns records, errors and when
+        each site's rows were fetched.
+        """
+        sites = list(dict.fromkeys(site.lower().strip() for site in sites))
+        if self.cache is None:
+            records, errors = await scrape(sites, limit, [])
+            now = time.time()
+            by_site: dict[str, list[JobRecord]] = {site: [] for site in sites}
+            for record in records:
+                by_site.setdefault(record.source, []).append(record)
+            return merge_ranked(by_site, query, limit), errors, {site: now for site in sites}
+
+        key = self._cache_key(query, sites, limit)
+        cached = await self.cache.get(key)
+        crawled: list[str] = []
+        if any(site not in cached for site in sites):
+            # Only one search (in any worker) crawls a given key at a time;
+            # the others wait and then read its result from the cache.
+            async with self.cache.single_flight(key):
+                cached = await self.cache.get(key)
+                crawled = [site for site in sites if site not in cached]
+                if crawled:
+                    runs: list[_SiteRun] = []
+                    try:
+                        records, errors = await scrape(crawled, self._share(cached, sites, crawled, limit), runs)
+                    except asyncio.CancelledError:
+                        # Shielded: a cancel scope would interrupt a plain await here.
+                        await asyncio.shield(self.cache.put(key, self._from_runs(runs)))
+                        raise
+                    fresh = self._by_site(crawled, records, errors)
+                    await self.cache.put(key, fresh)
+                    cached = {**cached, **fresh}
+
+        stale = [
+            site
+            for site in sites
+            if site not in crawled and self.cache.stale(cached[site]) and self.profile.supports(site)
+        ]
+
+        async def refresh(stale: list[str]) -> dict[str, CachedSite]:
+            records, errors = await self._crawl(query, stale, self._share(cached, sites, stale, limit))
+            return self._by_site(stale, records, errors)
+
+        await self.cache.revalidate(key, stale, refresh)
+
+        with profiling.stage("merge"):
+            records = merge_ranked(
+                {site: [JobRecord(**item) for item in cached[site].records] for site in sites},
+                query,
+                limit,
+            )
+        errors = {site: cached[site].error for site in sites if cached[site].error is not None}
+        return records, errors, {site: cached[site].fetched_at for site in sites}
+
+    async def _crawl(
+        self,
+        query: SearchQuery,
+        sites: list[str],
+        limit: int,
+        *,
+        runs: list[_SiteRun] | None = None,
+    ) -> tuple[list[JobRecord], dict[str, str]]:
+        async with self._open_client(self.shared_state, self.profile.headers) as client:
+            return await self._run_sites(self._build_scrapers(client, sites), query, sites, limit, runs=runs)
+
+    @staticmethod
+    def _share(
+        cached: Mapping[str, CachedSite],
+        sites: list[str],
+        crawl: list[str],
+        limit: int,
+    ) -> int:
+        """Rows to ask `crawl` for: what the other cached sites leave of `limit`,
+        but at least the sites' even split of it."""
+        kept = sum(len(cached[site].records) for site in sites if site not in crawl and site in cached)
+        quotas = plan_quotas(sites, limit)
+        return max(limit - kept, sum(quotas.get(site, 0) for site in crawl), 1)
+
+    @staticmethod
+    def _by_site(
+        sites: list[str],
+        records: list[JobRecord],
+        errors: dict[str, str],
+    ) -> dict[str, CachedSite]:
+        now = time.time()
+        rows: dict[str, list[dict]] = {site: [] for site in sites}
+        for record in records:
+            rows.setdefault(record.source, []).append(record.to_dict())
         return {
-            "linkedin": LinkedInScraper(client),
-            "indeed": IndeedScraper(
-                client,
-                domain=config["indeed_domain"],
-                api_country_code=config["indeed_api_code"],
-            ),
-            "glassdoor": GlassdoorScraper(
-                client,
-                domain=config["glassdoor_domain"],
-            ),
+            site: CachedSite(records=rows[site], fetched_at=now, error=errors.get(site))
+            for site in sites
         }
 
-    async def _run_scraper(
+    @staticmethod
+    def _from_runs(runs: list[_SiteRun]) -> dict[str, CachedSite]:
+        """Cache entries for what an interrupted crawl's sites had fetched.
+
+        Sites that had not finished are marked partial; sites with nothing
+        to show are left out.
+        """
+        now = time.time()
+        return {
+            run.site: CachedSite(
+                records=[record.to_dict() for record in run.records],
+                fetched_at=now,
+                error=str(run.error) if run.error is not None else None,
+                partial=not (run.done or run.filled),
+            )
+            for run in runs
+            if run.records or run.done or run.filled
+        }
+
+    @staticmethod
+    def _cache_key(query: SearchQuery, sites: list[str], limit: int) -> str:
+        raw = json.dumps(
+            [
+                query.key,
+                sorted({site.lower().strip() for site in sites}),
+                limit,
+            ],
+        )
+        return "search:" + hashlib.sha256(raw.encode()).hexdigest()
+
+    @classmethod
+    def _open_client(
+        cls,
+        shared_state: SharedState | None,
+        headers: Mapping[str, str],
+    ) -> httpx.AsyncClient:
+        event_hooks = {"request": []}
+        if shared_state is not None:
+            async def throttle(request: httpx.Request) -> None:
+                await shared_state.throttle(request.url.host)
+
+            event_hooks["request"].append(throttle)
+        # Attaches per-request network tracing only while a profile is active.
+        event_hooks["request"].append(profiling.trace_request)
+        return httpx.AsyncClient(
+            timeout=30,  # Increased from 20 to 30 seconds
+            headers=dict(headers),
+            follow_redirects=True,
+            event_hooks=event_hooks,
+            transport=cls._pool,
+        )
+
+    async def _run_sites(
         self,
-        scraper,
-        role: str,
-        location: str | None,
+        scrapers: dict,
+        query: SearchQuery,
+        sites: list[str],
         limit: int,
-    ) -> list[JobRecord]:
-        return await scraper.fetch(
-            role=role,
-            location=location,
+        *,
+        semaphore: asyncio.Semaphore | None = None,
+        runs: list[_SiteRun] | None = None,
+    ) -> tuple[list[JobRecord], dict[str, str]]:
+        """Fill every site's quota, handing dry sites' shortfall to the others.
+
+        Returns every record fetched, including the rest of each site's last
+        page; `merge_ranked` picks the final rows. No page is requested once
+        the quotas are met, since the merge cannot use more rows than those.
+        `runs`, if given, receives the site runs as they are created, so a
+        caller that is cancelled can still see what was fetched. Cancellation
+        closes every site's page stream, and with it any in-flight request.
+        """
+        errors: dict[str, str] = {}
+        selected_sites = self._select_sites(scrapers, sites, errors)
+        runs = [] if runs is None else runs
+        runs.extend(
+            _SiteRun(site, scrapers[site], quota)
+            for site, quota in plan_quotas(selected_sites, limit).items()
+        )
+        try:
+            while True:
+                pending = [run for run in runs if not run.done and not run.filled]
+                if pending:
+                    await asyncio.gather(
+                        *(
+                            self._fill(run, query, semaphore=semaphore)
+                            for run in pending
+                        )
+                    )
+                    continue
+                # Every site has either met its quota or run dry; hand the
+                # shortfall of the dry ones to sites that still have pages.
+                shortfall = limit - sum(len(run.rows) for run in runs)
+                live = [run for run in runs if not run.done]
+                if shortfall <= 0 or not live:
+                    break
+                for run, extra in zip(live, _split(shortfall, len(live))):
+                    run.quota += extra
+        finally:
+            await asyncio.gather(
+                *(run.pages.aclose() for run in runs if run.pages is not None),
+                return_exceptions=True,
+            )
+
+        aggregated: list[JobRecord] = []
+        for run in runs:
+            if run.error is not None:
+                errors[run.site] = str(run.error)
+            aggregated.extend(run.records)
+        return aggregated, errors
+
+    def _select_sites(
+        self,
+        scrapers: dict,
+        sites: list[str],
+        errors: dict[str, str],
+    ) -> list[str]:
+        selected = []
+        for site in sites:
+            site = site.lower().strip()
+            if site in scrapers:
+                selected.append(site)
+            else:
+                errors[site] = f"{site} is not available in {self.profile.name}"
+        return selected
+
+    async def _fill(
+        self,
+        run: _SiteRun,
+        query: SearchQuery,
+        *,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Pull pages from one site until it meets its quota or runs dry."""
+        if semaphore is not None:
+            async with semaphore:
+                return await self._fill(run, query)
+        if run.pages is None:
+            run.pages = self._open_stream(run, query)
+        try:
+            while not run.filled:
+                page = await run.next_page()
+                with profiling.stage("dedupe"):
+                    run.add(page)
+        except StopAsyncIteration:
+            run.done = True
+        except Exception as exc:
+            run.error = exc
+            run.done = True
+
+    async def _next_page(self, run: _SiteRun, query: SearchQuery) -> list[JobRecord]:
+        """Pull one page from a site; an empty list once it is done."""
+        if run.pages is None:
+            run.pages = self._open_stream(run, query)
+        try:
+            return await run.next_page()
+        except StopAsyncIteration:
+            run.done = True
+        except Exception as exc:
+            run.error = exc
+            run.done = True
+        return []
+
+    def _open_stream(self, run: _SiteRun, query: SearchQuery) -> AsyncIterator[list[JobRecord]]:
+        # Scrapers receive the canonical text, which parses back to `query`.
+        # Filters are only passed when set, so scrapers without filter
+        # support still serve unfiltered searches.
+        extra = {"filters": query.filters} if query.filters else {}
+        return run.scraper.stream(
+            role=query.role,
+            location=query.location_text,
             country=self.country,
-            limit=limit,
+            limit=run.quota,
+            **extra,
         )
+
+    def _build_scrapers(
+        self,
+        client: httpx.AsyncClient,
+        sites: Iterable[str],
+    ) -> dict[str, BaseJobScraper]:
+        """Instantiate scrapers for the selected sites this country supports.
+
+        Scraper modules are imported here, on first use, via the registry.
+        """
+        return {
+            site: SCRAPER_REGISTRY.get(site)(client, **self.profile.scraper_options(site))
+            for site in dict.fromkeys(site.lower().strip() for site in sites)
+            if site in SCRAPER_REGISTRY and self.profile.supports(site)
+        }
@@ -0,0 +1,99 @@
+"""Memory-bounded building blocks for very large result limits.
+
+Large exports never hold the result set in a list or DataFrame. Records are
+deduplicated against a `BloomFilter` sized for the requested limit, so the
+dedupe state is a fixed-size bit array instead of a growing set of tuples.
+They are then appended to a `SpillBuffer`, which keeps small results in memory
+and moves to a temporary file once it grows. The buffer is read back row by
+row by the streaming encoders in `exporters`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import tempfile
+from typing import Any, Iterable, Iterator, Sequence
+
+DEFAULT_ERROR_RATE = 1e-4
+SPILL_THRESHOLD = 1 << 20
+
+
+class BloomFilter:
+    """Probabilistic set of keys with a fixed memory footprint.
+
+    `add` never reports a new key as seen twice, but with probability
+    `error_rate` (at `capacity` keys) reports an unseen key as seen, which
+    drops that row.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: Sequence[Any]) -> Iterator[int]:
+        digest = hashlib.blake2b(
+            json.dumps(key, default=str).encode(),
+            digest_size=16,
+        ).digest()
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, key: Sequence[Any]) -> bool:
+        """Record `key`; returns False if it was (probably) already present."""
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        return added
+
+    def __contains__(self, key: Sequence[Any]) -> bool:
+        return all(
+            self._bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(key)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class SpillBuffer:
+    """Append-only row buffer that spills to a temporary file once it grows."""
+
+    def __init__(self, *, threshold: int = SPILL_THRESHOLD):
+        self._file = tempfile.SpooledTemporaryFile(max_size=threshold, mode="w+b")
+        self._count = 0
+
+    def write(self, rows: Iterable[dict[str, Any]]) -> None:
+        for row in rows:
+            self._file.write(json.dumps(row, separators=(",", ":")).encode())
+            self._file.write(b"\n")
+            self._count += 1
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        """Read every row back in write order, one line at a time."""
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> SpillBuffer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,184 @@
+"""Live job feeds: one shared poller per search, fanned out to its subscribers.
+
+`/scrape/subscribe` streams a search as server-sent events. Subscribers to the
+same canonical search (same `SearchQuery.key`, sites and limit) share one
+`Feed`, whose single task re-runs the search every `interval` seconds and
+pushes only jobs it has not seen before to every subscriber. A new subscriber
+first gets the feed's latest result set. The poller stops as soon as the last
+subscriber leaves.
+
+Polls go through the regular scrape path, so they are served from the search
+cache while it is fresh and coalesced with /scrape calls for the same search.
+Feeds are per worker process. A subscriber that falls `SUBSCRIBER_BACKLOG`
+events behind is dropped; its stream ends and it can reconnect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal
+
+import profiling
+from exporters import DEDUPE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+FEED_INTERVAL_ENV = "JOB_SCRAPER_FEED_INTERVAL"
+# Matches the search cache's default soft TTL, so every poll can find new jobs.
+DEFAULT_FEED_INTERVAL = 300.0
+MIN_FEED_INTERVAL = 10.0
+# Jobs remembered per feed to tell new ones apart; the oldest are forgotten.
+MAX_SEEN_JOBS = 10_000
+SUBSCRIBER_BACKLOG = 32
+
+Poll = Callable[[], Awaitable[tuple[list[dict[str, Any]], dict[str, str]]]]
+
+
+@dataclass
+class FeedEvent:
+    """`jobs` carries newly seen rows (the latest result set for a new
+    subscriber); `error` carries the per-site errors of a poll.
+    """
+
+    kind: Literal["jobs", "error"]
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+class Subscription:
+    """One subscriber's stream of events from a feed."""
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[FeedEvent | None] = asyncio.Queue()
+
+    def push(self, event: FeedEvent) -> bool:
+        """Queue `event`; False (and the stream ends) if this subscriber fell behind."""
+        if self._queue.qsize() >= SUBSCRIBER_BACKLOG:
+            self.end()
+            return False
+        self._queue.put_nowait(event)
+        return True
+
+    def end(self) -> None:
+        self._queue.put_nowait(None)
+
+    async def events(self, *, idle: float | None = None) -> AsyncIterator[FeedEvent | None]:
+        """Yield events until the stream ends, and None after `idle` quiet seconds."""
+        while True:
+            try:
+                event = await asyncio.wait_for(self._queue.get(), idle)
+            except TimeoutError:
+                yield None
+                continue
+            if event is None:
+                return
+            yield event
+
+
+class Feed:
+    """The poller and subscribers of one search."""
+
+    def __init__(self, key: str, poll: Poll, interval: float):
+        self.key = key
+        self.poll = poll
+        self.interval = interval
+        self.subscribers: set[Subscription] = set()
+        self.latest: list[dict[str, Any]] = []
+        self.polls = 0
+        self._seen: OrderedDict[tuple[Any, ...], None] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        # Started by the first subscriber's request, but outlives it.
+        self._task = asyncio.create_task(self._run(), context=profiling.detached_context())
+
+    def stop(self) -> asyncio.Task[None] | None:
+        """Cancel the poller (returned, to await if needed) and end every stream."""
+        if self._task is not None:
+            self._task.cancel()
+        for subscriber in list(self.subscribers):
+            subscriber.end()
+        return self._task
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                rows, errors = await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Feed poll failed for {self.key}: {exc}")
+                rows, errors = [], {"feed": str(exc)}
+            else:
+                self.latest = rows
+            self.polls += 1
+            new_rows = self._unseen(rows)
+            if new_rows:
+                self._publish(FeedEvent("jobs", rows=new_rows))
+            if errors:
+                self._publish(FeedEvent("error", errors=errors))
+            await asyncio.sleep(self.interval)
+
+    def _unseen(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        new_rows = []
+        for row in rows:
+            key = tuple(row.get(column) for column in DEDUPE_COLUMNS)
+            if key in self._seen:
+                continue
+            self._seen[key] = None
+            new_rows.append(row)
+        while len(self._seen) > MAX_SEEN_JOBS:
+            self._seen.popitem(last=False)
+        return new_rows
+
+    def _publish(self, event: FeedEvent) -> None:
+        for subscriber in list(self.subscribers):
+            if not subscriber.push(event):
+                self.subscribers.discard(subscriber)
+
+
+class FeedHub:
+    """Live feeds by search key, created on first subscribe and stopped on the last leave."""
+
+    def __init__(self, *, interval: float = DEFAULT_FEED_INTERVAL):
+        self.interval = max(interval, MIN_FEED_INTERVAL)
+        self._feeds: dict[str, Feed] = {}
+
+    @classmethod
+    def from_env(cls) -> FeedHub:
+        value = os.environ.get(FEED_INTERVAL_ENV, "").strip()
+        return cls(interval=float(value) if value else DEFAULT_FEED_INTERVAL)
+
+    def __len__(self) -> int:
+        return len(self._feeds)
+
+    @asynccontextmanager
+    async def subscribe(self, key: str, poll: Poll) -> AsyncIterator[Subscription]:
+        """Join (or start) the feed for `key`; `poll` runs the search when starting."""
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._feeds[key] = Feed(key, poll, self.interval)
+            feed.start()
+        subscription = Subscription()
+        if feed.latest:
+            subscription.push(FeedEvent("jobs", rows=list(feed.latest)))
+        feed.subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            feed.subscribers.discard(subscription)
+            if not feed.subscribers and self._feeds.get(key) is feed:
+                del self._feeds[key]
+                # Not awaited: this may run while the subscriber is being cancelled.
+                feed.stop()
+
+    async def close(self) -> None:
+        """Stop every feed and end its subscribers' streams (on shutdown)."""
+        feeds, self._feeds = list(self._feeds.values()), {}
+        tasks = [task for task in (feed.stop() for feed in feeds) if task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
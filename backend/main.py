@@ -1,14 +1,54 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Any
+import os
+import time
+from collections import Counter
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Iterable, Literal, TypeVar
 
-import pandas as pd
-from fastapi import FastAPI, HTTPException, Query, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
-from job_scraper_manager import JobScraperManager, SUPPORTED_SITES
+import exporters
+import profiling
+import response_encoding
+from admission import AdmissionController, AdmissionRejected
+from countries import COUNTRY_REGISTRY, UnknownCountryError
+from job_queue import QueueFullError, ScrapeJob, ScrapeJobQueue
+from large_results import SpillBuffer
+from live_feeds import FeedEvent, FeedHub
+from proxy_pool import ProxyPool
+from job_scraper_manager import (
+    DEFAULT_BATCH_CONCURRENCY,
+    JobScraperManager,
+    ScrapeQuery,
+    SUPPORTED_SITES,
+)
+from result_sessions import (
+    SORTABLE_COLUMNS,
+    InvalidCursorError,
+    ResultPage,
+    ResultSession,
+    ResultSessionStore,
+    ResultView,
+)
+from scrapers import NO_FILTERS, SCRAPER_REGISTRY, JobRecord, SearchFilters
+from scrapers.query import ExperienceLevel, JobType
+from search_cache import SearchCache
+from search_index import JobSearchIndex
+from shared_state import SharedState
+
+if TYPE_CHECKING:
+    # pandas is imported on first use (or by warmup) to keep cold starts fast.
+    import pandas as pd
 
 # Configure logging
 logging.basicConfig(
@@ -17,7 +57,63 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Job Scraper")
+# Opt-in per-request timelines (X-Profile: 1), slow-request capture and
+# event-loop lag sampling; browsable under /debug.
+profiler = profiling.RequestProfiler.from_env()
+
+# Outbound proxies for every scraper request (JOB_SCRAPER_PROXIES); health and
+# evictions are browsable under /debug/proxies.
+proxy_pool = ProxyPool.from_env()
+
+# Comma-separated countries (e.g. "USA,DE") to warm up before serving.
+WARMUP_ENV = "JOB_SCRAPER_WARMUP"
+WARMUP_TIMEOUT = 15.0
+
+
+def _warmup_countries() -> list[str]:
+    value = os.environ.get(WARMUP_ENV, "")
+    return [country.strip() for country in value.split(",") if country.strip()]
+
+
+async def _warm_up(countries: list[str]) -> None:
+    """Pay the first request's import, connection and token costs at startup."""
+    started = time.perf_counter()
+    import pandas  # noqa: F401
+
+    try:
+        errors = await asyncio.wait_for(
+            JobScraperManager.warm_up(countries, shared_state=shared_state),
+            WARMUP_TIMEOUT,
+        )
+    except TimeoutError:
+        logger.warning(f"Warmup did not finish within {WARMUP_TIMEOUT:.0f}s")
+    else:
+        for target, message in errors.items():
+            logger.warning(f"Warmup failed for {target}: {message}")
+    logger.info(f"Warmed up {', '.join(countries)} in {time.perf_counter() - started:.2f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    profiler.loop_lag.start()
+    if proxy_pool:
+        JobScraperManager.use_proxies(proxy_pool)
+    countries = _warmup_countries()
+    if countries:
+        await _warm_up(countries)
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        await live_feeds.close()
+        await job_queue.stop()
+        await profiler.loop_lag.stop()
+        # Background refreshes use the pool; let them finish before closing it.
+        await search_cache.drain()
+        await JobScraperManager.close_pool()
+
+
+app = FastAPI(title="Job Scraper", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend to communicate with backend
 app.add_middleware(
@@ -28,7 +124,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    return await profiler.dispatch(request, call_next)
+
+
 DEFAULT_LIMIT = 60
+MAX_LIMIT = 200
+MAX_EXPORT_LIMIT = 10_000
+DEFAULT_PAGE_SIZE = 50
+MAX_BATCH_QUERIES = 500
+MAX_POSTED_WITHIN_DAYS = 30
+MAX_RADIUS = 100
+# Seconds clients are told to wait before polling a job again / resubmitting.
+JOB_POLL_INTERVAL = 2
+JOB_QUEUE_RETRY_AFTER = 30
+# nginx's "client closed request"; only the access log ever sees it.
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+# Set JOB_SCRAPER_SHARED_STATE to a SQLite path to share caching, rate budgets
+# and in-flight crawls between worker processes.
+shared_state = SharedState.from_env()
+
+# Repeated searches are answered from cache while younger than the hard TTL;
+# boards past the soft TTL are re-crawled in the background.
+search_cache = SearchCache.from_env(shared_state=shared_state)
+
+# Full /scrape results are retained so the frontend can page, sort and
+# filter them server-side through /results/{result_id}.
+result_sessions = ResultSessionStore(shared_state=shared_state)
+
+# Every scraped job is added to a local full-text index served by /search.
+search_index = JobSearchIndex.from_env()
+
+# Per-client quotas (by X-API-Key or IP) and a bounded pool of crawl slots for
+# the crawling endpoints; decisions are counted under /debug/admission.
+admission = AdmissionController.from_env()
+
+# Live /scrape/subscribe feeds: one poller per search, shared by its subscribers.
+live_feeds = FeedHub.from_env()
+# Comment lines sent to idle feed streams so proxies keep them open.
+FEED_KEEPALIVE_SECONDS = 15.0
 
 
 class DataFramePayload(BaseModel):
@@ -44,101 +184,810 @@ class ScrapeResponse(BaseModel):
     sites: list[str]
     dataframe: DataFramePayload
     errors: dict[str, str] | None = None
+    result_id: str | None = None
+    total_rows: int | None = None
+    next_cursor: str | None = None
+    source_counts: dict[str, int] | None = None
+    # Seconds since each board's rows were fetched (0 for a live crawl).
+    data_age: dict[str, float] | None = None
+
+
+class ScrapeJobResponse(BaseModel):
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    expires_at: float | None = None
+    result: ScrapeResponse | None = None
+    error: str | None = None
+
+
+class SearchResult(BaseModel):
+    title: str
+    company: str
+    location: str | None
+    url: str
+    source: str
+    country: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    country: str | None
+    sources: list[str] | None
+    results: list[SearchResult]
+    took_ms: float
+
+
+class BatchQuery(BaseModel):
+    country: str = Field(min_length=2)
+    role: str = Field(min_length=2)
+    location: str | None = None
+    limit: int = Field(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT)
+    sites: list[str] = Field(default_factory=lambda: list(SUPPORTED_SITES))
+    filters: SearchFilters = Field(default_factory=SearchFilters)
+
+
+class BatchRequest(BaseModel):
+    queries: list[BatchQuery] = Field(min_length=1, max_length=MAX_BATCH_QUERIES)
+    concurrency: int = Field(default=DEFAULT_BATCH_CONCURRENCY, ge=1, le=32)
+
+
+class BatchResultLine(ScrapeResponse):
+    index: int
+
+
+def _validate_country(country: str) -> str:
+    try:
+        COUNTRY_REGISTRY.resolve(country)
+    except UnknownCountryError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from None
+    return country.strip()
 
 
 def _validate_sites(sites: list[str]) -> list[str]:
     normalized = []
     for site in sites:
         value = site.lower().strip()
-        if value not in SUPPORTED_SITES:
+        if value not in SCRAPER_REGISTRY:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported site '{site}'. Choose from {', '.join(SUPPORTED_SITES)}.",
+                detail=f"Unsupported site '{site}'. Choose from {', '.join(SCRAPER_REGISTRY.names())}.",
             )
         normalized.append(value)
     return normalized
 
 
 def _frame_from_records(records: list[dict[str, Any]], limit: int) -> pd.DataFrame:
+    import pandas as pd
+
     dataframe = pd.DataFrame(records)
     if dataframe.empty:
-        return pd.DataFrame(columns=["title", "company", "location", "url", "source"])
+        return pd.DataFrame(columns=exporters.RESULT_COLUMNS)
     dataframe = dataframe.drop_duplicates(
-        subset=["title", "company", "url", "source"],
+        subset=list(exporters.DEDUPE_COLUMNS),
         keep="first",
     )
-    
-    # Proportional limiting: take records evenly from each source
-    unique_sources = dataframe['source'].unique()
-    if len(unique_sources) == 0:
-        return dataframe.head(limit)
-    
-    limit_per_source = limit // len(unique_sources)
-    limited_dfs = []
-    for source in unique_sources:
-        source_df = dataframe[dataframe['source'] == source].head(limit_per_source)
-        limited_dfs.append(source_df)
-    
-    result = pd.concat(limited_dfs, ignore_index=True)
-    logger.info(f"After proportional limiting: {result['source'].value_counts().to_dict()}")
+    # JobScraperManager plans per-site quotas before crawling, so the records
+    # already fit `limit`; the head() is only a safeguard.
+    result = dataframe.head(limit).reset_index(drop=True)
+    logger.info(f"Rows by source: {result['source'].value_counts().to_dict()}")
     return result
 
 
-@app.get("/scrape", response_model=ScrapeResponse)
-async def scrape(
-    country: str = Query(..., min_length=2, description="Country (e.g., USA, Germany)"),
-    role: str = Query(..., min_length=2, description="Job title or keywords to search for."),
-    location: str | None = Query(
-        default=None,
-        description="Optional city, state, or region filter.",
-    ),
-    limit: int = Query(
-        default=DEFAULT_LIMIT,
-        ge=1,
-        le=200,
-        description="Maximum number of aggregated results to return.",
-    ),
-    sites: list[str] = Query(
-        default=list(SUPPORTED_SITES),
-        description="Subset of job boards to query.",
-    ),
-) -> ScrapeResponse:
-    country_normalized = country.strip()
-    role_normalized = role.strip()
-    normalized_sites = _validate_sites(sites)
+@dataclass
+class ScrapeParams:
+    country: str
+    role: str
+    location: str | None
+    limit: int
+    sites: list[str]
+    filters: SearchFilters = NO_FILTERS
+
+
+def _scrape_params_dependency(max_limit: int):
+    def scrape_params(
+        country: str = Query(..., min_length=2, description="Country (e.g., USA, Germany)"),
+        role: str = Query(..., min_length=2, description="Job title or keywords to search for."),
+        location: str | None = Query(
+            default=None,
+            description="Optional city, state, or region filter.",
+        ),
+        limit: int = Query(
+            default=DEFAULT_LIMIT,
+            ge=1,
+            le=max_limit,
+            description="Maximum number of aggregated results to return.",
+        ),
+        sites: list[str] = Query(
+            default=list(SUPPORTED_SITES),
+            description="Subset of job boards to query.",
+        ),
+        posted_within_days: int | None = Query(
+            default=None,
+            ge=1,
+            le=MAX_POSTED_WITHIN_DAYS,
+            description="Only jobs posted in the last N days.",
+        ),
+        job_type: JobType | None = Query(default=None, description="Employment type."),
+        experience: ExperienceLevel | None = Query(default=None, description="Experience level."),
+        radius: int | None = Query(
+            default=None,
+            ge=1,
+            le=MAX_RADIUS,
+            description="Miles around `location`.",
+        ),
+        remote: bool = Query(default=False, description="Only remote jobs."),
+    ) -> ScrapeParams:
+        """Validate and normalize the query parameters shared by the scrape endpoints."""
+        return ScrapeParams(
+            country=_validate_country(country),
+            role=role.strip(),
+            location=location,
+            limit=limit,
+            sites=_validate_sites(sites),
+            filters=SearchFilters(
+                posted_within_days=posted_within_days,
+                job_type=job_type,
+                experience=experience,
+                radius=radius,
+                remote=remote,
+            ),
+        )
+
+    return scrape_params
+
+
+def _client_id(request: Request) -> str:
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def _crawl_cost(sites: Iterable[str], limit: int) -> int:
+    """Admission cost of a search: the rows it may ask every board for."""
+    return len(list(sites)) * limit
+
+
+def _rejection(exc: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=exc.status_code,
+        detail=exc.reason,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@asynccontextmanager
+async def _admitted(request: Request, cost: int):
+    """Charge the client's quota and hold a crawl slot, or answer 429/503."""
+    try:
+        async with admission.admit(_client_id(request), cost):
+            yield
+    except AdmissionRejected as exc:
+        raise _rejection(exc) from None
 
-    manager = JobScraperManager(country=country_normalized)
+
+scrape_params = _scrape_params_dependency(MAX_LIMIT)
+# Exports stream rows, so they may ask for far more than a JSON response.
+export_params = _scrape_params_dependency(MAX_EXPORT_LIMIT)
+
+
+async def _scrape_records(
+    params: ScrapeParams,
+) -> tuple[list[JobRecord], dict[str, str], dict[str, float]]:
+    manager = JobScraperManager(country=params.country, shared_state=shared_state, cache=search_cache)
     records, errors = await manager.scrape_jobs(
-        role=role_normalized,
-        sites=normalized_sites,
-        location=location,
-        limit=limit,
+        role=params.role,
+        sites=params.sites,
+        location=params.location,
+        limit=params.limit,
+        filters=params.filters,
     )
 
     logger.info(f"Total records scraped: {len(records)}")
     
     # Log records by source
-    from collections import Counter
     source_counts = Counter(record.source for record in records)
     logger.info(f"Records by source: {dict(source_counts)}")
 
-    dataframe = _frame_from_records([record.to_dict() for record in records], limit)
+    await _index_records(records, params.country)
 
-    if dataframe.empty and errors:
+    if not records and errors:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"Failed to scrape any sites: {errors}",
         )
+    return records, errors, manager.fetched_at
+
+
+async def _index_records(records: list[JobRecord], country: str) -> None:
+    try:
+        with profiling.stage("index"):
+            await asyncio.to_thread(
+                search_index.add, records, country=COUNTRY_REGISTRY.resolve(country).key
+            )
+    except Exception:
+        # The index is a convenience; never fail a scrape because of it.
+        logger.exception("Failed to index scraped jobs")
 
+
+@app.get("/scrape", response_model=ScrapeResponse)
+async def scrape(
+    request: Request,
+    params: ScrapeParams = Depends(scrape_params),
+    page_size: int | None = Query(
+        default=None,
+        ge=1,
+        le=MAX_LIMIT,
+        description="Return only the first page; fetch the rest from /results/{result_id}.",
+    ),
+) -> ScrapeResponse:
+    async with _admitted(request, _crawl_cost(params.sites, params.limit)):
+        session, fetched_at = await _unless_disconnected(request, _scrape_session(params))
+    page_size = page_size or max(len(session.rows), 1)
+    page = result_sessions.page(session, page_size=page_size)
+    payload = _page_response(session, page, fetched_at=fetched_at)
+    # The session id is a content hash of the normalized result set, so an
+    # unchanged result produces the same ETag and costs only a 304. The fetch
+    # times are tagged too: a refresh with identical rows changes data_age.
+    return _conditional_json(
+        request,
+        payload,
+        _etag(session.id, page_size, _fetch_tag(fetched_at)),
+        age=max(payload.data_age.values(), default=0) if payload.data_age else None,
+    )
+
+
+async def _unless_disconnected(request: Request, work: Awaitable[T]) -> T:
+    """Await `work`, cancelling it if the client disconnects first.
+
+    Cancellation reaches every scraper's pagination loop; it only returns
+    here once the crawl has unwound, so fetched rows are cached and upstream
+    connections released before the request ends.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            logger.info(f"Client disconnected; cancelling {request.url.path}")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+        return task.result()
+    finally:
+        # The watcher is cancelled but not awaited: behind BaseHTTPMiddleware a
+        # pending receive only unwinds once the response has been sent.
+        watcher.cancel()
+        # Also reached when this request is itself cancelled (e.g. at shutdown).
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # Blocks on the ASGI receive channel instead of polling
+    # `request.is_disconnected()`, which can miss the message behind
+    # `BaseHTTPMiddleware`. Only used by endpoints without a request body.
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _scrape_session(params: ScrapeParams) -> tuple[ResultSession, dict[str, float]]:
+    """Scrape, build the DataFrame and retain the rows as a result session.
+
+    Also returns when each board's rows were fetched.
+    """
+    records, errors, fetched_at = await _scrape_records(params)
+    with profiling.stage("dataframe"):
+        dataframe = _frame_from_records([record.to_dict() for record in records], params.limit)
+
+    query = JobScraperManager(country=params.country).parse_query(
+        params.role,
+        params.location,
+        params.filters,
+    )
+    session = await result_sessions.create(
+        dataframe.to_dict(orient="records"),
+        # Equivalent spellings of a search share one session (and ETag).
+        identity={"query": query.key, "sites": sorted(params.sites), "errors": errors or None},
+        country=params.country,
+        role=params.role,
+        location=params.location,
+        sites=params.sites,
+        errors=errors or None,
+        fetched_at=fetched_at,
+    )
+    return session, fetched_at
+
+
+async def _run_scrape_job(params: dict[str, Any]) -> dict[str, Any]:
+    # Jobs stored before filters existed have no "filters" key.
+    try:
+        session, fetched_at = await _scrape_session(
+            ScrapeParams(**{**params, "filters": SearchFilters(**(params.get("filters") or {}))})
+        )
+    except HTTPException as exc:
+        raise RuntimeError(exc.detail) from None
+    page = result_sessions.page(session, page_size=max(len(session.rows), 1))
+    return _page_response(session, page, fetched_at=fetched_at).model_dump(mode="json")
+
+
+# /scrape/jobs runs searches on a bounded worker pool; set JOB_SCRAPER_JOBS_PATH
+# (or JOB_SCRAPER_SHARED_STATE) to keep jobs and their results across restarts.
+job_queue = ScrapeJobQueue.from_env(_run_scrape_job, shared_state=shared_state)
+
+
+@app.post(
+    "/scrape/jobs",
+    response_model=ScrapeJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_scrape_job(
+    request: Request,
+    response: Response,
+    params: ScrapeParams = Depends(scrape_params),
+) -> ScrapeJobResponse:
+    """Queue a /scrape search and return at once; poll /scrape/jobs/{id} for the result."""
+    # The job queue bounds concurrency itself; only the client's quota applies.
+    client, cost = _client_id(request), _crawl_cost(params.sites, params.limit)
+    try:
+        admission.charge(client, cost)
+    except AdmissionRejected as exc:
+        raise _rejection(exc) from None
+    try:
+        job = await job_queue.submit(asdict(params))
+    except QueueFullError as exc:
+        admission.refund(client, cost)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(JOB_QUEUE_RETRY_AFTER)},
+        ) from None
+    response.headers["location"] = f"/scrape/jobs/{job.id}"
+    return _job_response(job)
+
+
+@app.get("/scrape/jobs/{job_id}", response_model=ScrapeJobResponse)
+async def scrape_job_status(job_id: str, response: Response) -> ScrapeJobResponse:
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scrape job not found or expired.",
+        )
+    if not job.done:
+        response.headers["retry-after"] = str(JOB_POLL_INTERVAL)
+    return _job_response(job)
+
+
+def _job_response(job: ScrapeJob) -> ScrapeJobResponse:
+    return ScrapeJobResponse(
+        id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        result=job.result,
+        error=job.error,
+    )
+
+
+@app.get("/results/{result_id}", response_model=ScrapeResponse)
+async def result_page(
+    request: Request,
+    result_id: str,
+    cursor: str | None = Query(default=None, description="Opaque cursor from a previous page."),
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_LIMIT),
+    sort: Literal[SORTABLE_COLUMNS] | None = Query(default=None),
+    order: Literal["asc", "desc"] = Query(default="asc"),
+    sources: list[str] | None = Query(default=None, description="Only rows from these boards."),
+    q: str | None = Query(default=None, description="Substring filter on title, company or location."),
+) -> ScrapeResponse:
+    """Serve another page, sort or filter of a retained /scrape result.
+
+    A cursor carries the sort and filters it was issued for, so only
+    `page_size` is honoured alongside it.
+    """
+    session = await _get_session(result_id)
+    view = ResultView(
+        sort=sort,
+        descending=order == "desc",
+        sources=tuple(_validate_sites(sources)) if sources else (),
+        text=q.strip() if q and q.strip() else None,
+    )
+    try:
+        page = result_sessions.page(session, page_size=page_size, cursor=cursor, view=view)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from None
+    return _conditional_json(
+        request,
+        _page_response(session, page),
+        _etag(
+            session.id,
+            page_size,
+            cursor or "",
+            repr(page.view),
+            _fetch_tag(session.meta.get("fetched_at")),
+        ),
+    )
+
+
+@app.get("/results/{result_id}/export")
+async def result_export(
+    result_id: str,
+    export_format: Literal["csv", "arrow", "parquet"] = Query(default="csv", alias="format"),
+) -> StreamingResponse:
+    """Stream a retained result in a columnar format (see /scrape/export)."""
+    session = await _get_session(result_id)
+    return _export_response(session.rows, export_format, errors=session.meta.get("errors"))
+
+
+async def _get_session(result_id: str) -> ResultSession:
+    session = await result_sessions.get(result_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Result not found or expired; run the search again.",
+        )
+    return session
+
+
+def _fetch_tag(fetched_at: dict[str, float] | None) -> str:
+    return json.dumps(sorted((fetched_at or {}).items()))
+
+
+def _etag(*parts: object) -> str:
+    # Weak: the same tag is sent for gzip and identity bodies, which are
+    # equivalent but not byte-identical.
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _conditional_json(
+    request: Request,
+    payload: BaseModel,
+    etag: str,
+    *,
+    age: float | None = None,
+) -> Response:
+    """Serialize `payload` with ETag revalidation and negotiated compression.
+
+    `age` (seconds) is sent as an `Age` header when the data came from cache.
+    """
+    headers = {
+        "etag": etag,
+        "vary": "Accept-Encoding",
+        "cache-control": "private, no-cache",
+    }
+    if age is not None:
+        headers["age"] = str(int(age))
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    with profiling.stage("serialize"):
+        body = payload.model_dump_json().encode()
+    with profiling.stage("compress"):
+        body, encoding = response_encoding.compress(body, request.headers.get("accept-encoding"))
+    if encoding:
+        headers["content-encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _page_response(
+    session: ResultSession,
+    page: ResultPage,
+    *,
+    fetched_at: dict[str, float] | None = None,
+) -> ScrapeResponse:
+    meta = session.meta
     return ScrapeResponse(
-        country=country_normalized,
-        role=role_normalized,
-        location=location,
-        sites=normalized_sites,
+        country=meta["country"],
+        role=meta["role"],
+        location=meta["location"],
+        sites=meta["sites"],
         dataframe=DataFramePayload(
-            columns=list(dataframe.columns),
-            rows=dataframe.to_dict(orient="records"),
-            row_count=len(dataframe.index),
+            columns=list(exporters.RESULT_COLUMNS),
+            rows=page.rows,
+            row_count=len(page.rows),
         ),
-        errors=errors or None,
+        errors=meta["errors"],
+        result_id=session.id,
+        total_rows=page.total_rows,
+        next_cursor=page.next_cursor,
+        source_counts=session.source_counts,
+        data_age=_data_age(fetched_at or meta.get("fetched_at")),
     )
+
+
+def _data_age(fetched_at: dict[str, float] | None) -> dict[str, float] | None:
+    if not fetched_at:
+        return None
+    now = time.time()
+    return {site: round(max(0.0, now - at), 1) for site, at in fetched_at.items()}
+
+
+@app.get("/scrape/export")
+async def scrape_export(
+    request: Request,
+    params: ScrapeParams = Depends(export_params),
+    export_format: Literal["csv", "arrow", "parquet"] = Query(
+        default="csv",
+        alias="format",
+        description="csv (chunked), arrow (Arrow IPC stream) or parquet.",
+    ),
+) -> StreamingResponse:
+    """Stream the scrape result as CSV, Arrow IPC or Parquet instead of JSON.
+
+    Limits above MAX_LIMIT switch to large-result mode: records are deduped
+    with a fixed-size filter as they arrive and spilled to a temporary file,
+    so memory stays flat however many rows are requested.
+    """
+    async with _admitted(request, _crawl_cost(params.sites, params.limit)):
+        if params.limit <= MAX_LIMIT:
+            records, errors, _ = await _unless_disconnected(request, _scrape_records(params))
+            return _export_response(records, export_format, limit=params.limit, errors=errors)
+
+        spill, errors = await _unless_disconnected(request, _spill_records(params))
+    return _export_response(
+        spill.rows(),
+        export_format,
+        errors=errors,
+        dedupe=False,
+        background=BackgroundTask(spill.close),
+    )
+
+
+async def _spill_records(params: ScrapeParams) -> tuple[SpillBuffer, dict[str, str]]:
+    manager = JobScraperManager(country=params.country, shared_state=shared_state)
+    errors: dict[str, str] = {}
+    spill = SpillBuffer()
+    pages = manager.stream_jobs(
+        role=params.role,
+        sites=params.sites,
+        location=params.location,
+        limit=params.limit,
+        errors=errors,
+        filters=params.filters,
+    )
+    try:
+        async with aclosing(pages):
+            async for page in pages:
+                spill.write(exporters.unique_rows(page, dedupe=False))
+                await _index_records(page, params.country)
+    except BaseException:
+        spill.close()
+        raise
+    logger.info(f"Large export spilled {len(spill)} records")
+    if not spill and errors:
+        spill.close()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to scrape any sites: {errors}",
+        )
+    return spill, errors
+
+
+@app.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="Words to match in title, company or location."),
+    country: str | None = Query(default=None, description="Only jobs scraped for this country."),
+    sources: list[str] | None = Query(default=None, description="Only jobs from these boards."),
+    limit: int = Query(default=20, ge=1, le=MAX_LIMIT),
+    offset: int = Query(default=0, ge=0),
+) -> SearchResponse:
+    """Search previously scraped jobs without contacting the boards."""
+    country_key = None
+    if country:
+        _validate_country(country)
+        country_key = COUNTRY_REGISTRY.resolve(country).key
+    normalized_sources = _validate_sites(sources) if sources else None
+    started = time.perf_counter()
+    hits = await asyncio.to_thread(
+        search_index.search,
+        q,
+        sources=normalized_sources,
+        country=country_key,
+        limit=limit,
+        offset=offset,
+    )
+    return SearchResponse(
+        query=q,
+        country=country_key,
+        sources=normalized_sources,
+        results=[SearchResult(**asdict(hit)) for hit in hits],
+        took_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+def _export_response(
+    records: Iterable[JobRecord | dict[str, Any]],
+    export_format: str,
+    *,
+    limit: int | None = None,
+    errors: dict[str, str] | None = None,
+    dedupe: bool = True,
+    background: BackgroundTask | None = None,
+) -> StreamingResponse:
+    try:
+        body = exporters.encode(export_format, records, limit=limit, dedupe=dedupe)
+    except exporters.ExportUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(exc),
+        ) from None
+    media_type, extension = exporters.EXPORT_FORMATS[export_format]
+    headers = {"content-disposition": f'attachment; filename="jobs.{extension}"'}
+    if errors:
+        headers["x-scrape-errors"] = json.dumps(errors)
+    return StreamingResponse(body, media_type=media_type, headers=headers, background=background)
+
+
+@app.post("/scrape/batch")
+async def scrape_batch(request: BatchRequest, http_request: Request) -> StreamingResponse:
+    """Run many searches in one call, streaming one NDJSON line per query as it completes."""
+    queries = [
+        ScrapeQuery(
+            country=_validate_country(query.country),
+            role=query.role.strip(),
+            location=query.location,
+            limit=query.limit,
+            sites=tuple(_validate_sites(query.sites)),
+            filters=query.filters,
+        )
+        for query in request.queries
+    ]
+    # Charged up front for every query. Unlike a single crawl, a batch is not
+    # capped at the burst; one that could never be paid for must be split.
+    # Each query takes a crawl slot while it runs, without shedding, since
+    # the status is already sent by then.
+    client = _client_id(http_request)
+    cost = sum(_crawl_cost(query.sites, query.limit) for query in queries)
+    if cost > admission.client_burst:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=(
+                f"Batch costs {cost} rows but a client may spend at most "
+                f"{admission.client_burst:g} at once; split it into smaller batches"
+            ),
+        )
+    try:
+        admission.charge(client, cost)
+        admission.check_capacity()
+    except AdmissionRejected as exc:
+        if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            admission.refund(client, cost)
+        raise _rejection(exc) from None
+
+    async def lines():
+        async for result in JobScraperManager.scrape_many(
+            queries,
+            concurrency=request.concurrency,
+            shared_state=shared_state,
+            cache=search_cache,
+            slot=lambda: admission.slot(wait_forever=True),
+        ):
+            query = result.query
+            await _index_records(result.records, query.country)
+            dataframe = _frame_from_records(
+                [record.to_dict() for record in result.records],
+                query.limit,
+            )
+            line = BatchResultLine(
+                index=result.index,
+                country=query.country,
+                role=query.role,
+                location=query.location,
+                sites=list(query.sites),
+                dataframe=_dataframe_payload(dataframe),
+                errors=result.errors or None,
+                data_age=_data_age(result.fetched_at),
+            )
+            yield line.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/scrape/subscribe")
+async def subscribe(
+    request: Request,
+    params: ScrapeParams = Depends(scrape_params),
+) -> StreamingResponse:
+    """Stream a search as server-sent events: its current jobs, then each newly seen job.
+
+    Subscribers to the same search share one poller, which re-runs it every
+    `JOB_SCRAPER_FEED_INTERVAL` seconds and stops when the last one leaves.
+    """
+    # Charged once per subscription; the shared polls are not charged again.
+    try:
+        admission.charge(_client_id(request), _crawl_cost(params.sites, params.limit))
+    except AdmissionRejected as exc:
+        raise _rejection(exc) from None
+    manager = JobScraperManager(country=params.country, shared_state=shared_state, cache=search_cache)
+    query = manager.parse_query(params.role, params.location, params.filters)
+    key = json.dumps([query.key, sorted(set(params.sites)), params.limit])
+
+    async def poll() -> tuple[list[dict[str, Any]], dict[str, str]]:
+        records, errors = await manager.scrape_jobs(
+            role=params.role,
+            sites=params.sites,
+            location=params.location,
+            limit=params.limit,
+            filters=params.filters,
+        )
+        await _index_records(records, params.country)
+        return list(exporters.unique_rows(records, params.limit)), errors
+
+    async def events():
+        async with live_feeds.subscribe(key, poll) as subscription:
+            async for event in subscription.events(idle=FEED_KEEPALIVE_SECONDS):
+                yield ": keep-alive\n\n" if event is None else _feed_event(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+    )
+
+
+def _feed_event(event: FeedEvent) -> str:
+    data = {"rows": event.rows} if event.kind == "jobs" else {"errors": event.errors}
+    return f"event: {event.kind}\ndata: {json.dumps(data)}\n\n"
+
+
+def _dataframe_payload(dataframe: pd.DataFrame) -> DataFramePayload:
+    return DataFramePayload(
+        columns=list(dataframe.columns),
+        rows=dataframe.to_dict(orient="records"),
+        row_count=len(dataframe.index),
+    )
+
+
+@app.get("/debug/slow-requests")
+async def slow_requests() -> dict[str, Any]:
+    """Requests slower than the configured threshold, newest first."""
+    return {
+        "threshold_seconds": profiler.slow_request_seconds,
+        "requests": list(reversed(profiler.slow_requests)),
+    }
+
+
+@app.get("/debug/profiles/{profile_id}")
+async def request_profile(profile_id: str) -> dict[str, Any]:
+    timeline = profiler.profile(profile_id)
+    if timeline is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown or expired profile id",
+        )
+    return timeline.to_dict()
+
+
+@app.get("/debug/admission")
+async def admission_metrics() -> dict[str, Any]:
+    """Admission decisions and current load of the crawling endpoints."""
+    return admission.snapshot()
+
+
+@app.get("/debug/proxies")
+async def proxy_metrics() -> dict[str, Any]:
+    """Health, latency and evictions of the outbound proxies."""
+    return proxy_pool.snapshot()
+
+
+@app.get("/debug/loop-lag")
+async def loop_lag() -> dict[str, Any]:
+    return profiler.loop_lag.snapshot()
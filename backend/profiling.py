@@ -0,0 +1,312 @@
+"""Opt-in request profiling, slow-request capture and event-loop lag sampling.
+
+Send `X-Profile: 1` (or `?profile=1`) to record a per-stage timeline for a
+request: network stages of every upstream call (connect, tls, ttfb, download,
+from httpcore's trace extension), then parse, filter, dedupe, dataframe and
+serialize. Each span is tagged with the site and page it belongs to. The
+response carries a `Server-Timing` summary and an `X-Profile-Id` that can be
+looked up under `/debug/profiles/{id}`.
+
+Every request is timed until its last body chunk is sent, so streamed
+responses count their whole stream. Those slower than
+`JOB_SCRAPER_SLOW_REQUEST_SECONDS` land in a ring buffer served by `/debug/slow-requests`, together with the
+worst event-loop lag sampled while they ran. Set `JOB_SCRAPER_PROFILE_ALL=1`
+to record timelines for every request so slow ones always include one.
+
+Instrumentation is a no-op `stage()` unless a timeline is active. Tasks that
+outlive their request start from `detached_context()` so they do not keep
+adding spans to its timeline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+import httpx
+
+SLOW_REQUEST_ENV = "JOB_SCRAPER_SLOW_REQUEST_SECONDS"
+PROFILE_ALL_ENV = "JOB_SCRAPER_PROFILE_ALL"
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "profile"
+
+DEFAULT_SLOW_REQUEST_SECONDS = 10.0
+PROFILE_HISTORY = 50
+SLOW_REQUEST_HISTORY = 50
+LOOP_LAG_INTERVAL = 0.25
+LOOP_LAG_HISTORY = 2400
+
+_timeline: ContextVar[Timeline | None] = ContextVar("job_scraper_timeline", default=None)
+_site_page: ContextVar[tuple[str, int] | None] = ContextVar("job_scraper_site_page", default=None)
+
+
+@dataclass
+class Span:
+    stage: str
+    start: float
+    duration: float
+    site: str | None = None
+    page: int | None = None
+    detail: str | None = None
+
+
+@dataclass
+class Timeline:
+    """Spans recorded for one request, relative to when it started."""
+
+    method: str
+    path: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    started_at: float = field(default_factory=time.time)
+    spans: list[Span] = field(default_factory=list)
+    _origin: float = field(default_factory=time.perf_counter, repr=False)
+
+    def record(self, stage: str, start: float, end: float, *, detail: str | None = None) -> None:
+        site, page = _site_page.get() or (None, None)
+        self.spans.append(
+            Span(
+                stage=stage,
+                start=round(start - self._origin, 6),
+                duration=round(end - start, 6),
+                site=site,
+                page=page,
+                detail=detail,
+            )
+        )
+
+    def totals(self) -> dict[str, float]:
+        """Total seconds per stage, in first-seen order."""
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            totals[span.stage] = totals.get(span.stage, 0.0) + span.duration
+        return totals
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.totals().items()
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "totals": {stage: round(seconds, 6) for stage, seconds in self.totals().items()},
+            "spans": [asdict(span) for span in self.spans],
+        }
+
+
+def current_timeline() -> Timeline | None:
+    return _timeline.get()
+
+
+def detached_context() -> contextvars.Context:
+    """The current context without a timeline, for tasks that outlive their request."""
+    context = contextvars.copy_context()
+    context.run(_timeline.set, None)
+    context.run(_site_page.set, None)
+    return context
+
+
+@contextmanager
+def stage(name: str, *, detail: str | None = None) -> Iterator[None]:
+    """Record the enclosed block as `name` on the active timeline, if any."""
+    timeline = _timeline.get()
+    if timeline is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timeline.record(name, start, time.perf_counter(), detail=detail)
+
+
+@contextmanager
+def site_page(site: str, page: int) -> Iterator[None]:
+    """Attribute spans in the block to one page of one site, timing it as "page"."""
+    token = _site_page.set((site, page))
+    try:
+        with stage("page"):
+            yield
+    finally:
+        _site_page.reset(token)
+
+
+class _HttpTracer:
+    """httpcore trace callback turning connection events into spans."""
+
+    _STARTS = {
+        "connect_tcp.started": "connect",
+        "start_tls.started": "tls",
+        "send_request_headers.started": "ttfb",
+        "receive_response_body.started": "download",
+    }
+    _ENDS = {
+        "connect_tcp.complete": "connect",
+        "start_tls.complete": "tls",
+        "receive_response_headers.complete": "ttfb",
+        "receive_response_body.complete": "download",
+    }
+
+    def __init__(self, timeline: Timeline, detail: str):
+        self.timeline = timeline
+        self.detail = detail
+        self.open: dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict[str, Any]) -> None:
+        # Names look like "connection.connect_tcp.started" or "http11.<event>".
+        event = name.split(".", 1)[-1]
+        now = time.perf_counter()
+        if event in self._STARTS:
+            self.open[self._STARTS[event]] = now
+        elif event in self._ENDS:
+            start = self.open.pop(self._ENDS[event], None)
+            if start is not None:
+                self.timeline.record(self._ENDS[event], start, now, detail=self.detail)
+
+
+async def trace_request(request: httpx.Request) -> None:
+    """httpx request hook attaching a tracer while a timeline is active."""
+    timeline = _timeline.get()
+    if timeline is not None:
+        request.extensions["trace"] = _HttpTracer(timeline, f"{request.url.host}{request.url.path}")
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a periodic sleeper."""
+
+    def __init__(self, *, interval: float = LOOP_LAG_INTERVAL, history: int = LOOP_LAG_HISTORY):
+        self.interval = interval
+        self.samples: deque[tuple[float, float]] = deque(maxlen=history)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append((time.time(), max(0.0, loop.time() - expected)))
+
+    def max_between(self, start: float, end: float) -> float | None:
+        lags = [lag for at, lag in self.samples if start <= at <= end]
+        return max(lags) if lags else None
+
+    def snapshot(self) -> dict[str, Any]:
+        lags = sorted(lag for _, lag in self.samples)
+        if not lags:
+            return {"running": self._task is not None, "samples": 0}
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "samples": len(lags),
+            "interval_seconds": self.interval,
+            "last_seconds": self.samples[-1][1],
+            "p50_seconds": lags[len(lags) // 2],
+            "p99_seconds": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+            "max_seconds": lags[-1],
+        }
+
+
+async def _timed_body(body: AsyncIterator[bytes], finish: Callable[[], None]) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        finish()
+
+
+class RequestProfiler:
+    """Per-request timelines, slow-request ring buffer and loop lag monitor."""
+
+    def __init__(
+        self,
+        *,
+        slow_request_seconds: float = DEFAULT_SLOW_REQUEST_SECONDS,
+        profile_all: bool = False,
+    ):
+        self.slow_request_seconds = slow_request_seconds
+        self.profile_all = profile_all
+        self.profiles: deque[Timeline] = deque(maxlen=PROFILE_HISTORY)
+        self.slow_requests: deque[dict[str, Any]] = deque(maxlen=SLOW_REQUEST_HISTORY)
+        self.loop_lag = LoopLagMonitor()
+
+    @classmethod
+    def from_env(cls) -> RequestProfiler:
+        threshold = os.environ.get(SLOW_REQUEST_ENV, "").strip()
+        return cls(
+            slow_request_seconds=float(threshold) if threshold else DEFAULT_SLOW_REQUEST_SECONDS,
+            profile_all=os.environ.get(PROFILE_ALL_ENV, "").strip().lower() in {"1", "true", "yes"},
+        )
+
+    def wants_profile(self, request) -> bool:
+        flag = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+        return self.profile_all or (flag or "").strip().lower() in {"1", "true", "yes"}
+
+    async def dispatch(self, request, call_next: Callable[[Any], Awaitable[Any]]):
+        """Starlette `http` middleware body."""
+        timeline = None
+        if self.wants_profile(request):
+            timeline = Timeline(method=request.method, path=request.url.path)
+        token = _timeline.set(timeline)
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _timeline.reset(token)
+
+        if timeline is not None:
+            self.profiles.append(timeline)
+            response.headers["server-timing"] = timeline.server_timing()
+            response.headers["x-profile-id"] = timeline.id
+
+        def finish() -> None:
+            duration = time.perf_counter() - started
+            if duration < self.slow_request_seconds:
+                return
+            self.slow_requests.append(
+                {
+                    "id": timeline.id if timeline else uuid.uuid4().hex[:16],
+                    "method": request.method,
+                    "path": request.url.path,
+                    "query": str(request.url.query),
+                    "status_code": response.status_code,
+                    "started_at": started_at,
+                    "duration_seconds": round(duration, 6),
+                    "max_loop_lag_seconds": self.loop_lag.max_between(started_at, time.time()),
+                    "timeline": timeline.to_dict() if timeline else None,
+                }
+            )
+
+        body = getattr(response, "body_iterator", None)
+        if body is None:
+            finish()
+        else:
+            # Headers are back, but a streamed body may take much longer.
+            response.body_iterator = _timed_body(body, finish)
+        return response
+
+    def profile(self, profile_id: str) -> Timeline | None:
+        for timeline in self.profiles:
+            if timeline.id == profile_id:
+                return timeline
+        return None
@@ -0,0 +1,216 @@
+"""Outbound proxy pool: health-scored proxies, each with its own connection pool.
+
+With `JOB_SCRAPER_PROXIES` set to a comma-separated list of proxy URLs, every
+scraper request goes out through one of them. Each proxy keeps a persistent
+connection pool, so connections made through it are reused by later requests.
+A request takes the better-scoring of two random proxies in rotation; a
+proxy's score is the square of its smoothed success rate over its smoothed
+latency, divided among its requests in flight, so unreliable proxies lose to
+merely slow ones.
+
+A proxy answered with `429`, or failing `EVICT_AFTER_FAILURES` times in a row,
+leaves the rotation for a cooldown: the 429's `Retry-After`, else
+`BASE_COOLDOWN` doubling with each eviction until the proxy succeeds again.
+Requests hit by a 429 or a failed connection are retried on another proxy.
+
+Requests carrying a `proxy_session` extension stay on the proxy their session
+first went out through, so a Glassdoor token and the searches made with it
+share one exit address. If that proxy is evicted, the session moves.
+
+The pool is per worker process; `snapshot()` is served at `/debug/proxies`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+import httpx
+
+PROXIES_ENV = "JOB_SCRAPER_PROXIES"
+# Request extension naming the session a request belongs to.
+PROXY_SESSION = "proxy_session"
+
+# Weight of the newest sample in a proxy's smoothed latency and success rate.
+SMOOTHING = 0.3
+# Added to latencies so an untimed proxy scores high but not infinitely so.
+LATENCY_FLOOR = 0.05
+EVICT_AFTER_FAILURES = 3
+BASE_COOLDOWN = 30.0
+MAX_COOLDOWN = 15 * 60.0
+MAX_ATTEMPTS = 3
+MAX_PINNED_SESSIONS = 1_000
+# Failures that happen before a request reaches the board, so it is safe to resend.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ProxyError)
+
+TransportFactory = Callable[[str], httpx.AsyncBaseTransport]
+
+
+def _proxy_transport(url: str) -> httpx.AsyncBaseTransport:
+    return httpx.AsyncHTTPTransport(proxy=url)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after", "").strip()
+    return float(value) if value.isdigit() else None
+
+
+class Proxy:
+    """One outbound proxy with its connection pool and health."""
+
+    def __init__(self, url: str, transport: httpx.AsyncBaseTransport):
+        self.url = url
+        self.transport = transport
+        self.latency: float | None = None
+        self.success_rate = 1.0
+        self.failures = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.evictions = 0
+        self.evicted_until = 0.0
+        self._cooldown = BASE_COOLDOWN
+
+    @property
+    def score(self) -> float:
+        latency = (self.latency or 0.0) + LATENCY_FLOOR
+        return self.success_rate**2 / (latency * (1 + self.in_flight))
+
+    def available(self, now: float) -> bool:
+        return self.evicted_until <= now
+
+    def succeeded(self, elapsed: float) -> None:
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += SMOOTHING * (elapsed - self.latency)
+        self.success_rate += SMOOTHING * (1.0 - self.success_rate)
+        self.failures = 0
+        self._cooldown = BASE_COOLDOWN
+
+    def failed(self) -> bool:
+        """Record a failure; True once the proxy has failed too often in a row."""
+        self.success_rate -= SMOOTHING * self.success_rate
+        self.failures += 1
+        return self.failures >= EVICT_AFTER_FAILURES
+
+    def evict(self, cooldown: float | None = None) -> None:
+        if cooldown is None:
+            cooldown = self._cooldown
+            self._cooldown = min(self._cooldown * 2, MAX_COOLDOWN)
+        self.evicted_until = time.monotonic() + min(cooldown, MAX_COOLDOWN)
+        self.evictions += 1
+        self.failures = 0
+
+    def display_url(self) -> str:
+        """The URL without credentials."""
+        return str(httpx.URL(self.url).copy_with(userinfo=b""))
+
+
+class ProxyPool(httpx.AsyncBaseTransport):
+    """Transport sending each request through the best available proxy."""
+
+    def __init__(
+        self,
+        urls: Iterable[str] = (),
+        *,
+        transport_factory: TransportFactory = _proxy_transport,
+        rng: random.Random | None = None,
+    ):
+        self.proxies = [Proxy(url, transport_factory(url)) for url in dict.fromkeys(urls)]
+        self._pins: OrderedDict[str, Proxy] = OrderedDict()
+        self._random = rng or random.Random()
+
+    @classmethod
+    def from_env(cls) -> ProxyPool:
+        value = os.environ.get(PROXIES_ENV, "")
+        return cls(url.strip() for url in value.split(",") if url.strip())
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def choose(self, session: str | None = None, *, exclude: Iterable[Proxy] = ()) -> Proxy:
+        """Pick a proxy for a request of `session`, avoiding `exclude` if possible."""
+        now = time.monotonic()
+        exclude = set(exclude)
+        pinned = self._pins.get(session) if session is not None else None
+        if pinned is not None and pinned.available(now) and pinned not in exclude:
+            self._pins.move_to_end(session)
+            return pinned
+        untried = [proxy for proxy in self.proxies if proxy not in exclude] or self.proxies
+        candidates = [proxy for proxy in untried if proxy.available(now)]
+        if not candidates:
+            # Every proxy is cooling down; use the one due back first rather than fail.
+            candidates = [min(untried, key=lambda proxy: proxy.evicted_until)]
+        proxy = max(
+            self._random.sample(candidates, min(2, len(candidates))),
+            key=lambda proxy: proxy.score,
+        )
+        if session is not None:
+            self._pins[session] = proxy
+            self._pins.move_to_end(session)
+            while len(self._pins) > MAX_PINNED_SESSIONS:
+                self._pins.popitem(last=False)
+        return proxy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.proxies:
+            raise httpx.ProxyError("No proxies configured", request=request)
+        session = request.extensions.get(PROXY_SESSION)
+        attempts = min(MAX_ATTEMPTS, len(self.proxies))
+        tried: list[Proxy] = []
+        while True:
+            proxy = self.choose(session, exclude=tried)
+            tried.append(proxy)
+            last_attempt = len(tried) >= attempts
+            proxy.requests += 1
+            proxy.in_flight += 1
+            started = time.perf_counter()
+            try:
+                response = await proxy.transport.handle_async_request(request)
+            except httpx.TransportError as exc:
+                if proxy.failed():
+                    proxy.evict()
+                if last_attempt or not isinstance(exc, RETRYABLE_ERRORS):
+                    raise
+                continue
+            finally:
+                proxy.in_flight -= 1
+            if response.status_code == 429:
+                proxy.failed()
+                proxy.evict(_retry_after(response))
+                if not last_attempt:
+                    await response.aclose()
+                    continue
+            elif response.status_code >= 500:
+                if proxy.failed():
+                    proxy.evict()
+            else:
+                proxy.succeeded(time.perf_counter() - started)
+            return response
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(proxy.transport.aclose() for proxy in self.proxies))
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "pinned_sessions": len(self._pins),
+            "proxies": [
+                {
+                    "url": proxy.display_url(),
+                    "available": proxy.available(now),
+                    "score": round(proxy.score, 3),
+                    "latency_ms": None if proxy.latency is None else round(proxy.latency * 1000, 1),
+                    "success_rate": round(proxy.success_rate, 3),
+                    "requests": proxy.requests,
+                    "in_flight": proxy.in_flight,
+                    "evictions": proxy.evictions,
+                    "cooldown_seconds": round(max(proxy.evicted_until - now, 0.0), 1),
+                }
+                for proxy in self.proxies
+            ],
+        }
@@ -0,0 +1,103 @@
+"""Content negotiation for compressed JSON responses.
+
+Named to avoid shadowing the standard library `compression` package.
+
+gzip is always available. zstd is used when the standard library provides
+`compression.zstd` (Python 3.14+) or the `zstandard` package is installed, and
+brotli when the `brotli` package is installed. Bodies below `MIN_COMPRESS_SIZE`
+are sent as-is since compressing them costs more than it saves.
+"""
+
+from __future__ import annotations
+
+import gzip
+from typing import Callable
+
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _load_zstd() -> Callable[[bytes], bytes] | None:
+    try:
+        from compression import zstd
+    except ImportError:
+        pass
+    else:
+        return lambda body: zstd.compress(body, level=ZSTD_LEVEL)
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor.compress
+
+
+def _load_brotli() -> Callable[[bytes], bytes] | None:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _available_encoders() -> dict[str, Callable[[bytes], bytes]]:
+    # Insertion order is the server preference used to break q-value ties.
+    encoders: dict[str, Callable[[bytes], bytes]] = {}
+    for name, loader in (("zstd", _load_zstd), ("br", _load_brotli)):
+        encoder = loader()
+        if encoder is not None:
+            encoders[name] = encoder
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+ENCODERS = _available_encoders()
+
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[token] = quality
+    return weights
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Pick the best encoding the client accepts, or None for identity."""
+    if not accept_encoding:
+        return None
+    weights = _parse_accept_encoding(accept_encoding)
+    wildcard = weights.get("*", 0.0)
+    best: tuple[float, str] | None = None
+    for name in ENCODERS:
+        quality = weights.get(name, wildcard)
+        if quality > 0 and (best is None or quality > best[0]):
+            best = (quality, name)
+    return best[1] if best else None
+
+
+def compress(body: bytes, accept_encoding: str | None) -> tuple[bytes, str | None]:
+    """Return `(body, encoding)`, compressing only when worthwhile and accepted."""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    encoding = negotiate(accept_encoding)
+    if encoding is None:
+        return body, None
+    return ENCODERS[encoding](body), encoding
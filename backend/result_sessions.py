@@ -0,0 +1,269 @@
+"""Retained scrape results served page by page with opaque cursors.
+
+`/scrape` stores its full result set here and returns only the first page plus
+a result id. Further pages, sorts and filters are computed server-side from
+the retained rows, so the payload per request stays at one page no matter how
+large `limit` is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from shared_state import SharedState
+
+DEFAULT_SESSION_TTL = 900.0
+DEFAULT_MAX_SESSIONS = 256
+SORTABLE_COLUMNS = ("title", "company", "location", "source")
+MAX_VIEWS_PER_SESSION = 8
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor cannot be decoded or belongs to another result."""
+
+
+@dataclass(frozen=True)
+class ResultView:
+    """A sort/filter combination over a session's rows."""
+
+    sort: str | None = None
+    descending: bool = False
+    sources: tuple[str, ...] = ()
+    text: str | None = None
+
+    def apply(self, rows: Sequence[dict[str, Any]]) -> list[int]:
+        """Return the row indices visible in this view, in order."""
+        indices = range(len(rows))
+        if self.sources:
+            indices = [index for index in indices if rows[index].get("source") in self.sources]
+        if self.text:
+            needle = self.text.lower()
+            indices = [
+                index
+                for index in indices
+                if any(
+                    needle in (rows[index].get(column) or "").lower()
+                    for column in ("title", "company", "location")
+                )
+            ]
+        indices = list(indices)
+        if self.sort:
+            # Missing values always sort last; the sort is stable so ties keep
+            # the original (merge) order.
+            present = [index for index in indices if rows[index].get(self.sort)]
+            missing = [index for index in indices if not rows[index].get(self.sort)]
+            present.sort(
+                key=lambda index: rows[index][self.sort].lower(),
+                reverse=self.descending,
+            )
+            indices = present + missing
+        return indices
+
+
+@dataclass
+class ResultPage:
+    rows: list[dict[str, Any]]
+    total_rows: int
+    next_cursor: str | None
+    view: ResultView
+
+
+@dataclass
+class ResultSession:
+    id: str
+    rows: list[dict[str, Any]]
+    meta: dict[str, Any]
+    expires_at: float
+    source_counts: dict[str, int] = field(default_factory=dict)
+    _views: OrderedDict[ResultView, list[int]] = field(default_factory=OrderedDict, repr=False)
+
+    def view_indices(self, view: ResultView) -> list[int]:
+        indices = self._views.get(view)
+        if indices is None:
+            indices = view.apply(self.rows)
+            self._views[view] = indices
+            while len(self._views) > MAX_VIEWS_PER_SESSION:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(view)
+        return indices
+
+
+def fingerprint(rows: Sequence[dict[str, Any]], meta: dict[str, Any]) -> str:
+    """Content hash of a result set, independent of the order rows arrived in."""
+    normalized = sorted(
+        json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+        for row in rows
+    )
+    digest = hashlib.sha256()
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode())
+    for row in normalized:
+        digest.update(b"\n")
+        digest.update(row.encode())
+    return digest.hexdigest()[:32]
+
+
+def encode_cursor(session_id: str, view: ResultView, offset: int) -> str:
+    payload = {
+        "r": session_id,
+        "o": offset,
+        "s": view.sort,
+        "d": view.descending,
+        "f": list(view.sources),
+        "q": view.text,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(session_id: str, cursor: str) -> tuple[ResultView, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        view = ResultView(
+            sort=payload["s"],
+            descending=bool(payload["d"]),
+            sources=tuple(payload["f"]),
+            text=payload["q"],
+        )
+        offset = int(payload["o"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Malformed cursor") from None
+    if payload["r"] != session_id or offset < 0:
+        raise InvalidCursorError("Cursor does not belong to this result")
+    return view, offset
+
+
+class ResultSessionStore:
+    """In-process LRU of result sessions, optionally backed by shared state.
+
+    With a `SharedState` the rows are also written to the shared SQLite file,
+    so a page request routed to a different worker can still be served. Those
+    writes and reads run in a thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_SESSION_TTL,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        shared_state: SharedState | None = None,
+    ):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.shared_state = shared_state
+        self._sessions: OrderedDict[str, ResultSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def create(
+        self,
+        rows: list[dict[str, Any]],
+        *,
+        identity: dict[str, Any] | None = None,
+        **meta: Any,
+    ) -> ResultSession:
+        """Retain `rows`; identical results map to the same session id.
+
+        `identity` replaces `meta` in the fingerprint when only part of the
+        metadata (e.g. a canonical query key) should distinguish results.
+        """
+        session_id = fingerprint(rows, meta if identity is None else identity)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            existing = self._sessions.get(session_id)
+            if existing is not None:
+                # Same content: keep the stored rows and their cached views,
+                # but take the new metadata (e.g. a refreshed `fetched_at`).
+                existing.expires_at = expires_at
+                existing.meta = meta
+                self._sessions.move_to_end(session_id)
+        session = existing or self._build(session_id, rows, meta, expires_at)
+        if self.shared_state is not None:
+            await asyncio.to_thread(
+                self.shared_state.put_result,
+                self._shared_key(session.id),
+                {"rows": rows, "meta": meta, "expires_at": session.expires_at},
+                ttl=self.ttl,
+            )
+        if existing is None:
+            self._remember(session)
+        return session
+
+    async def get(self, session_id: str) -> ResultSession | None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                if session.expires_at <= time.time():
+                    del self._sessions[session_id]
+                    return None
+                self._sessions.move_to_end(session_id)
+                return session
+        if self.shared_state is None:
+            return None
+        stored = await asyncio.to_thread(self.shared_state.get_result, self._shared_key(session_id))
+        if stored is None:
+            return None
+        session = self._build(session_id, stored["rows"], stored["meta"], stored["expires_at"])
+        self._remember(session)
+        return session
+
+    def page(
+        self,
+        session: ResultSession,
+        *,
+        page_size: int,
+        cursor: str | None = None,
+        view: ResultView | None = None,
+    ) -> ResultPage:
+        """Return one page; a cursor carries its own view and overrides `view`."""
+        offset = 0
+        if cursor:
+            view, offset = decode_cursor(session.id, cursor)
+        view = view or ResultView()
+        indices = session.view_indices(view)
+        end = offset + page_size
+        next_cursor = encode_cursor(session.id, view, end) if end < len(indices) else None
+        return ResultPage(
+            rows=[session.rows[index] for index in indices[offset:end]],
+            total_rows=len(indices),
+            next_cursor=next_cursor,
+            view=view,
+        )
+
+    @staticmethod
+    def _build(
+        session_id: str,
+        rows: list[dict[str, Any]],
+        meta: dict[str, Any],
+        expires_at: float,
+    ) -> ResultSession:
+        counts: dict[str, int] = {}
+        for row in rows:
+            counts[row["source"]] = counts.get(row["source"], 0) + 1
+        return ResultSession(
+            id=session_id,
+            rows=rows,
+            meta=meta,
+            expires_at=expires_at,
+            source_counts=counts,
+        )
+
+    def _remember(self, session: ResultSession) -> None:
+        with self._lock:
+            self._sessions[session.id] = session
+            self._sessions.move_to_end(session.id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    @staticmethod
+    def _shared_key(session_id: str) -> str:
+        return f"session:{session_id}"
@@ -1,9 +1,18 @@
-"""Scraper implementations for backend job sourcing."""
+"""Scraper implementations for backend job sourcing.
+
+Board-specific scrapers are imported lazily (see `registry`), so importing
+this package does not pull in BeautifulSoup or any scraper module.
+"""
 
 from .base_scraper import BaseJobScraper, JobRecord
-from .glassdoor_scraper import GlassdoorScraper
-from .indeed_scraper import IndeedScraper
-from .linkedin_scraper import LinkedInScraper
+from .query import NO_FILTERS, SearchFilters, SearchQuery
+from .registry import SCRAPER_REGISTRY, ScraperRegistry, register_scraper
+
+_LAZY_EXPORTS = {
+    "GlassdoorScraper": "glassdoor",
+    "IndeedScraper": "indeed",
+    "LinkedInScraper": "linkedin",
+}
 
 __all__ = [
     "BaseJobScraper",
@@ -11,5 +20,16 @@ __all__ = [
     "GlassdoorScraper",
     "IndeedScraper",
     "LinkedInScraper",
+    "NO_FILTERS",
+    "SCRAPER_REGISTRY",
+    "SearchFilters",
+    "SearchQuery",
+    "ScraperRegistry",
+    "register_scraper",
 ]
 
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return SCRAPER_REGISTRY.get(_LAZY_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from contextlib import aclosing
 from dataclasses import asdict, dataclass
-from typing import Any, Iterable
+from typing import Any, AsyncIterator, Iterable
 
 import httpx
 
+from .query import SearchFilters, SearchQuery
+
 
 @dataclass
 class JobRecord:
@@ -27,6 +30,42 @@ class BaseJobScraper(ABC):
         self.client = client
 
     @abstractmethod
+    def stream(
+        self,
+        *,
+        role: str,
+        location: str | None,
+        country: str,
+        limit: int,
+        filters: SearchFilters | None = None,
+    ) -> AsyncIterator[list[JobRecord]]:
+        """Yield JobRecord pages for the given query until the board runs dry.
+
+        `limit` is the number of rows the caller expects to need and is used to
+        size upstream pages. Callers stop iterating once they have enough rows,
+        so no further pages are requested than are consumed. `filters` should
+        be mapped onto the board's own query parameters; the manager only
+        passes it when a filter is set, so scrapers written before filters
+        existed keep working for unfiltered searches.
+        """
+
+    async def warm_up(self) -> None:
+        """Open a connection to the board ahead of the first search.
+
+        Called by `JobScraperManager.warm_up` when the process starts; the
+        default does nothing.
+        """
+
+    @staticmethod
+    def parse_query(
+        role: str,
+        location: str | None,
+        country: str,
+        filters: SearchFilters | None = None,
+    ) -> SearchQuery:
+        """Canonical form of a search. Parses are memoized and shared by all scrapers."""
+        return SearchQuery.parse(role, location, country, filters=filters)
+
     async def fetch(
         self,
         *,
@@ -34,18 +73,37 @@ class BaseJobScraper(ABC):
         location: str | None,
         country: str,
         limit: int,
+        filters: SearchFilters | None = None,
     ) -> list[JobRecord]:
         """Return up to `limit` JobRecord entries for the given query."""
+        seen: set[tuple[str, str, str]] = set()
+        jobs: list[JobRecord] = []
+        extra = {"filters": filters} if filters else {}
+        pages = self.stream(role=role, location=location, country=country, limit=limit, **extra)
+        async with aclosing(pages):
+            async for page in pages:
+                for record in page:
+                    key = self._dedupe_key(record)
+                    if key not in seen:
+                        seen.add(key)
+                        jobs.append(record)
+                if len(jobs) >= limit:
+                    break
+        return jobs[:limit]
 
     @staticmethod
-    def _dedupe(records: Iterable[JobRecord]) -> list[JobRecord]:
+    def _dedupe_key(record: JobRecord) -> tuple[str, str, str]:
+        return (record.title, record.company, record.url)
+
+    @classmethod
+    def _dedupe(cls, records: Iterable[JobRecord]) -> list[JobRecord]:
         """Remove duplicate entries using (title, company, url)."""
         seen: set[tuple[str, str, str]] = set()
         unique: list[JobRecord] = []
         for record in records:
-            key = (record.title, record.company, record.url)
+            key = cls._dedupe_key(record)
             if key in seen:
                 continue
             seen.add(key)
             unique.append(record)
-        return unique
\ No newline at end of file
+        return unique
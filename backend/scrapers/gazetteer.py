@@ -0,0 +1,493 @@
+"""Offline gazetteer: resolves free-text locations to structured places.
+
+Both a search's location and every job's location resolve against the same
+bundled index of countries, regions (states, provinces, nations) and major
+cities, so scrapers can decide whether a job lies inside the searched area
+instead of guessing from shared words. Every name and alias is indexed once
+when the module loads; resolving a location is a few dictionary lookups.
+
+Text is read the way job boards write it: "Austin, TX 78701", "Sydney NSW",
+"Remote in Berlin", "San Francisco Bay Area" and "Munich, Bavaria, Germany"
+all resolve. Postal codes and filler words ("greater", "area", "hybrid") are
+ignored. Ambiguous names ("Portland", "Birmingham") prefer the searched
+country, then the enclosing parts ("Portland, ME"). A location with words the
+index does not know resolves only to its known enclosing place, and
+`matches` then answers `None` (undecided) where the unknown part matters.
+
+Adding a place only means adding data to `PLACES`.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Literal, Mapping
+
+PlaceKind = Literal["country", "region", "city"]
+
+# Specific places win over the areas that share their name ("New York").
+KIND_ORDER: dict[str, int] = {"city": 0, "region": 1, "country": 2}
+# Words boards put around a place name; skipped unless they are a name.
+NOISE_WORDS = frozenset(
+    {
+        "greater", "metropolitan", "metro", "area", "region", "bay", "remote",
+        "hybrid", "work", "in", "temporarily", "from", "home", "and", "of", "the",
+    }
+)
+# City coordinates are centroids; jobs on a city's edge sit further out.
+CENTROID_SLACK_MILES = 10
+EARTH_RADIUS_MILES = 3958.8
+
+# Per country: its names, its regions (display name first, then aliases) and
+# its cities as (name, region, latitude, longitude, *aliases).
+PLACES: list[dict[str, Any]] = [
+    {
+        "key": "usa",
+        "names": ["United States", "USA", "US", "United States of America", "America"],
+        "regions": [
+            ("Alabama", "AL"), ("Alaska", "AK"), ("Arizona", "AZ"), ("Arkansas", "AR"),
+            ("California", "CA"), ("Colorado", "CO"), ("Connecticut", "CT"),
+            ("Delaware", "DE"), ("District of Columbia", "DC"), ("Florida", "FL"),
+            ("Georgia", "GA"), ("Hawaii", "HI"), ("Idaho", "ID"), ("Illinois", "IL"),
+            ("Indiana", "IN"), ("Iowa", "IA"), ("Kansas", "KS"), ("Kentucky", "KY"),
+            ("Louisiana", "LA"), ("Maine", "ME"), ("Maryland", "MD"),
+            ("Massachusetts", "MA"), ("Michigan", "MI"), ("Minnesota", "MN"),
+            ("Mississippi", "MS"), ("Missouri", "MO"), ("Montana", "MT"),
+            ("Nebraska", "NE"), ("Nevada", "NV"), ("New Hampshire", "NH"),
+            ("New Jersey", "NJ"), ("New Mexico", "NM"), ("New York", "NY"),
+            ("North Carolina", "NC"), ("North Dakota", "ND"), ("Ohio", "OH"),
+            ("Oklahoma", "OK"), ("Oregon", "OR"), ("Pennsylvania", "PA"),
+            ("Rhode Island", "RI"), ("South Carolina", "SC"), ("South Dakota", "SD"),
+            ("Tennessee", "TN"), ("Texas", "TX"), ("Utah", "UT"), ("Vermont", "VT"),
+            ("Virginia", "VA"), ("Washington", "WA"), ("West Virginia", "WV"),
+            ("Wisconsin", "WI"), ("Wyoming", "WY"),
+        ],
+        "cities": [
+            ("New York", "NY", 40.71, -74.01, "New York City", "NYC", "Manhattan",
+             "Brooklyn", "Queens", "Bronx", "Staten Island"),
+            ("Los Angeles", "CA", 34.05, -118.24),
+            ("Chicago", "IL", 41.88, -87.63),
+            ("Houston", "TX", 29.76, -95.37),
+            ("Phoenix", "AZ", 33.45, -112.07),
+            ("Philadelphia", "PA", 39.95, -75.17),
+            ("San Antonio", "TX", 29.42, -98.49),
+            ("San Diego", "CA", 32.72, -117.16),
+            ("Dallas", "TX", 32.78, -96.80),
+            ("San Jose", "CA", 37.34, -121.89),
+            ("Austin", "TX", 30.27, -97.74),
+            ("Jacksonville", "FL", 30.33, -81.66),
+            ("Fort Worth", "TX", 32.76, -97.33),
+            ("Columbus", "OH", 39.96, -83.00),
+            ("Charlotte", "NC", 35.23, -80.84),
+            ("Indianapolis", "IN", 39.77, -86.16),
+            ("San Francisco", "CA", 37.77, -122.42, "SF"),
+            ("Seattle", "WA", 47.61, -122.33),
+            ("Denver", "CO", 39.74, -104.99),
+            ("Washington", "DC", 38.91, -77.04, "Washington DC"),
+            ("Nashville", "TN", 36.16, -86.78),
+            ("Boston", "MA", 42.36, -71.06),
+            ("Portland", "OR", 45.52, -122.68),
+            ("Las Vegas", "NV", 36.17, -115.14),
+            ("Detroit", "MI", 42.33, -83.05),
+            ("Atlanta", "GA", 33.75, -84.39),
+            ("Miami", "FL", 25.76, -80.19),
+            ("Minneapolis", "MN", 44.98, -93.27),
+            ("Raleigh", "NC", 35.78, -78.64),
+            ("Durham", "NC", 35.99, -78.90),
+            ("Winston-Salem", "NC", 36.10, -80.24),
+            ("Salt Lake City", "UT", 40.76, -111.89),
+            ("Pittsburgh", "PA", 40.44, -80.00),
+            ("Baltimore", "MD", 39.29, -76.61),
+            ("St. Louis", "MO", 38.63, -90.20, "Saint Louis"),
+            ("Kansas City", "MO", 39.10, -94.58),
+            ("Tampa", "FL", 27.95, -82.46),
+            ("Orlando", "FL", 28.54, -81.38),
+            ("Sacramento", "CA", 38.58, -121.49),
+            ("Oakland", "CA", 37.80, -122.27),
+            ("Palo Alto", "CA", 37.44, -122.14),
+            ("Mountain View", "CA", 37.39, -122.08),
+            ("Sunnyvale", "CA", 37.37, -122.04),
+            ("Santa Clara", "CA", 37.35, -121.96),
+            ("Irvine", "CA", 33.68, -117.83),
+            ("Redmond", "WA", 47.67, -122.12),
+            ("Bellevue", "WA", 47.61, -122.20),
+            ("Cambridge", "MA", 42.37, -71.11),
+            ("Jersey City", "NJ", 40.72, -74.08),
+            ("Newark", "NJ", 40.74, -74.17),
+            ("Plano", "TX", 33.02, -96.70),
+            ("Cleveland", "OH", 41.50, -81.69),
+            ("Cincinnati", "OH", 39.10, -84.51),
+            ("Madison", "WI", 43.07, -89.40),
+            ("Milwaukee", "WI", 43.04, -87.91),
+            ("Boulder", "CO", 40.01, -105.27),
+            ("Richmond", "VA", 37.54, -77.44),
+            ("Arlington", "VA", 38.88, -77.10),
+            ("New Orleans", "LA", 29.95, -90.07),
+            ("Honolulu", "HI", 21.31, -157.86),
+            ("Anchorage", "AK", 61.22, -149.90),
+            ("Albuquerque", "NM", 35.08, -106.65),
+            ("Omaha", "NE", 41.26, -95.93),
+            ("Boise", "ID", 43.62, -116.20),
+            ("Des Moines", "IA", 41.59, -93.62),
+            ("Hartford", "CT", 41.76, -72.69),
+            ("Providence", "RI", 41.82, -71.41),
+            ("Louisville", "KY", 38.25, -85.76),
+            ("Memphis", "TN", 35.15, -90.05),
+            ("Oklahoma City", "OK", 35.47, -97.52),
+            ("Birmingham", "AL", 33.52, -86.80),
+            ("Charleston", "SC", 32.78, -79.93),
+            ("Portland", "ME", 43.66, -70.26),
+        ],
+    },
+    {
+        "key": "canada",
+        "names": ["Canada"],
+        "regions": [
+            ("Ontario", "ON"), ("Quebec", "QC"), ("British Columbia", "BC"),
+            ("Alberta", "AB"), ("Manitoba", "MB"), ("Saskatchewan", "SK"),
+            ("Nova Scotia", "NS"), ("New Brunswick", "NB"),
+            ("Newfoundland and Labrador", "NL"), ("Prince Edward Island", "PE"),
+            ("Yukon", "YT"), ("Northwest Territories", "NT"), ("Nunavut", "NU"),
+        ],
+        "cities": [
+            ("Toronto", "ON", 43.65, -79.38),
+            ("Montreal", "QC", 45.50, -73.57),
+            ("Vancouver", "BC", 49.28, -123.12),
+            ("Calgary", "AB", 51.05, -114.07),
+            ("Edmonton", "AB", 53.55, -113.49),
+            ("Ottawa", "ON", 45.42, -75.70),
+            ("Winnipeg", "MB", 49.90, -97.14),
+            ("Quebec City", "QC", 46.81, -71.21),
+            ("Hamilton", "ON", 43.26, -79.87),
+            ("Mississauga", "ON", 43.59, -79.64),
+            ("Kitchener", "ON", 43.45, -80.49),
+            ("Waterloo", "ON", 43.46, -80.52),
+            ("Halifax", "NS", 44.65, -63.58),
+            ("Victoria", "BC", 48.43, -123.37),
+        ],
+    },
+    {
+        "key": "uk",
+        "names": ["United Kingdom", "UK", "Great Britain", "Britain", "GB"],
+        "regions": [("England",), ("Scotland",), ("Wales",), ("Northern Ireland",)],
+        "cities": [
+            ("London", "England", 51.51, -0.13, "City of London"),
+            ("Manchester", "England", 53.48, -2.24),
+            ("Birmingham", "England", 52.49, -1.89),
+            ("Leeds", "England", 53.80, -1.55),
+            ("Liverpool", "England", 53.41, -2.98),
+            ("Bristol", "England", 51.45, -2.59),
+            ("Sheffield", "England", 53.38, -1.47),
+            ("Newcastle upon Tyne", "England", 54.98, -1.62, "Newcastle"),
+            ("Nottingham", "England", 52.95, -1.15),
+            ("Leicester", "England", 52.64, -1.13),
+            ("Cambridge", "England", 52.21, 0.12),
+            ("Oxford", "England", 51.75, -1.26),
+            ("Reading", "England", 51.45, -0.98),
+            ("Brighton", "England", 50.82, -0.14),
+            ("Southampton", "England", 50.91, -1.40),
+            ("Milton Keynes", "England", 52.04, -0.76),
+            ("Edinburgh", "Scotland", 55.95, -3.19),
+            ("Glasgow", "Scotland", 55.86, -4.25),
+            ("Cardiff", "Wales", 51.48, -3.18),
+            ("Belfast", "Northern Ireland", 54.60, -5.93),
+        ],
+    },
+    {
+        "key": "germany",
+        "names": ["Germany", "Deutschland"],
+        "regions": [
+            ("Baden-Württemberg",), ("Bavaria", "Bayern"), ("Berlin",),
+            ("Brandenburg",), ("Bremen",), ("Hamburg",), ("Hesse", "Hessen"),
+            ("Mecklenburg-Vorpommern", "Mecklenburg-Western Pomerania"),
+            ("Lower Saxony", "Niedersachsen"),
+            ("North Rhine-Westphalia", "Nordrhein-Westfalen", "NRW"),
+            ("Rhineland-Palatinate", "Rheinland-Pfalz"), ("Saarland",),
+            ("Saxony", "Sachsen"), ("Saxony-Anhalt", "Sachsen-Anhalt"),
+            ("Schleswig-Holstein",), ("Thuringia", "Thüringen"),
+        ],
+        "cities": [
+            ("Berlin", "Berlin", 52.52, 13.40),
+            ("Hamburg", "Hamburg", 53.55, 9.99),
+            ("Munich", "Bavaria", 48.14, 11.58, "München", "Muenchen"),
+            ("Cologne", "NRW", 50.94, 6.96, "Köln", "Koeln"),
+            ("Frankfurt am Main", "Hesse", 50.11, 8.68, "Frankfurt"),
+            ("Stuttgart", "Baden-Württemberg", 48.78, 9.18),
+            ("Düsseldorf", "NRW", 51.23, 6.77, "Duesseldorf"),
+            ("Leipzig", "Saxony", 51.34, 12.37),
+            ("Dortmund", "NRW", 51.51, 7.47),
+            ("Essen", "NRW", 51.46, 7.01),
+            ("Bremen", "Bremen", 53.08, 8.80),
+            ("Dresden", "Saxony", 51.05, 13.74),
+            ("Hanover", "Lower Saxony", 52.38, 9.73, "Hannover"),
+            ("Nuremberg", "Bavaria", 49.45, 11.08, "Nürnberg", "Nuernberg"),
+            ("Karlsruhe", "Baden-Württemberg", 49.01, 8.40),
+            ("Mannheim", "Baden-Württemberg", 49.49, 8.47),
+            ("Heidelberg", "Baden-Württemberg", 49.40, 8.67),
+            ("Bonn", "NRW", 50.74, 7.10),
+            ("Potsdam", "Brandenburg", 52.39, 13.06),
+        ],
+    },
+    {
+        "key": "france",
+        "names": ["France"],
+        "regions": [
+            ("Île-de-France", "IDF"), ("Auvergne-Rhône-Alpes",),
+            ("Provence-Alpes-Côte d'Azur", "PACA"), ("Occitanie", "Occitania"),
+            ("Nouvelle-Aquitaine",), ("Hauts-de-France",), ("Grand Est",),
+            ("Bretagne", "Brittany"), ("Normandie", "Normandy"),
+            ("Pays de la Loire",), ("Centre-Val de Loire",),
+            ("Bourgogne-Franche-Comté",), ("Corse", "Corsica"),
+        ],
+        "cities": [
+            ("Paris", "IDF", 48.86, 2.35),
+            ("La Défense", "IDF", 48.89, 2.24),
+            ("Boulogne-Billancourt", "IDF", 48.84, 2.24),
+            ("Nanterre", "IDF", 48.89, 2.21),
+            ("Marseille", "PACA", 43.30, 5.37),
+            ("Nice", "PACA", 43.70, 7.27),
+            ("Lyon", "Auvergne-Rhône-Alpes", 45.76, 4.84),
+            ("Grenoble", "Auvergne-Rhône-Alpes", 45.19, 5.72),
+            ("Toulouse", "Occitanie", 43.60, 1.44),
+            ("Montpellier", "Occitanie", 43.61, 3.88),
+            ("Nantes", "Pays de la Loire", 47.22, -1.55),
+            ("Strasbourg", "Grand Est", 48.57, 7.75),
+            ("Bordeaux", "Nouvelle-Aquitaine", 44.84, -0.58),
+            ("Lille", "Hauts-de-France", 50.63, 3.06),
+            ("Rennes", "Bretagne", 48.11, -1.68),
+        ],
+    },
+    {
+        "key": "india",
+        "names": ["India", "Bharat"],
+        "regions": [
+            ("Karnataka",), ("Maharashtra",), ("Telangana",), ("Tamil Nadu",),
+            ("Delhi", "NCT of Delhi"), ("Haryana",), ("Uttar Pradesh",),
+            ("West Bengal",), ("Gujarat",), ("Kerala",), ("Rajasthan",),
+            ("Andhra Pradesh",), ("Punjab",), ("Madhya Pradesh",),
+        ],
+        "cities": [
+            ("Bengaluru", "Karnataka", 12.97, 77.59, "Bangalore"),
+            ("Mumbai", "Maharashtra", 19.08, 72.88, "Bombay"),
+            ("New Delhi", "Delhi", 28.61, 77.21, "Delhi"),
+            ("Hyderabad", "Telangana", 17.39, 78.49),
+            ("Chennai", "Tamil Nadu", 13.08, 80.27, "Madras"),
+            ("Pune", "Maharashtra", 18.52, 73.86),
+            ("Kolkata", "West Bengal", 22.57, 88.36, "Calcutta"),
+            ("Ahmedabad", "Gujarat", 23.02, 72.57),
+            ("Gurugram", "Haryana", 28.46, 77.03, "Gurgaon"),
+            ("Noida", "Uttar Pradesh", 28.54, 77.39),
+            ("Kochi", "Kerala", 9.93, 76.27, "Cochin"),
+            ("Thiruvananthapuram", "Kerala", 8.52, 76.94, "Trivandrum"),
+            ("Jaipur", "Rajasthan", 26.91, 75.79),
+            ("Coimbatore", "Tamil Nadu", 11.02, 76.96),
+            ("Indore", "Madhya Pradesh", 22.72, 75.86),
+        ],
+    },
+    {
+        "key": "australia",
+        "names": ["Australia"],
+        "regions": [
+            ("New South Wales", "NSW"), ("Victoria", "VIC"), ("Queensland", "QLD"),
+            ("Western Australia", "WA"), ("South Australia", "SA"),
+            ("Tasmania", "TAS"), ("Australian Capital Territory", "ACT"),
+            ("Northern Territory", "NT"),
+        ],
+        "cities": [
+            ("Sydney", "NSW", -33.87, 151.21),
+            ("Melbourne", "VIC", -37.81, 144.96),
+            ("Brisbane", "QLD", -27.47, 153.03),
+            ("Perth", "WA", -31.95, 115.86),
+            ("Adelaide", "SA", -34.93, 138.60),
+            ("Canberra", "ACT", -35.28, 149.13),
+            ("Hobart", "TAS", -42.88, 147.33),
+            ("Darwin", "NT", -12.46, 130.84),
+            ("Gold Coast", "QLD", -28.02, 153.40),
+            ("Newcastle", "NSW", -32.93, 151.78),
+            ("Parramatta", "NSW", -33.81, 151.00),
+            ("Geelong", "VIC", -38.15, 144.36),
+        ],
+    },
+]
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase, strip accents, drop dots and apostrophes and turn other
+    punctuation into spaces ("Île-de-France" -> "ile de france").
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[.']", "", text.lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def _has_digit(word: str) -> bool:
+    return any(char.isdigit() for char in word)
+
+
+@dataclass(frozen=True)
+class Place:
+    """A country, region or city; `path` runs from the country down to it."""
+
+    path: tuple[str, ...]
+    name: str
+    kind: PlaceKind
+    coordinates: tuple[float, float] | None = None
+
+    @property
+    def key(self) -> str:
+        return "/".join(self.path)
+
+    @property
+    def country(self) -> str:
+        return self.path[0]
+
+    def within(self, other: Place) -> bool:
+        """True if this place is `other` or lies inside it."""
+        return self.path[: len(other.path)] == other.path
+
+    def miles_to(self, other: Place) -> float | None:
+        if self.coordinates is None or other.coordinates is None:
+            return None
+        lat1, lon1 = map(math.radians, self.coordinates)
+        lat2, lon2 = map(math.radians, other.coordinates)
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+class Gazetteer:
+    """Name index over `PLACES`, resolving location text to places."""
+
+    def __init__(self, countries: Iterable[Mapping[str, Any]]):
+        self._index: dict[str, list[Place]] = {}
+        self._places: dict[str, Place] = {}
+        for entry in countries:
+            country_names = entry["names"]
+            country = self._add((entry["key"],), country_names[0], "country", country_names)
+            regions: dict[str, Place] = {}
+            for names in entry.get("regions", ()):
+                region = self._add(
+                    (*country.path, normalize_place(names[0])), names[0], "region", names
+                )
+                for name in names:
+                    regions[normalize_place(name)] = region
+            for name, region_name, latitude, longitude, *aliases in entry.get("cities", ()):
+                region = regions[normalize_place(region_name)]
+                self._add(
+                    (*region.path, normalize_place(name)),
+                    name,
+                    "city",
+                    [name, *aliases],
+                    coordinates=(latitude, longitude),
+                )
+        self._max_words = max(len(name.split()) for name in self._index)
+        # Job locations repeat across pages and searches. The cache belongs to
+        # this instance, so it neither outlives it nor mixes gazetteers.
+        self._located = lru_cache(maxsize=4096)(self._locate)
+
+    def _add(
+        self,
+        path: tuple[str, ...],
+        name: str,
+        kind: PlaceKind,
+        names: Iterable[str],
+        *,
+        coordinates: tuple[float, float] | None = None,
+    ) -> Place:
+        place = Place(path=path, name=name, kind=kind, coordinates=coordinates)
+        self._places[place.key] = place
+        for alias in names:
+            matches = self._index.setdefault(normalize_place(alias), [])
+            if place not in matches:
+                matches.append(place)
+        return place
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def get(self, key: str) -> Place | None:
+        """The place whose `key` is `key` ("usa/texas/austin")."""
+        return self._places.get(key)
+
+    def resolve(self, text: str, country: str | None = None) -> Place | None:
+        """The place `text` names, or None unless every word of it is known."""
+        place, exact = self.locate(text, country)
+        return place if exact else None
+
+    def locate(self, text: str, country: str | None = None) -> tuple[Place | None, bool]:
+        """The most specific place `text` names and whether all of it was known.
+
+        "Somerville, MA" gives (Massachusetts, False): the job is somewhere in
+        Massachusetts, but where is not known. `country` breaks ties between
+        places sharing a name.
+        """
+        return self._located(text, country)
+
+    def _locate(self, text: str, country: str | None) -> tuple[Place | None, bool]:
+        viable: list[Place] = []
+        exact = True
+        for part in reversed(text.split(",")):
+            # Postal codes ("78701", "EC2A", "75008") are never names.
+            words = [word for word in normalize_place(part).split() if not _has_digit(word)]
+            end = len(words)
+            while end > 0:
+                for size in range(min(self._max_words, end), 0, -1):
+                    name = " ".join(words[end - size:end])
+                    candidates = [
+                        place
+                        for place in self._index.get(name, ())
+                        if not viable or any(place.within(outer) for outer in viable)
+                    ]
+                    if candidates:
+                        viable = candidates
+                        end -= size
+                        break
+                else:
+                    # Unknown, or a name that contradicts the enclosing parts.
+                    if words[end - 1] not in NOISE_WORDS:
+                        exact = False
+                    end -= 1
+        if not viable:
+            return None, False
+        best = min(
+            viable,
+            key=lambda place: (place.country != country, KIND_ORDER[place.kind]),
+        )
+        return best, exact
+
+    def matches(
+        self,
+        area: Place,
+        text: str,
+        country: str | None = None,
+        *,
+        radius: int | None = None,
+    ) -> bool | None:
+        """Whether a job located at `text` lies in `area`; None when undecided.
+
+        With a `radius` (miles around a city `area`), known cities nearer than
+        that also match, and places the radius may reach are left undecided.
+        """
+        place, exact = self.locate(text, country)
+        if place is None:
+            return None
+        if place.within(area):
+            return True
+        if radius is not None:
+            distance = place.miles_to(area)
+            if exact and distance is not None:
+                return distance <= radius + CENTROID_SLACK_MILES
+            return None
+        if not exact and area.within(place):
+            # "Somerville, MA" for a Boston search: inside MA, maybe not Boston.
+            return None
+        return False
+
+
+GAZETTEER = Gazetteer(PLACES)
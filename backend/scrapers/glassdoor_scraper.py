@@ -1,19 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
 import re
-from typing import Any
+import time
+from typing import Any, AsyncIterator
 from urllib.parse import quote
 
 import httpx
 
+from profiling import stage
+from proxy_pool import PROXY_SESSION
+
 from .base_scraper import BaseJobScraper, JobRecord
+from .query import SearchFilters, SearchQuery
 
 FALLBACK_TOKEN = (
     "Ft6oHEWlRZrxDww95Cpazw:0pGUrkb2y3TyOpAIqF2vbPmUXoXVkD3oEGDVkvfeCerceQ5-n8mBg3BovySUIjmCPHCaW0H2nQVdqzbtsYqf4Q:"
     "wcqRqeegRUa9MVLJGyujVXB7vWFPjdaS1CtrrzJq-ok"
 )
 
+# Tokens prefetched by `warm_up`, per Glassdoor domain: (token, expires at).
+WARM_TOKEN_TTL = 30 * 60
+WARM_TOKENS: dict[str, tuple[str, float]] = {}
+_SESSION_IDS = itertools.count()
+# Whether each Glassdoor domain honors page numbers sent without a cursor:
+# (honored, expires at). Shared by every instance, since each crawl builds a
+# new scraper; the answer expires so the probe is re-run now and then.
+PAGE_NUMBER_PROBE_TTL = 6 * 3600
+PAGE_NUMBERS_HONORED: dict[str, tuple[bool, float]] = {}
+
+MAX_PAGES = 5
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 30
+
 DEFAULT_LOCATION_ID = 11047
 DEFAULT_LOCATION_TYPE = "STATE"
 LOCATION_TYPE_MAP = {
@@ -21,6 +42,24 @@ LOCATION_TYPE_MAP = {
     "S": "STATE",
     "N": "COUNTRY",
 }
+# Glassdoor city ids for gazetteer places (by `Place.key`), as they appear in
+# Glassdoor's own search URLs ("..._IC1147401.htm"). Searches for these skip
+# the location lookup.
+KNOWN_CITY_IDS = {
+    "usa/new york/new york": 1132348,
+    "usa/california/san francisco": 1147401,
+    "usa/california/los angeles": 1146821,
+    "usa/illinois/chicago": 1128808,
+    "usa/texas/austin": 1139761,
+    "usa/washington/seattle": 1150505,
+    "usa/massachusetts/boston": 1154532,
+    "uk/england/london": 2671300,
+    "canada/ontario/toronto": 2281069,
+    "germany/berlin/berlin": 2622109,
+    "france/ile de france/paris": 2881970,
+    "india/karnataka/bengaluru": 2940587,
+    "australia/new south wales/sydney": 2235932,
+}
 LOCATION_PARAM_PREFIX = {
     "CITY": "C",
     "STATE": "S",
@@ -47,7 +86,8 @@ QUERY_TEMPLATE = """
         $numJobsToShow: Int!,
         $pageNumber: Int,
         $pageCursor: String,
-        $parameterUrlInput: String
+        $parameterUrlInput: String,
+        $filterParams: [FilterParams]
     ) {
         jobListings(
             contextHolder: {
@@ -59,6 +99,7 @@ QUERY_TEMPLATE = """
                     pageNumber: $pageNumber,
                     pageCursor: $pageCursor,
                     parameterUrlInput: $parameterUrlInput,
+                    filterParams: $filterParams,
                     searchType: SR
                 }
             }
@@ -88,76 +129,217 @@ QUERY_TEMPLATE = """
 class GlassdoorScraper(BaseJobScraper):
     """GraphQL-focused scraper for the Glassdoor jobs endpoint."""
 
-    def __init__(self, client, *, domain: str):
+    def __init__(self, client, *, domain: str, pipelined: bool = True):
         super().__init__("glassdoor", client)
         self.base_url = f"https://{domain}"
+        # Pipelined mode resolves the token and location concurrently and asks
+        # for all the pages a search needs in one batched /graph POST.
+        self.pipelined = pipelined
+        # Token and location lookups are memoized per instance so batched
+        # searches sharing this scraper resolve them only once.
+        self._token_task: asyncio.Task[str] | None = None
+        self._location_tasks: dict[tuple[str, str | None], asyncio.Task[tuple[int, str | None]]] = {}
+        # Behind a proxy pool, a token only works from the address that fetched
+        # it, so every request of this instance names one proxy session.
+        self._proxy_session = f"glassdoor:{next(_SESSION_IDS)}"
 
-    async def fetch(
+    @property
+    def _page_numbers_honored(self) -> bool | None:
+        # Becomes False the first time Glassdoor ignores a page number sent
+        # without a cursor; later searches then go straight to cursor chaining.
+        known = PAGE_NUMBERS_HONORED.get(self.base_url)
+        if known is None or known[1] <= time.monotonic():
+            return None
+        return known[0]
+
+    @_page_numbers_honored.setter
+    def _page_numbers_honored(self, honored: bool) -> None:
+        PAGE_NUMBERS_HONORED[self.base_url] = (honored, time.monotonic() + PAGE_NUMBER_PROBE_TTL)
+
+    async def stream(
         self,
         *,
         role: str,
         location: str | None,
         country: str,
         limit: int,
-    ) -> list[JobRecord]:
-        csrf_token = await self._fetch_csrf_token()
-        location_id, location_type = await self._resolve_location(location, csrf_token)
+        filters: SearchFilters | None = None,
+    ) -> AsyncIterator[list[JobRecord]]:
+        query = self.parse_query(role, location, country, filters)
+        role = query.role
+        location = query.board_location or ("remote" if query.remote else None)
+        known_location = self._known_location(query)
+        if known_location:
+            csrf_token = await self._csrf_token()
+            location_id, location_type = known_location
+        elif self.pipelined:
+            # The location lookup does not depend on the session token, so it
+            # runs alongside the token fetch with the fallback token.
+            csrf_token, (location_id, location_type) = await asyncio.gather(
+                self._csrf_token(),
+                self._cached_location(location, None),
+            )
+        else:
+            csrf_token = await self._csrf_token()
+            location_id, location_type = await self._cached_location(location, csrf_token)
         if not location_type:
             raise RuntimeError("Glassdoor location lookup failed")
 
         headers = self._build_headers(csrf_token)
-        location_filter = location.strip() if location else None
-        filter_location_id = location_id if location_filter else None
-        cursor = None
-        page = 1
-        jobs: list[JobRecord] = []
+        filter_location_id = location_id if query.location else None
+        page_size = self._page_size(limit)
+        filter_params = self._filter_params(query)
 
-        while len(jobs) < limit and page <= 5:
-            payload = self._build_payload(
+        def payload(page_number: int, cursor: str | None) -> dict[str, Any]:
+            return self._build_payload(
                 keyword=role,
                 location_id=location_id,
                 location_type=location_type,
                 location_name=location,
-                page_number=page,
+                page_number=page_number,
                 cursor=cursor,
+                page_size=page_size,
+                filter_params=filter_params,
             )
-            response = await self.client.post(
-                f"{self.base_url}/graph",
-                headers=headers,
-                content=json.dumps([payload]),
-                timeout=20,
-            )
-            response.raise_for_status()
-            parsed = response.json()[0]
+
+        def parse(listings: list[dict[str, Any]]) -> list[JobRecord]:
+            with stage("filter"):
+                return self._parse_listings(
+                    listings,
+                    query=query,
+                    location_id=filter_location_id,
+                )
+
+        cursor = None
+        page = 1
+
+        if self.pipelined and self._page_numbers_honored is not False:
+            wanted = min(MAX_PAGES, -(-limit // page_size))
+            batch = await self._post_graph(headers, [payload(number, None) for number in range(1, wanted + 1)])
+            seen_ids: set[str] = set()
+            for parsed in batch:
+                listings = self._listings(parsed)
+                ids = {self._listing_id(listing) for listing in listings} - {None}
+                if page > 1 and ("errors" in parsed or (ids and ids <= seen_ids)):
+                    # The page number was ignored (or rejected) without its
+                    # cursor: resume this page by chaining cursors.
+                    self._page_numbers_honored = False
+                    break
+                if "errors" in parsed:
+                    raise RuntimeError("Glassdoor GraphQL response contained errors")
+                if page > 1:
+                    self._page_numbers_honored = True
+                page += 1
+                cursor = self._next_cursor(self._pagination_cursors(parsed), page)
+                if not listings:
+                    return
+                seen_ids |= ids
+                yield parse(listings)
+
+        while page <= MAX_PAGES:
+            parsed = (await self._post_graph(headers, [payload(page, cursor)]))[0]
             if "errors" in parsed:
                 raise RuntimeError("Glassdoor GraphQL response contained errors")
-            listings = (
-                parsed.get("data", {})
-                .get("jobListings", {})
-                .get("jobListings", [])
-            )
-            cursor = self._next_cursor(
-                parsed.get("data", {}).get("jobListings", {}).get("paginationCursors", []),
-                page + 1,
-            )
+            listings = self._listings(parsed)
+            cursor = self._next_cursor(self._pagination_cursors(parsed), page + 1)
             if not listings:
                 break
-            jobs.extend(
-                self._parse_listings(
-                    listings,
-                    location_filter=location_filter,
-                    location_id=filter_location_id,
-                ),
-            )
+            yield parse(listings)
             page += 1
 
-        return self._dedupe(jobs)[:limit]
+    async def _post_graph(
+        self,
+        headers: dict[str, str],
+        payloads: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        # /graph takes an array of operations and answers them in order.
+        response = await self.client.post(
+            f"{self.base_url}/graph",
+            headers=headers,
+            content=json.dumps(payloads),
+            timeout=20,
+            extensions=self._session_extensions(),
+        )
+        response.raise_for_status()
+        with stage("parse"):
+            return response.json()[: len(payloads)]
+
+    @staticmethod
+    def _listings(parsed: dict[str, Any]) -> list[dict[str, Any]]:
+        return (parsed.get("data") or {}).get("jobListings", {}).get("jobListings", [])
+
+    @staticmethod
+    def _pagination_cursors(parsed: dict[str, Any]) -> list[dict[str, Any]]:
+        return (parsed.get("data") or {}).get("jobListings", {}).get("paginationCursors", [])
+
+    @staticmethod
+    def _listing_id(listing: dict[str, Any]) -> str | None:
+        return ((listing.get("jobview") or {}).get("job") or {}).get("listingId")
+
+    @staticmethod
+    def _page_size(limit: int) -> int:
+        # Small requests ask for small pages instead of downloading a full page
+        # of 30 and discarding most of it.
+        return max(MIN_PAGE_SIZE, min(limit, MAX_PAGE_SIZE))
+
+    async def warm_up(self) -> None:
+        """Prefetch a session token for this domain, shared by later instances."""
+        WARM_TOKENS.pop(self.base_url, None)
+        self._proxy_session = self._warm_session()
+        token = await self._fetch_csrf_token()
+        if token != FALLBACK_TOKEN:
+            WARM_TOKENS[self.base_url] = (token, time.monotonic() + WARM_TOKEN_TTL)
+
+    def _warm_session(self) -> str:
+        # Warm tokens are shared, and so is the proxy they were fetched through.
+        return f"glassdoor:{self.base_url}"
+
+    def _session_extensions(self) -> dict[str, str]:
+        return {PROXY_SESSION: self._proxy_session}
+
+    async def _csrf_token(self) -> str:
+        if self._token_task is None or self._token_task.cancelled():
+            self._token_task = asyncio.ensure_future(self._fetch_csrf_token())
+        task = self._token_task
+        token = FALLBACK_TOKEN
+        try:
+            token = await asyncio.shield(task)
+        finally:
+            # A failed fetch is not memoized; the next call tries again.
+            if task.done() and token == FALLBACK_TOKEN and self._token_task is task:
+                self._token_task = None
+        return token
+
+    @staticmethod
+    def _known_location(query: SearchQuery) -> tuple[int, str] | None:
+        place = None if query.remote else query.place
+        location_id = KNOWN_CITY_IDS.get(place.key) if place else None
+        return (location_id, "CITY") if location_id else None
+
+    async def _cached_location(self, location: str | None, token: str | None) -> tuple[int, str | None]:
+        key = ((location or "").strip().lower(), token)
+        task = self._location_tasks.get(key)
+        if task is None or task.cancelled():
+            task = asyncio.ensure_future(self._resolve_location(location, token))
+            self._location_tasks[key] = task
+        try:
+            return await asyncio.shield(task)
+        except (httpx.HTTPError, ValueError):
+            # Search without a location this time, but retry the lookup next time.
+            if self._location_tasks.get(key) is task:
+                del self._location_tasks[key]
+            return DEFAULT_LOCATION_ID, DEFAULT_LOCATION_TYPE
 
     async def _fetch_csrf_token(self) -> str:
+        warm = WARM_TOKENS.get(self.base_url)
+        if warm is not None and warm[1] > time.monotonic():
+            self._proxy_session = self._warm_session()
+            return warm[0]
         try:
             response = await self.client.get(
                 f"{self.base_url}/Job/jobs.htm",
                 timeout=15,
+                extensions=self._session_extensions(),
             )
             response.raise_for_status()
             matches = re.findall(r'"token":\s*"([^"]+)"', response.text)
@@ -165,21 +347,19 @@ class GlassdoorScraper(BaseJobScraper):
         except httpx.HTTPError:
             return FALLBACK_TOKEN
 
-    async def _resolve_location(self, location: str | None, token: str) -> tuple[int, str | None]:
+    async def _resolve_location(self, location: str | None, token: str | None) -> tuple[int, str | None]:
         default = (DEFAULT_LOCATION_ID, DEFAULT_LOCATION_TYPE)
         if not location:
             return default
         encoded = quote(location)
         headers = self._build_location_headers(token)
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/findPopularLocationAjax.htm?maxLocationsToReturn=1&term={encoded}",
-                headers=headers,
-                timeout=10,
-            )
-            response.raise_for_status()
-        except httpx.HTTPError:
-            return default
+        response = await self.client.get(
+            f"{self.base_url}/findPopularLocationAjax.htm?maxLocationsToReturn=1&term={encoded}",
+            headers=headers,
+            timeout=10,
+            extensions=self._session_extensions(),
+        )
+        response.raise_for_status()
         data = response.json()
         if not data:
             return default
@@ -195,7 +375,7 @@ class GlassdoorScraper(BaseJobScraper):
         headers["gd-csrf-token"] = token or FALLBACK_TOKEN
         return headers
 
-    def _build_location_headers(self, token: str) -> dict[str, str]:
+    def _build_location_headers(self, token: str | None) -> dict[str, str]:
         return {
             "accept": "application/json, text/javascript, */*; q=0.01",
             "user-agent": GRAPH_HEADERS["user-agent"],
@@ -213,6 +393,8 @@ class GlassdoorScraper(BaseJobScraper):
         location_name: str | None,
         page_number: int,
         cursor: str | None,
+        page_size: int = MAX_PAGE_SIZE,
+        filter_params: list[dict[str, str]] | None = None,
     ) -> dict[str, Any]:
         parameter_url = self._build_parameter_url(
             location_name=location_name,
@@ -225,14 +407,29 @@ class GlassdoorScraper(BaseJobScraper):
                 "keyword": keyword,
                 "locationId": location_id,
                 "locationType": location_type,
-                "numJobsToShow": 30,
+                "numJobsToShow": page_size,
                 "pageNumber": page_number,
                 "pageCursor": cursor,
                 "parameterUrlInput": parameter_url,
+                "filterParams": filter_params or [],
             },
             "query": QUERY_TEMPLATE,
         }
 
+    @staticmethod
+    def _filter_params(query: SearchQuery) -> list[dict[str, str]]:
+        """searchParams.filterParams for the query; Glassdoor's job type values
+        match SearchFilters'. Experience level and radius are not sent."""
+        filters = query.filters
+        params = []
+        if filters.posted_within_days:
+            params.append({"filterKey": "fromAge", "values": str(filters.posted_within_days)})
+        if filters.job_type:
+            params.append({"filterKey": "jobType", "values": filters.job_type})
+        if query.remote:
+            params.append({"filterKey": "remoteWorkType", "values": "1"})
+        return params
+
     def _build_parameter_url(
         self,
         *,
@@ -249,13 +446,10 @@ class GlassdoorScraper(BaseJobScraper):
         self,
         listings: list[dict[str, Any]],
         *,
-        location_filter: str | None,
+        query: SearchQuery | None,
         location_id: int | None,
     ) -> list[JobRecord]:
         records: list[JobRecord] = []
-        normalized_filter = (
-            self._normalize_location(location_filter) if location_filter else None
-        )
         for listing in listings:
             jobview = listing.get("jobview") or {}
             header = jobview.get("header") or {}
@@ -263,11 +457,7 @@ class GlassdoorScraper(BaseJobScraper):
             job_id = job.get("listingId")
             if not job_id:
                 continue
-            if normalized_filter and not self._matches_location(
-                header,
-                normalized_filter,
-                location_id,
-            ):
+            if query and not self._matches_location(header, query, location_id):
                 continue
             job_title = header.get("jobTitleText") or "N/A"
             company = header.get("employerNameFromSearch") or "N/A"
@@ -289,7 +479,7 @@ class GlassdoorScraper(BaseJobScraper):
     def _matches_location(
         self,
         header: dict[str, Any],
-        normalized_filter: str,
+        query: SearchQuery,
         location_id: int | None,
     ) -> bool:
         loc_id = header.get("locId")
@@ -299,19 +489,7 @@ class GlassdoorScraper(BaseJobScraper):
                     return True
             except (TypeError, ValueError):
                 pass
-        location_value = header.get("locationName")
-        if not location_value:
-            return False
-        normalized_location = self._normalize_location(location_value)
-        if normalized_location == normalized_filter:
-            return True
-        return normalized_location.startswith(normalized_filter) or normalized_filter.startswith(
-            normalized_location,
-        )
-
-    @staticmethod
-    def _normalize_location(value: str) -> str:
-        return re.sub(r"[^a-z0-9]", "", value.lower())
+        return query.matches_location(header.get("locationName"))
 
     @staticmethod
     def _next_cursor(cursors: list[dict[str, Any]], target_page: int) -> str | None:
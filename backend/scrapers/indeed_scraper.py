@@ -1,19 +1,50 @@
 from __future__ import annotations
 
+import asyncio
 import html
 import logging
-from typing import Any
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Sequence
+
+from profiling import stage
 
 from .base_scraper import BaseJobScraper, JobRecord
+from .query import SearchFilters, SearchQuery
 
 logger = logging.getLogger(__name__)
 
+MAX_PAGES = 5
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+DEFAULT_RADIUS = 25
+# Rings used to split a search around one location. Indeed's radius is a
+# disc, so rings overlap and the merge drops the repeats.
+RADIUS_RINGS = (10, 25, 50, 100)
+# Requests one sharded search may make across all of its shards.
+DEFAULT_REQUEST_BUDGET = 12
+# Sharding only pays off once one cursor chain would need several pages. A
+# multi-site /scrape plans Indeed a quota of at most ~67 rows (200 split three
+# ways), which one page covers, so in practice this applies to single-site
+# searches and to large exports (/scrape/export above MAX_LIMIT).
+SHARD_MIN_LIMIT = MAX_PAGE_SIZE + 1
+
+# jobSearch "attributes" keys for SearchFilters. Indeed has no attribute for
+# experience level or temporary jobs, so those filters are not sent.
+JOB_TYPE_ATTRIBUTES = {
+    "fulltime": "CF3CP",
+    "parttime": "75GKK",
+    "contract": "NJXCK",
+    "internship": "VDTG7",
+}
+REMOTE_ATTRIBUTE = "DSQF7"
+
 JOB_SEARCH_QUERY = """
     query GetJobData {{
         jobSearch(
             {what}
             {location}
-            limit: 100
+            limit: {limit}
             {cursor}
             sort: RELEVANCE
             {filters}
@@ -57,6 +88,24 @@ API_HEADERS = {
 }
 
 
+class RequestBudget:
+    """Request allowance shared by every shard of one search."""
+
+    def __init__(self, requests: int, *, reserved: int = 0):
+        self.remaining = requests
+        # First requests of shards that have not started yet. Follow-up pages
+        # cannot spend them, so one fast shard cannot starve the others.
+        self.reserved = min(reserved, requests)
+
+    def take(self, *, first: bool = False) -> bool:
+        if first and self.reserved > 0:
+            self.reserved -= 1
+        elif self.remaining - self.reserved <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
 class IndeedScraper(BaseJobScraper):
     """Minimal GraphQL client for the Indeed job search API."""
 
@@ -68,33 +117,141 @@ class IndeedScraper(BaseJobScraper):
         *,
         domain: str,
         api_country_code: str,
+        shard_locations: Sequence[str] = (),
+        request_budget: int = DEFAULT_REQUEST_BUDGET,
     ):
         super().__init__("indeed", client)
         self.base_url = f"https://{domain}"
         self.api_country_code = api_country_code.upper()
+        # Cities a nationwide search is split across; empty disables sharding.
+        self.shard_locations = tuple(shard_locations)
+        self.request_budget = request_budget
+
+    async def warm_up(self) -> None:
+        # Any response will do; this only opens the pooled connection.
+        await self.client.head(self.API_URL, timeout=10)
 
-    async def fetch(
+    async def stream(
         self,
         *,
         role: str,
         location: str | None,
         country: str,
         limit: int,
-    ) -> list[JobRecord]:
+        filters: SearchFilters | None = None,
+    ) -> AsyncIterator[list[JobRecord]]:
+        query = self.parse_query(role, location, country, filters)
+        page_size = max(MIN_PAGE_SIZE, min(limit, MAX_PAGE_SIZE))
+        shards = self._shards(query) if limit >= SHARD_MIN_LIMIT else []
+        if len(shards) > 1:
+            pages = self._stream_sharded(query, shards, page_size)
+        else:
+            pages = self._stream_shard(
+                query,
+                # Remote is sent as an attribute filter, not as a place name.
+                query.board_location,
+                query.filters.radius or DEFAULT_RADIUS,
+                page_size,
+                RequestBudget(MAX_PAGES),
+            )
+        async with aclosing(pages):
+            async for jobs in pages:
+                yield jobs
+
+    def _shards(self, query: SearchQuery) -> list[tuple[str | None, int]]:
+        """Sub-queries covering the search: cities for a whole country, rings otherwise."""
+        if not self.shard_locations or query.remote:
+            # Remote jobs have no geography to split on.
+            return []
+        radius = query.filters.radius or DEFAULT_RADIUS
+        if query.nationwide:
+            return [(None, radius)] + [(city, radius) for city in self.shard_locations]
+        # The search radius (explicit or the default) is the outermost ring, so
+        # a sharded search covers the same area as an unsharded one.
+        rings = [ring for ring in RADIUS_RINGS if ring < radius] + [radius]
+        return [(query.board_location, ring) for ring in rings]
+
+    async def _stream_sharded(
+        self,
+        query: SearchQuery,
+        shards: list[tuple[str | None, int]],
+        page_size: int,
+    ) -> AsyncIterator[list[JobRecord]]:
+        budget = RequestBudget(self.request_budget, reserved=len(shards))
+        queue: asyncio.Queue[list[JobRecord] | None] = asyncio.Queue(maxsize=len(shards))
+        errors: list[Exception] = []
+
+        async def run(shard_location: str | None, radius: int) -> None:
+            pages = self._stream_shard(query, shard_location, radius, page_size, budget)
+            try:
+                async with aclosing(pages):
+                    async for jobs in pages:
+                        await queue.put(jobs)
+            except Exception as exc:
+                errors.append(exc)
+            # Not in a `finally`: a cancelled shard must not block on a full
+            # queue that nobody is reading any more.
+            await queue.put(None)
+
+        logger.info(f"Indeed: Sharding role='{query.role}' across {len(shards)} sub-queries")
+        tasks = [asyncio.create_task(run(shard_location, radius)) for shard_location, radius in shards]
+        seen: set[tuple[str, str, str]] = set()
+        yielded = False
+        running = len(tasks)
+        try:
+            while running:
+                jobs = await queue.get()
+                if jobs is None:
+                    running -= 1
+                    continue
+                fresh = []
+                for job in jobs:
+                    key = self._dedupe_key(job)
+                    if key not in seen:
+                        seen.add(key)
+                        fresh.append(job)
+                if fresh:
+                    yielded = True
+                    yield fresh
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if errors and not yielded:
+            raise errors[0]
+
+    async def _stream_shard(
+        self,
+        query: SearchQuery,
+        location: str | None,
+        radius: int,
+        page_size: int,
+        budget: RequestBudget,
+    ) -> AsyncIterator[list[JobRecord]]:
         cursor: str | None = None
-        collected: list[JobRecord] = []
         pages = 0
         try:
-            while len(collected) < limit and pages < 5:
-                query = self._build_query(role, location, cursor)
+            while pages < MAX_PAGES:
+                if not budget.take(first=pages == 0):
+                    logger.info(f"Indeed: Request budget exhausted for location={location!r}, radius={radius}")
+                    break
+                graphql = self._build_query(
+                    query.role,
+                    location,
+                    cursor,
+                    page_size=page_size,
+                    radius=radius,
+                    filters=query.filters,
+                    remote=query.remote,
+                )
                 headers = API_HEADERS.copy()
                 headers["indeed-co"] = self.api_country_code
                 
-                logger.info(f"Indeed: Requesting jobs for role='{role}', country={self.api_country_code}, page={pages}")
+                logger.info(f"Indeed: Requesting jobs for role='{query.role}', country={self.api_country_code}, page={pages}")
                 
                 response = await self.client.post(
                     self.API_URL,
-                    json={"query": query},
+                    json={"query": graphql},
                     headers=headers,
                     timeout=20,
                 )
@@ -105,7 +262,8 @@ class IndeedScraper(BaseJobScraper):
                     logger.error(f"Indeed API error: status={response.status_code}, body={response.text[:500]}")
                     response.raise_for_status()
                 
-                payload = response.json()
+                with stage("parse"):
+                    payload = response.json()
                 
                 # Check for GraphQL errors
                 if "errors" in payload:
@@ -113,18 +271,18 @@ class IndeedScraper(BaseJobScraper):
                     logger.error(f"Indeed GraphQL error: {error_msg}")
                     raise Exception(f"Indeed API returned error: {error_msg}")
                 
-                jobs, cursor = self._parse_results(payload, role=role)
+                with stage("filter"):
+                    jobs, cursor = self._parse_results(payload, keywords=query.role_keywords)
+                    # Indeed pads radius searches with jobs far outside the radius.
+                    jobs = [job for job in jobs if query.matches_location(job.location, radius=radius)]
                 logger.info(f"Indeed: Found {len(jobs)} jobs on page {pages} (after filtering)")
                 
                 if not jobs:
                     break
-                collected.extend(jobs)
+                yield jobs
                 if not cursor:
                     break
                 pages += 1
-
-            logger.info(f"Indeed: Total collected {len(collected)} jobs")
-            return self._dedupe(collected)[:limit]
             
         except Exception as e:
             logger.error(f"Indeed scraper failed: {type(e).__name__}: {str(e)}")
@@ -135,13 +293,19 @@ class IndeedScraper(BaseJobScraper):
         role: str,
         location: str | None,
         cursor: str | None,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        radius: int = DEFAULT_RADIUS,
+        filters: SearchFilters | None = None,
+        remote: bool = False,
     ) -> str:
         encoded_role = html.escape(role or "")
         encoded_location = html.escape(location or "") if location else ""
         what = f'what: "{encoded_role}"' if encoded_role else ""
         loc = (
-            'location: {{where: "{location}", radius: 25, radiusUnit: MILES}}'.format(
-                location=encoded_location
+            'location: {{where: "{location}", radius: {radius}, radiusUnit: MILES}}'.format(
+                location=encoded_location,
+                radius=radius,
             )
             if encoded_location
             else ""
@@ -150,41 +314,41 @@ class IndeedScraper(BaseJobScraper):
         return JOB_SEARCH_QUERY.format(
             what=what,
             location=loc,
+            limit=page_size,
             cursor=cursor_clause,
-            filters="",
+            filters=self._filters_clause(filters, remote=remote),
         )
 
+    @staticmethod
+    def _filters_clause(filters: SearchFilters | None, *, remote: bool = False) -> str:
+        """`filters:` argument for jobSearch; every condition must match."""
+        conditions = []
+        if filters and filters.posted_within_days:
+            conditions.append(
+                f'{{date: {{field: "dateOnIndeed", start: "{filters.posted_within_days * 24}h"}}}}'
+            )
+        attributes = []
+        if filters and filters.job_type in JOB_TYPE_ATTRIBUTES:
+            attributes.append(JOB_TYPE_ATTRIBUTES[filters.job_type])
+        if remote:
+            attributes.append(REMOTE_ATTRIBUTE)
+        conditions.extend(
+            f'{{keyword: {{field: "attributes", keys: ["{key}"]}}}}' for key in attributes
+        )
+        if not conditions:
+            return ""
+        return f"filters: {{composite: {{filters: [{', '.join(conditions)}]}}}}"
+
     def _parse_results(
         self,
         payload: dict[str, Any],
-        role: str | None = None,
+        keywords: frozenset[str] = frozenset(),
     ) -> tuple[list[JobRecord], str | None]:
         data = payload.get("data", {}).get("jobSearch", {})
         results = data.get("results", []) or []
         next_cursor = data.get("pageInfo", {}).get("nextCursor")
         records: list[JobRecord] = []
         
-        # Extract key terms from the requested role for filtering
-        # Exclude common generic words that would match too broadly
-        generic_words = {"engineer", "developer", "manager", "analyst", "specialist", "consultant", "lead", "senior", "junior", "staff"}
-        # Allow important short acronyms
-        important_short_words = {"ai", "ml", "qa", "ui", "ux", "ar", "vr"}
-        role_keywords = set()
-        if role:
-            # Split role into words and convert to lowercase for matching
-            words = [word.lower() for word in role.split()]
-            # Filter words: keep if length > 2 OR if it's an important short word
-            words = [word for word in words if len(word) > 2 or word in important_short_words]
-            # Only use specific keywords, not generic ones (unless it's the only word)
-            if len(words) > 1:
-                role_keywords = {word for word in words if word not in generic_words}
-            else:
-                role_keywords = set(words)  # Use all words if only one keyword
-            
-            # If no keywords remain after filtering, use the original role as-is
-            if not role_keywords:
-                role_keywords = {role.lower()}
-        
         for entry in results:
             job = entry.get("job") or {}
             job_id = job.get("key")
@@ -193,11 +357,11 @@ class IndeedScraper(BaseJobScraper):
             title = job.get("title") or "N/A"
             
             # Filter: If role is specified, check if job title contains relevant keywords
-            if role_keywords:
+            if keywords:
                 title_lower = title.lower()
                 # Check if at least one significant keyword from the role appears in the title
-                if not any(keyword in title_lower for keyword in role_keywords):
-                    logger.debug(f"Indeed: Filtering out '{title}' - doesn't match role '{role}'")
+                if not any(keyword in title_lower for keyword in keywords):
+                    logger.debug(f"Indeed: Filtering out '{title}' - doesn't match keywords {sorted(keywords)}")
                     continue
             
             employer = (job.get("employer") or {}).get("name") or "N/A"
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 from urllib.parse import urlencode
 
-from bs4 import BeautifulSoup
+from profiling import stage
 
 from .base_scraper import BaseJobScraper, JobRecord
+from .query import SearchFilters, SearchQuery
 
 logger = logging.getLogger(__name__)
 
 SEARCH_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+MAX_OFFSET = 1000
+
+# Guest search parameters for SearchFilters: f_JT (job type), f_E (experience).
+JOB_TYPE_PARAMS = {
+    "fulltime": "F",
+    "parttime": "P",
+    "contract": "C",
+    "temporary": "T",
+    "internship": "I",
+}
+EXPERIENCE_PARAMS = {
+    "internship": "1",
+    "entry": "2",
+    "associate": "3",
+    "mid_senior": "4",
+    "director": "5",
+    "executive": "6",
+}
 
 LINKEDIN_HEADERS = {
     "accept": "text/html,application/xhtml+xml,application/xml;q=0.9",
@@ -29,95 +48,103 @@ class LinkedInScraper(BaseJobScraper):
     def __init__(self, client):
         super().__init__("linkedin", client)
 
-    async def fetch(
+    async def warm_up(self) -> None:
+        # BeautifulSoup is otherwise imported by the first parse.
+        import bs4  # noqa: F401
+
+        await self.client.head(SEARCH_URL, headers=LINKEDIN_HEADERS, timeout=10)
+
+    async def stream(
         self,
         *,
         role: str,
         location: str | None,
         country: str,
         limit: int,
-    ) -> list[JobRecord]:
+        filters: SearchFilters | None = None,
+    ) -> AsyncIterator[list[JobRecord]]:
+        # The guest endpoint has a fixed page size, so `limit` only matters to
+        # the caller deciding when to stop iterating.
+        query = self.parse_query(role, location, country, filters)
         start = 0
-        jobs: list[JobRecord] = []
-        while len(jobs) < limit and start < 1000:
-            params = self._build_params(role, location, start)
-            logger.info(f"LinkedIn: Requesting jobs for role='{role}', location='{location}', start={start}")
+        while start < MAX_OFFSET:
+            params = self._build_params(query, start)
+            logger.info(f"LinkedIn: Requesting jobs for role='{query.role}', location='{query.location_text}', start={start}")
             response = await self.client.get(
                 f"{SEARCH_URL}?{urlencode(params)}",
                 headers=LINKEDIN_HEADERS,
                 timeout=20,
             )
             response.raise_for_status()
-            batch = self._parse_html(response.text, filter_location=location)
+            batch = self._parse_html(response.text, query=query)
             logger.info(f"LinkedIn: Found {len(batch)} jobs at offset {start} (after filtering)")
             if not batch:
                 break
-            jobs.extend(batch)
+            yield batch
             start += len(batch)
-        return self._dedupe(jobs)[:limit]
 
-    def _build_params(
-        self,
-        role: str,
-        location: str | None,
-        start: int,
-    ) -> dict[str, Any]:
-        params = {"keywords": role, "start": start}
+    def _build_params(self, query: SearchQuery, start: int) -> dict[str, Any]:
+        params = {"keywords": query.role, "start": start}
+        location = query.board_location or ("remote" if query.remote else None)
         if location:
             params["location"] = location
-            # Add remote filter if location contains "remote"
-            if "remote" in location.lower():
-                params["f_WT"] = "2"  # LinkedIn's remote filter
+        if query.remote:
+            params["f_WT"] = "2"  # LinkedIn's remote filter
+        filters = query.filters
+        if filters.posted_within_days:
+            params["f_TPR"] = f"r{filters.posted_within_days * 86400}"
+        if filters.job_type:
+            params["f_JT"] = JOB_TYPE_PARAMS[filters.job_type]
+        if filters.experience:
+            params["f_E"] = EXPERIENCE_PARAMS[filters.experience]
+        if filters.radius and query.location:
+            params["distance"] = filters.radius
         return params
 
-    def _parse_html(self, html: str, filter_location: str | None = None) -> list[JobRecord]:
-        soup = BeautifulSoup(html, "html.parser")
-        cards = soup.find_all("div", class_="base-search-card")
+    def _parse_html(
+        self,
+        html: str,
+        query: SearchQuery | None = None,
+    ) -> list[JobRecord]:
+        with stage("parse"):
+            # Imported on first use so the module stays cheap to load.
+            from bs4 import BeautifulSoup
+
+            soup = BeautifulSoup(html, "html.parser")
+            cards = soup.find_all("div", class_="base-search-card")
         records: list[JobRecord] = []
         
-        # Extract location keywords for filtering (only if not remote/flexible)
-        location_keywords = set()
-        should_filter_location = False
-        if filter_location:
-            filter_lower = filter_location.lower()
-            # Don't filter if location is remote/anywhere/flexible
-            if not any(x in filter_lower for x in ["remote", "anywhere", "flexible", "worldwide"]):
-                # Split location and normalize for matching
-                location_keywords = {word.lower() for word in filter_location.replace(",", " ").split() if len(word) > 2}
-                should_filter_location = True
-        
-        for card in cards:
-            title = self._text_or_none(
-                card.find("h3", class_="base-search-card__title")
-            ) or self._text_or_none(card.find("span", class_="sr-only"))
-            company = self._text_or_none(
-                card.find("h4", class_="base-search-card__subtitle")
-            )
-            location = self._text_or_none(
-                card.find("span", class_="job-search-card__location")
-            )
+        with stage("filter"):
+            for card in cards:
+                title = self._text_or_none(
+                    card.find("h3", class_="base-search-card__title")
+                ) or self._text_or_none(card.find("span", class_="sr-only"))
+                company = self._text_or_none(
+                    card.find("h4", class_="base-search-card__subtitle")
+                )
+                location = self._text_or_none(
+                    card.find("span", class_="job-search-card__location")
+                )
             
-            # Filter: If specific location is requested (not remote), check if job location matches
-            if should_filter_location and location:
-                location_lower = location.lower()
-                # Check if at least one keyword from the requested location appears in the job location
-                if not any(keyword in location_lower for keyword in location_keywords):
-                    logger.debug(f"LinkedIn: Filtering out job in '{location}' - doesn't match '{filter_location}'")
+                # Filter: If specific location is requested (not remote), check if job location matches
+                radius = query.filters.radius if query else None
+                if query and not query.matches_location(location, radius=radius):
+                    logger.debug(f"LinkedIn: Filtering out job in '{location}' - outside '{query.location}'")
                     continue
             
-            link_tag = card.find("a", class_="base-card__full-link")
-            href = link_tag["href"] if link_tag and link_tag.has_attr("href") else ""
-            if href and "?" in href:
-                href = href.split("?")[0]
-            records.append(
-                JobRecord(
-                    title=title or "N/A",
-                    company=company or "N/A",
-                    location=location,
-                    url=href or "https://www.linkedin.com/jobs",
-                    source=self.site_name,
-                ),
-            )
+                link_tag = card.find("a", class_="base-card__full-link")
+                href = link_tag["href"] if link_tag and link_tag.has_attr("href") else ""
+                if href and "?" in href:
+                    href = href.split("?")[0]
+                records.append(
+                    JobRecord(
+                        title=title or "N/A",
+                        company=company or "N/A",
+                        location=location,
+                        url=href or "https://www.linkedin.com/jobs",
+                        source=self.site_name,
+                    ),
+                )
         return records
 
     @staticmethod
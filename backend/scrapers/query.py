@@ -0,0 +1,311 @@
+"""Structured search queries parsed once from free-text role and location.
+
+"Senior Python Developer", "python developer senior" and "Python Developer
+(Senior)" all parse to the same `SearchQuery`. Its `key` is used for result
+caching, request coalescing and retained sessions, and scrapers read the
+canonical role, keywords and remote flag from it instead of re-deriving them.
+The canonical location only identifies the search; boards are sent the
+location as the user wrote it (`board_location`). The location also
+resolves to a gazetteer `place`, against which scrapers check each job's
+location (`matches_location`).
+Parsing is memoized, so every scraper in a search shares one parse.
+
+`SearchFilters` narrows a search (date posted, job type, radius, experience
+level). Each scraper maps the filters onto its board's own query parameters
+so upstream only returns matching jobs; a board without an equivalent
+parameter ignores that filter.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Iterable, Literal
+
+from .gazetteer import GAZETTEER, Place
+
+JobType = Literal["fulltime", "parttime", "contract", "temporary", "internship"]
+ExperienceLevel = Literal["internship", "entry", "associate", "mid_senior", "director", "executive"]
+
+# Seniority words always lead the canonical role, in this order.
+SENIORITY = ("intern", "junior", "mid", "senior", "lead", "staff", "principal")
+ROLE_ALIASES = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "dev": "developer",
+    "eng": "engineer",
+    "mgr": "manager",
+}
+REMOTE_WORDS = frozenset({"remote", "anywhere", "worldwide", "flexible", "wfh"})
+REMOTE_PHRASES = ("work from home",)
+_REMOTE_WORD = re.compile(rf"\b(?:{'|'.join(sorted(REMOTE_WORDS))})\b", re.IGNORECASE)
+
+# Words too generic to decide on their own whether a title matches a role.
+GENERIC_ROLE_WORDS = frozenset(
+    {"engineer", "developer", "manager", "analyst", "specialist", "consultant", *SENIORITY}
+)
+# Short acronyms that still carry meaning as keywords.
+IMPORTANT_SHORT_WORDS = frozenset({"ai", "ml", "qa", "ui", "ux", "ar", "vr"})
+
+# Keeps "c++", "c#", ".net" and "node.js" intact.
+_ROLE_TOKEN = re.compile(r"\.?[a-z0-9][a-z0-9+#.]*")
+
+
+def _role_tokens(text: str) -> list[str]:
+    tokens = [token.rstrip(".") for token in _ROLE_TOKEN.findall(text.lower())]
+    return [ROLE_ALIASES.get(token, token) for token in tokens if token]
+
+
+def _plain(text: str) -> str:
+    """Lowercase, drop dots and apostrophes, turn other punctuation into spaces
+    and collapse whitespace ("U.S.A." -> "usa", "Winston-Salem" -> "winston salem").
+    """
+    text = re.sub(r"[.']", "", text.lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Upstream filters for a search; every field is optional.
+
+    `posted_within_days` keeps jobs posted in the last N days, `radius` is in
+    miles around the location. `remote` is folded into `SearchQuery.remote`
+    when a query is parsed.
+    """
+
+    posted_within_days: int | None = None
+    job_type: JobType | None = None
+    experience: ExperienceLevel | None = None
+    radius: int | None = None
+    remote: bool = False
+
+    def __bool__(self) -> bool:
+        return self != NO_FILTERS
+
+    @property
+    def key(self) -> str:
+        """Canonical text of the active filters ("" when none are set)."""
+        return ";".join(
+            f"{name}={value}"
+            for name, value in (
+                ("posted", self.posted_within_days),
+                ("type", self.job_type),
+                ("experience", self.experience),
+                ("radius", self.radius),
+                ("remote", "1" if self.remote else None),
+            )
+            if value is not None
+        )
+
+
+NO_FILTERS = SearchFilters()
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """A role/location search in canonical form.
+
+    `role_tokens` are lowercase, de-duplicated and seniority-first.
+    `location_parts` are the comma-separated parts of the location with
+    punctuation and remote words removed; they are empty for a nationwide
+    search. `raw_location_parts` are the same parts as the user wrote them
+    and take no part in equality. `region` is the country key the search
+    runs in. `filters` never carries `remote`; that always lives on the query
+    itself.
+    """
+
+    role_tokens: tuple[str, ...]
+    location_parts: tuple[str, ...] = ()
+    remote: bool = False
+    region: str | None = None
+    filters: SearchFilters = field(default=NO_FILTERS)
+    raw_location_parts: tuple[str, ...] = field(default=(), compare=False)
+
+    @classmethod
+    def parse(
+        cls,
+        role: str,
+        location: str | None = None,
+        country: str | None = None,
+        *,
+        region_names: Iterable[str] = (),
+        filters: SearchFilters | None = None,
+    ) -> SearchQuery:
+        """Parse free text; a location naming the country itself (one of
+        `region_names`) is the same search as no location at all.
+        """
+        names = frozenset(_plain(name) for name in region_names)
+        query = _parse(role or "", location or "", country, names)
+        if not filters:
+            return query
+        return replace(
+            query,
+            remote=query.remote or filters.remote,
+            filters=replace(filters, remote=False),
+        )
+
+    @property
+    def role(self) -> str:
+        return " ".join(self.role_tokens)
+
+    @property
+    def location(self) -> str | None:
+        return ", ".join(self.location_parts) or None
+
+    @property
+    def board_location(self) -> str | None:
+        """Location to send to job boards: the user's spelling, remote words removed.
+
+        Boards match "Winston-Salem, NC" better than the canonical
+        "winston salem, nc".
+        """
+        return ", ".join(self.raw_location_parts or self.location_parts) or None
+
+    @property
+    def nationwide(self) -> bool:
+        return not self.location_parts
+
+    @property
+    def location_text(self) -> str | None:
+        """Location string that parses back to this query, remote marker included."""
+        parts = (["remote"] if self.remote else []) + list(self.raw_location_parts or self.location_parts)
+        return ", ".join(parts) or None
+
+    @property
+    def place(self) -> Place | None:
+        """The gazetteer place the location names; None if any of it is unknown."""
+        if self.nationwide:
+            return None
+        return GAZETTEER.resolve(self.location or "", self.region)
+
+    def matches_location(self, location: str | None, *, radius: int | None = None) -> bool:
+        """Whether a job at `location` belongs in this search's results.
+
+        Remote and nationwide searches, and jobs without a location, always
+        match. Otherwise the job must lie in `place`, or within `radius` miles
+        of it for boards that searched a radius. When either side is not in
+        the gazetteer, a radius search keeps the job (the board already
+        applied the radius) and other searches fall back to
+        `location_keywords`.
+        """
+        if not location or self.remote or self.nationwide:
+            return True
+        place = self.place
+        verdict = (
+            GAZETTEER.matches(place, location, self.region, radius=radius)
+            if place is not None
+            else None
+        )
+        if verdict is not None:
+            return verdict
+        if radius is not None:
+            return True
+        location = location.lower()
+        return any(keyword in location for keyword in self.location_keywords)
+
+    @property
+    def role_keywords(self) -> frozenset[str]:
+        """Words a job title must contain one of to match the role."""
+        words = [
+            token
+            for token in self.role_tokens
+            if len(token) > 2 or token in IMPORTANT_SHORT_WORDS
+        ]
+        if len(words) > 1:
+            keywords = {word for word in words if word not in GENERIC_ROLE_WORDS}
+        else:
+            keywords = set(words)
+        return frozenset(keywords or self.role_tokens)
+
+    def title_score(self, title: str) -> float:
+        """How well a job title matches the role, from 0 to 1.
+
+        Half is the share of role words in the title, half the share of
+        `role_keywords`, so for "Senior Data Engineer" a "Data Engineer" ranks
+        above a "Senior Engineer".
+        """
+        if not self.role_tokens:
+            return 0.0
+        words = set(_role_tokens(title))
+        keywords = self.role_keywords
+        return (
+            len(words.intersection(self.role_tokens)) / len(self.role_tokens)
+            + len(words & keywords) / len(keywords)
+        ) / 2
+
+    @property
+    def location_keywords(self) -> frozenset[str]:
+        """Words a job location must contain one of; empty means no filtering."""
+        if self.remote:
+            return frozenset()
+        return frozenset(
+            word
+            for part in self.location_parts
+            for word in part.split()
+            if len(word) > 2
+        )
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the search, independent of word order and case."""
+        return "|".join(
+            [
+                self.region or "",
+                " ".join(sorted(self.role_tokens)),
+                self.location or "",
+                "remote" if self.remote else "",
+            ]
+            # Unfiltered searches keep the key they had before filters existed.
+            + ([self.filters.key] if self.filters else [])
+        )
+
+
+@lru_cache(maxsize=1024)
+def _parse(
+    role: str,
+    location: str,
+    country: str | None,
+    region_names: frozenset[str],
+) -> SearchQuery:
+    remote = False
+    role_tokens: list[str] = []
+    for token in _role_tokens(role):
+        if token in REMOTE_WORDS:
+            remote = True
+        elif token not in role_tokens:
+            role_tokens.append(token)
+    seniority = sorted(
+        (token for token in role_tokens if token in SENIORITY),
+        key=SENIORITY.index,
+    )
+    role_tokens = seniority + [token for token in role_tokens if token not in SENIORITY]
+
+    for phrase in REMOTE_PHRASES:
+        pattern = re.compile(re.escape(phrase), re.IGNORECASE)
+        if pattern.search(location):
+            remote = True
+            location = pattern.sub(" ", location)
+    parts: list[str] = []
+    raw_parts: list[str] = []
+    for part in location.split(","):
+        words = _plain(part).split()
+        if any(word in REMOTE_WORDS for word in words):
+            remote = True
+            words = [word for word in words if word not in REMOTE_WORDS]
+            part = _REMOTE_WORD.sub(" ", part)
+        if words:
+            parts.append(" ".join(words))
+            # "Remote - London" leaves " - London"; trim the separator too.
+            raw_parts.append(" ".join(part.split()).strip(" -/|"))
+    if " ".join(parts) in region_names:
+        parts = raw_parts = []
+
+    return SearchQuery(
+        role_tokens=tuple(role_tokens),
+        location_parts=tuple(parts),
+        remote=remote,
+        region=country.lower() if country else None,
+        raw_location_parts=tuple(raw_parts),
+    )
@@ -0,0 +1,109 @@
+"""Registry of job board scrapers, imported lazily on first use.
+
+Built-in boards are registered by import path so their modules (and heavy
+dependencies such as BeautifulSoup) are only loaded when a search actually
+selects them. Third-party boards can register themselves with
+`register_scraper` or be discovered through the `job_scraper.scrapers` entry
+point group, e.g. in a plugin's pyproject.toml:
+
+    [project.entry-points."job_scraper.scrapers"]
+    monster = "monster_scraper:MonsterScraper"
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Callable, Iterator
+
+from .base_scraper import BaseJobScraper
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "job_scraper.scrapers"
+
+
+@dataclass
+class ScraperSpec:
+    name: str
+    target: str | type[BaseJobScraper]
+
+    def load(self) -> type[BaseJobScraper]:
+        if isinstance(self.target, str):
+            module_name, _, attribute = self.target.partition(":")
+            scraper_class = getattr(import_module(module_name), attribute)
+            if not (isinstance(scraper_class, type) and issubclass(scraper_class, BaseJobScraper)):
+                raise TypeError(f"{self.target} is not a BaseJobScraper subclass")
+            self.target = scraper_class
+        return self.target
+
+
+class ScraperRegistry:
+    """Maps site names to scraper classes, importing each module on first use."""
+
+    def __init__(self, *, entry_point_group: str | None = ENTRY_POINT_GROUP):
+        self._specs: dict[str, ScraperSpec] = {}
+        self._entry_point_group = entry_point_group
+        self._discovered = entry_point_group is None
+
+    def register(
+        self,
+        name: str,
+        target: str | type[BaseJobScraper] | None = None,
+    ) -> Callable[[type[BaseJobScraper]], type[BaseJobScraper]] | None:
+        """Register `target` ("module:Class" or a class) under `name`.
+
+        Without a target this returns a class decorator, so scraper modules can
+        register themselves with `@register_scraper("site")`.
+        """
+        name = name.lower().strip()
+        if target is None:
+            def decorator(scraper_class: type[BaseJobScraper]) -> type[BaseJobScraper]:
+                self._specs[name] = ScraperSpec(name, scraper_class)
+                return scraper_class
+
+            return decorator
+        self._specs[name] = ScraperSpec(name, target)
+        return None
+
+    def get(self, name: str) -> type[BaseJobScraper]:
+        self._discover()
+        try:
+            spec = self._specs[name.lower().strip()]
+        except KeyError:
+            raise KeyError(f"No scraper registered for '{name}'") from None
+        return spec.load()
+
+    def names(self) -> tuple[str, ...]:
+        self._discover()
+        return tuple(self._specs)
+
+    def __contains__(self, name: object) -> bool:
+        self._discover()
+        return isinstance(name, str) and name.lower().strip() in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def _discover(self) -> None:
+        # Entry points are only read once, and only their "module:attr"
+        # strings are recorded; nothing is imported until the site is used.
+        if self._discovered:
+            return
+        self._discovered = True
+        for entry_point in entry_points(group=self._entry_point_group):
+            name = entry_point.name.lower().strip()
+            if name in self._specs:
+                logger.warning(f"Ignoring entry point for already registered scraper '{name}'")
+                continue
+            self._specs[name] = ScraperSpec(name, entry_point.value)
+
+
+SCRAPER_REGISTRY = ScraperRegistry()
+SCRAPER_REGISTRY.register("linkedin", f"{__package__}.linkedin_scraper:LinkedInScraper")
+SCRAPER_REGISTRY.register("indeed", f"{__package__}.indeed_scraper:IndeedScraper")
+SCRAPER_REGISTRY.register("glassdoor", f"{__package__}.glassdoor_scraper:GlassdoorScraper")
+
+register_scraper = SCRAPER_REGISTRY.register
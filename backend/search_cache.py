@@ -0,0 +1,197 @@
+"""Stale-while-revalidate cache of scrape results, tracked per board.
+
+Every board's rows for a search are cached with the time they were fetched.
+A board younger than the soft TTL is fresh. Between the soft and hard TTL it
+is still served immediately, and `JobScraperManager` re-crawls it in the
+background. Past the hard TTL (or never fetched) the search blocks on a live
+crawl of just the boards that are missing. A board whose last crawl failed is
+served with its error and retried in the background, and so is a partial board
+whose crawl was cancelled (its client disconnected) before it finished.
+
+Entries live in an in-process LRU, or in the `SharedState` SQLite file when
+several workers share one. `single_flight` makes concurrent identical searches
+wait for one crawl: in-process by default, across workers with shared state.
+Shared-state reads and writes run in a worker thread, so a sibling holding the
+SQLite write lock never stalls this process's event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+import profiling
+from shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+SOFT_TTL_ENV = "JOB_SCRAPER_SOFT_TTL"
+HARD_TTL_ENV = "JOB_SCRAPER_HARD_TTL"
+
+DEFAULT_SOFT_TTL = 300.0
+DEFAULT_HARD_TTL = 3600.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass
+class CachedSite:
+    """One board's rows for a search and when they were fetched."""
+
+    records: list[dict[str, Any]]
+    fetched_at: float = field(default_factory=time.time)
+    error: str | None = None
+    partial: bool = False
+
+    def age(self, now: float | None = None) -> float:
+        return max(0.0, (time.time() if now is None else now) - self.fetched_at)
+
+
+class _Flight:
+    """An in-process crawl lock and how many searches are holding or awaiting it."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class SearchCache:
+    """Per-board result cache with soft (revalidate) and hard (expire) TTLs."""
+
+    def __init__(
+        self,
+        *,
+        soft_ttl: float = DEFAULT_SOFT_TTL,
+        hard_ttl: float = DEFAULT_HARD_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        shared_state: SharedState | None = None,
+    ):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+        self.max_entries = max_entries
+        self.shared_state = shared_state
+        self._entries: OrderedDict[str, dict[str, CachedSite]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+        self._flights: dict[str, _Flight] = {}
+
+    @classmethod
+    def from_env(cls, *, shared_state: SharedState | None = None) -> SearchCache:
+        soft = os.environ.get(SOFT_TTL_ENV, "").strip()
+        hard = os.environ.get(HARD_TTL_ENV, "").strip()
+        return cls(
+            soft_ttl=float(soft) if soft else DEFAULT_SOFT_TTL,
+            hard_ttl=float(hard) if hard else DEFAULT_HARD_TTL,
+            shared_state=shared_state,
+        )
+
+    async def get(self, key: str) -> dict[str, CachedSite]:
+        """Cached boards for `key` that are younger than the hard TTL."""
+        if self.shared_state is not None:
+            stored = await asyncio.to_thread(self.shared_state.get_result, key) or {}
+            sites = {site: CachedSite(**entry) for site, entry in stored.items()}
+        else:
+            with self._lock:
+                sites = dict(self._entries.get(key, {}))
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+        now = time.time()
+        return {site: entry for site, entry in sites.items() if entry.age(now) < self.hard_ttl}
+
+    async def put(self, key: str, sites: dict[str, CachedSite]) -> None:
+        """Store freshly crawled boards, keeping the other boards' entries."""
+        if self.shared_state is not None:
+            fresh = {site: asdict(entry) for site, entry in sites.items()}
+
+            def merge(stored: dict[str, Any] | None) -> dict[str, Any]:
+                now = time.time()
+                kept = {
+                    site: entry
+                    for site, entry in (stored or {}).items()
+                    if CachedSite(**entry).age(now) < self.hard_ttl
+                }
+                return {**kept, **fresh}
+
+            # Read, merge and write in one transaction, so two workers storing
+            # different boards of the same search keep both.
+            await asyncio.to_thread(self.shared_state.update_result, key, merge, ttl=self.hard_ttl)
+            return
+        merged = {**await self.get(key), **sites}
+        with self._lock:
+            self._entries[key] = merged
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @asynccontextmanager
+    async def single_flight(self, key: str) -> AsyncIterator[None]:
+        """Hold the crawl lock for `key`, waiting while another search holds it."""
+        if self.shared_state is not None:
+            async with self.shared_state.single_flight(f"crawl:{key}"):
+                yield
+            return
+        flight = self._flights.setdefault(key, _Flight())
+        flight.users += 1
+        try:
+            async with flight.lock:
+                yield
+        finally:
+            flight.users -= 1
+            if not flight.users:
+                del self._flights[key]
+
+    def stale(self, entry: CachedSite) -> bool:
+        return entry.error is not None or entry.partial or entry.age() >= self.soft_ttl
+
+    async def revalidate(
+        self,
+        key: str,
+        sites: Iterable[str],
+        refresh: Callable[[list[str]], Awaitable[dict[str, CachedSite]]],
+    ) -> bool:
+        """Re-crawl `sites` in the background unless a refresh is already running.
+
+        Returns whether a refresh was started. With shared state, a lease
+        keeps other workers from refreshing the same search at the same time.
+        """
+        sites = list(sites)
+        if not sites:
+            return False
+        running = self._refreshing.get(key)
+        if running is not None and not running.done():
+            return False
+        owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        lease_key = f"refresh:{key}"
+        if self.shared_state is not None:
+            if not await asyncio.to_thread(self.shared_state.try_acquire, lease_key, owner):
+                return False
+
+        async def run() -> None:
+            try:
+                if self.shared_state is not None:
+                    async with self.shared_state.keep_alive(lease_key, owner):
+                        fresh = await refresh(sites)
+                else:
+                    fresh = await refresh(sites)
+                await self.put(key, fresh)
+            except Exception:
+                logger.exception(f"Background refresh of {', '.join(sites)} failed")
+            finally:
+                if self.shared_state is not None:
+                    await asyncio.to_thread(self.shared_state.release, lease_key, owner)
+                self._refreshing.pop(key, None)
+
+        # The refresh outlives the request that started it; keep it off its timeline.
+        self._refreshing[key] = asyncio.create_task(run(), context=profiling.detached_context())
+        return True
+
+    async def drain(self) -> None:
+        """Wait for background refreshes in flight (used at shutdown and in tests)."""
+        await asyncio.gather(*list(self._refreshing.values()), return_exceptions=True)
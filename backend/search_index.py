@@ -0,0 +1,216 @@
+"""Local full-text index over every job the API has scraped.
+
+Jobs are stored in SQLite with an FTS5 index over title, company and location
+and ranked with BM25, so `/search` can answer from previously collected
+results in milliseconds instead of going back to the boards. The index is
+updated incrementally after each scrape; set `JOB_SCRAPER_INDEX_PATH` to keep
+it on disk (and share it between workers), otherwise it lives in memory.
+
+Each insert also prunes the index: jobs not seen again for `max_age` seconds
+are dropped, and so are the oldest beyond `max_rows`, so a long-running worker
+does not grow without bound.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from scrapers import JobRecord
+
+INDEX_PATH_ENV = "JOB_SCRAPER_INDEX_PATH"
+INDEX_MAX_ROWS_ENV = "JOB_SCRAPER_INDEX_MAX_ROWS"
+INDEX_MAX_AGE_ENV = "JOB_SCRAPER_INDEX_MAX_AGE"
+
+DEFAULT_MAX_ROWS = 100_000
+DEFAULT_MAX_AGE = 7 * 24 * 3600.0
+
+# Column weights for bm25(): a match in the title counts most.
+TITLE_WEIGHT = 10.0
+COMPANY_WEIGHT = 3.0
+LOCATION_WEIGHT = 1.0
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        company TEXT NOT NULL,
+        location TEXT,
+        url TEXT NOT NULL,
+        source TEXT NOT NULL,
+        country TEXT NOT NULL,
+        indexed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_source_country ON jobs (source, country);
+    CREATE INDEX IF NOT EXISTS jobs_indexed_at ON jobs (indexed_at);
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title,
+        company,
+        location,
+        content='jobs',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, title, company, location)
+        VALUES (new.id, new.title, new.company, new.location);
+    END;
+    CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+        VALUES ('delete', old.id, old.title, old.company, old.location);
+    END;
+    CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location)
+        VALUES ('delete', old.id, old.title, old.company, old.location);
+        INSERT INTO jobs_fts (rowid, title, company, location)
+        VALUES (new.id, new.title, new.company, new.location);
+    END;
+"""
+
+UPSERT = """
+    INSERT INTO jobs (key, title, company, location, url, source, country, indexed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (key) DO UPDATE SET
+        location = excluded.location,
+        country = excluded.country,
+        indexed_at = excluded.indexed_at
+"""
+
+PRUNE_OLDEST = """
+    DELETE FROM jobs WHERE id IN (
+        SELECT id FROM jobs ORDER BY indexed_at DESC, id DESC LIMIT -1 OFFSET ?
+    )
+"""
+
+
+@dataclass
+class SearchHit:
+    title: str
+    company: str
+    location: str | None
+    url: str
+    source: str
+    country: str
+    score: float
+
+
+def _match_expression(text: str) -> str | None:
+    # Quote every word so user input can never be parsed as FTS5 syntax; the
+    # last word is a prefix match so "pyth" finds "python" while typing.
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class JobSearchIndex:
+    """Incrementally updated BM25 search over collected JobRecords."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] = ":memory:",
+        *,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_age: float = DEFAULT_MAX_AGE,
+    ):
+        self.path = str(path)
+        self.max_rows = max(max_rows, 1)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> JobSearchIndex:
+        max_rows = os.environ.get(INDEX_MAX_ROWS_ENV, "").strip()
+        max_age = os.environ.get(INDEX_MAX_AGE_ENV, "").strip()
+        return cls(
+            os.environ.get(INDEX_PATH_ENV, "").strip() or ":memory:",
+            max_rows=int(max_rows) if max_rows else DEFAULT_MAX_ROWS,
+            max_age=float(max_age) if max_age else DEFAULT_MAX_AGE,
+        )
+
+    def add(self, records: Iterable[JobRecord], *, country: str) -> int:
+        """Insert or refresh `records` and prune; returns how many rows were written.
+
+        Blocks on SQLite; async callers run it in a thread.
+        """
+        now = time.time()
+        rows = [
+            (
+                "\x1f".join((record.source, record.url, record.title, record.company)),
+                record.title,
+                record.company,
+                record.location,
+                record.url,
+                record.source,
+                country,
+                now,
+            )
+            for record in records
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(UPSERT, rows)
+                self._conn.execute("DELETE FROM jobs WHERE indexed_at < ?", (now - self.max_age,))
+                count = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+                if count > self.max_rows:
+                    self._conn.execute(PRUNE_OLDEST, (self.max_rows,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def search(
+        self,
+        text: str,
+        *,
+        sources: Sequence[str] | None = None,
+        country: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> list[SearchHit]:
+        expression = _match_expression(text)
+        if expression is None:
+            return []
+        sql = [
+            "SELECT jobs.title, jobs.company, jobs.location, jobs.url, jobs.source, jobs.country,",
+            f"bm25(jobs_fts, {TITLE_WEIGHT}, {COMPANY_WEIGHT}, {LOCATION_WEIGHT}) AS rank",
+            "FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid",
+            "WHERE jobs_fts MATCH ?",
+        ]
+        params: list[object] = [expression]
+        if sources:
+            sql.append(f"AND jobs.source IN ({', '.join('?' for _ in sources)})")
+            params.extend(sources)
+        if country:
+            sql.append("AND jobs.country = ?")
+            params.append(country)
+        sql.append("ORDER BY rank, jobs.indexed_at DESC LIMIT ? OFFSET ?")
+        params.extend([limit, offset])
+        with self._lock:
+            rows = self._conn.execute(" ".join(sql), params).fetchall()
+        # bm25() is negative with better matches lower; flip it for callers.
+        return [SearchHit(*row[:6], score=-row[6]) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,311 @@
+"""SQLite-backed state shared by every API worker process on one host.
+
+When the API runs under several uvicorn/gunicorn workers each process would
+otherwise keep its own cache, rate limiter and in-flight bookkeeping. Pointing
+all of them at the same WAL-mode SQLite file lets them share:
+
+* a result cache keyed by query,
+* per-host token buckets so N workers stay within one upstream budget,
+* single-flight leases so only one worker crawls a given query at a time.
+
+SQLite calls can wait up to the busy timeout for a sibling's write lock, so
+the async helpers (`throttle`, `single_flight`, `keep_alive`) run them in a
+thread rather than on the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+logger = logging.getLogger(__name__)
+
+SHARED_STATE_ENV = "JOB_SCRAPER_SHARED_STATE"
+
+DEFAULT_RESULT_TTL = 300.0
+DEFAULT_HOST_RATE = 2.0
+DEFAULT_HOST_BURST = 5.0
+DEFAULT_LOCK_LEASE = 60.0
+RESULT_SWEEP_INTERVAL = 60.0
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS results (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS rate_buckets (
+        host TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS locks (
+        key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+"""
+
+
+def initialize_wal(conn: sqlite3.Connection, schema: str, attempts: int = 50) -> None:
+    """Put `conn`'s file in WAL mode and create `schema`.
+
+    Switching to WAL can report "database is locked" without waiting on the
+    busy handler while sibling workers open the file at the same time, so
+    retry briefly.
+    """
+    for attempt in range(attempts):
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(schema)
+            return
+        except sqlite3.OperationalError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05)
+
+
+class SharedState:
+    """Cross-process cache, rate budget and lock table stored in SQLite."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        result_ttl: float = DEFAULT_RESULT_TTL,
+        host_rate: float = DEFAULT_HOST_RATE,
+        host_burst: float = DEFAULT_HOST_BURST,
+        lock_lease: float = DEFAULT_LOCK_LEASE,
+    ):
+        self.path = str(path)
+        self.result_ttl = result_ttl
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.lock_lease = lock_lease
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+        self._conn: sqlite3.Connection | None = None
+        self._conn_pid: int | None = None
+
+    @classmethod
+    def from_env(cls) -> SharedState | None:
+        """Build shared state from `JOB_SCRAPER_SHARED_STATE`, if configured."""
+        path = os.environ.get(SHARED_STATE_ENV, "").strip()
+        if not path:
+            return None
+        return cls(path)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen whenever the pid changes.
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            initialize_wal(conn, SCHEMA)
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+    # Result cache -----------------------------------------------------------
+
+    def get_result(self, key: str) -> Any | None:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM results WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def update_result(
+        self,
+        key: str,
+        update: Callable[[Any | None], Any],
+        ttl: float | None = None,
+    ) -> Any:
+        """Replace `key` with `update(current)` in one write transaction.
+
+        Concurrent workers updating the same key each see the other's write,
+        instead of one overwriting the other. `current` is None when the key
+        is missing or expired. Returns the stored value.
+        """
+        now = time.time()
+        expires_at = now + (self.result_ttl if ttl is None else ttl)
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM results WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                current = json.loads(row[0]) if row is not None and row[1] > now else None
+                value = update(current)
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def put_result(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.time() + (self.result_ttl if ttl is None else ttl)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            # Expired rows are never read, so they are only swept now and then.
+            now = time.time()
+            if now - self._swept_at >= RESULT_SWEEP_INTERVAL:
+                self._swept_at = now
+                conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+
+    # Per-host rate budget ---------------------------------------------------
+
+    def reserve(self, host: str) -> float:
+        """Take one token from `host`'s bucket and return how long to wait for it.
+
+        Tokens are reserved even when the bucket is empty (the balance goes
+        negative), so concurrent callers queue up behind each other instead of
+        polling.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_buckets WHERE host = ?",
+                    (host,),
+                ).fetchone()
+                if row is None:
+                    tokens = self.host_burst
+                else:
+                    elapsed = max(now - row[1], 0.0)
+                    tokens = min(self.host_burst, row[0] + elapsed * self.host_rate)
+                tokens -= 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (host, tokens, updated_at) VALUES (?, ?, ?)",
+                    (host, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return 0.0 if tokens >= 0 else -tokens / self.host_rate
+
+    async def throttle(self, host: str) -> None:
+        delay = await asyncio.to_thread(self.reserve, host)
+        if delay > 0:
+            logger.debug(f"Shared rate budget: waiting {delay:.2f}s for {host}")
+            await asyncio.sleep(delay)
+
+    # Single-flight leases ---------------------------------------------------
+
+    def try_acquire(self, key: str, owner: str, lease: float | None = None) -> bool:
+        now = time.time()
+        expires_at = now + (self.lock_lease if lease is None else lease)
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, expires_at),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def renew(self, key: str, owner: str, lease: float | None = None) -> bool:
+        """Extend a lease `owner` still holds; False if it has lost it."""
+        expires_at = time.time() + (self.lock_lease if lease is None else lease)
+        with self._lock:
+            cursor = self._connection().execute(
+                "UPDATE locks SET expires_at = ? WHERE key = ? AND owner = ?",
+                (expires_at, key, owner),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM locks WHERE key = ? AND owner = ?",
+                (key, owner),
+            )
+
+    @asynccontextmanager
+    async def keep_alive(
+        self,
+        key: str,
+        owner: str,
+        lease: float | None = None,
+    ) -> AsyncIterator[None]:
+        """Renew a held lease every third of its length until the block exits.
+
+        A crawl slower than the lease would otherwise lose it, and a second
+        worker would start the same crawl.
+        """
+        lease = self.lock_lease if lease is None else lease
+
+        async def renew() -> None:
+            while True:
+                await asyncio.sleep(lease / 3)
+                if not await asyncio.to_thread(self.renew, key, owner, lease):
+                    logger.warning(f"Lost the lease on {key}")
+                    return
+
+        task = asyncio.create_task(renew())
+        try:
+            yield
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @asynccontextmanager
+    async def single_flight(
+        self,
+        key: str,
+        *,
+        lease: float | None = None,
+        poll_interval: float = 0.05,
+    ) -> AsyncIterator[None]:
+        """Hold the lease for `key`, waiting while another worker owns it."""
+        owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        while not await asyncio.to_thread(self.try_acquire, key, owner, lease):
+            await asyncio.sleep(poll_interval)
+        try:
+            async with self.keep_alive(key, owner, lease):
+                yield
+        finally:
+            await asyncio.to_thread(self.release, key, owner)
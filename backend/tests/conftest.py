@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from admission import AdmissionController
+from scrapers import glassdoor_scraper
+
+
+@pytest.fixture(autouse=True)
+def fresh_admission(monkeypatch):
+    # Every TestClient request comes from the same client, so a shared bucket
+    # would run dry partway through the suite.
+    monkeypatch.setattr(main, "admission", AdmissionController())
+
+
+@pytest.fixture(autouse=True)
+def fresh_glassdoor_probe(monkeypatch):
+    # What one test teaches the scraper about a domain must not leak into the next.
+    monkeypatch.setattr(glassdoor_scraper, "PAGE_NUMBERS_HONORED", {})
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from admission import AdmissionController, AdmissionRejected
+from job_scraper_manager import JobScraperManager
+from scrapers import JobRecord
+
+client = TestClient(main.app)
+
+
+def test_quota_rejects_with_retry_after_and_refills():
+    admission = AdmissionController(client_rate=10, client_burst=100)
+
+    admission.charge("a", 80)
+    with pytest.raises(AdmissionRejected) as exc:
+        admission.charge("a", 50)
+
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after == 3
+    admission.charge("b", 100)
+    admission.refund("a", 80)
+    admission.charge("a", 100)
+    assert admission.snapshot()["decisions"]["rejected_quota"] == 1
+
+
+def test_costs_above_the_burst_need_a_full_bucket():
+    admission = AdmissionController(client_rate=1, client_burst=100)
+
+    admission.charge("a", 5000)
+
+    with pytest.raises(AdmissionRejected):
+        admission.charge("a", 1)
+
+
+@pytest.mark.asyncio
+async def test_saturated_slots_queue_then_shed():
+    admission = AdmissionController(max_in_flight=1, max_waiting=1, max_wait=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with admission.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as full:
+        async with admission.slot():
+            pass
+    assert full.value.status_code == 503
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await waiter
+    assert timed_out.value.status_code == 503
+
+    release.set()
+    await holder
+    snapshot = admission.snapshot()
+    assert snapshot["in_flight"] == 0
+    assert snapshot["waiting"] == 0
+    assert snapshot["decisions"] == {
+        "admitted": 1,
+        "queued": 1,
+        "rejected_quota": 0,
+        "shed_queue_full": 1,
+        "shed_timeout": 1,
+    }
+    assert snapshot["queue_wait_seconds"]["max"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_shed_requests_are_refunded():
+    admission = AdmissionController(client_burst=100, max_in_flight=1, max_waiting=0)
+
+    async with admission.admit("a", 60):
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit("b", 60):
+                pass
+        admission.charge("b", 100)
+
+
+def test_scrape_over_quota_returns_429_with_retry_after(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        record = JobRecord(
+            title="Engineer",
+            company="Example",
+            location="Remote",
+            url="https://example.com/1",
+            source="indeed",
+        )
+        return [record], {}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+    monkeypatch.setattr(main, "admission", AdmissionController(client_rate=1, client_burst=10))
+
+    first = client.get("/scrape?country=USA&role=engineer&limit=10&sites=indeed")
+    second = client.get("/scrape?country=USA&role=engineer&limit=10&sites=indeed")
+    other = client.get(
+        "/scrape?country=USA&role=engineer&limit=10&sites=indeed",
+        headers={"X-API-Key": "another-client"},
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers["retry-after"]) >= 1
+    assert other.status_code == 200
+    assert client.get("/debug/admission").json()["decisions"]["rejected_quota"] == 1
+
+
+def test_batch_takes_a_slot_per_query_and_refuses_costs_above_the_burst(monkeypatch):
+    admission = AdmissionController(client_burst=100, max_in_flight=16)
+    monkeypatch.setattr(main, "admission", admission)
+    peak = 0
+
+    async def fake_cached(self, search, sites, limit, fetch):
+        nonlocal peak
+        await asyncio.sleep(0.02)
+        peak = max(peak, admission.in_flight)
+        return [], {}, {}
+
+    monkeypatch.setattr(JobScraperManager, "_cached", fake_cached)
+    query = {"country": "USA", "role": "engineer", "sites": ["indeed"], "limit": 10}
+
+    batch = client.post("/scrape/batch", json={"queries": [query] * 3})
+    too_large = client.post("/scrape/batch", json={"queries": [query] * 11})
+
+    assert batch.status_code == 200
+    assert len(batch.text.splitlines()) == 3
+    assert peak == 3
+    assert admission.snapshot()["decisions"]["admitted"] == 3
+    assert too_large.status_code == 413
+    # The refused batch was not charged: 70 rows are left of the burst.
+    admission.charge("testclient", 70)
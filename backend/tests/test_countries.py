@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from countries import COUNTRY_REGISTRY, UnknownCountryError
+from job_scraper_manager import JobScraperManager, ScrapeQuery, _SharedTransport
+from scrapers import GlassdoorScraper, IndeedScraper, glassdoor_scraper
+
+
+@pytest.mark.parametrize("value", ["UK", "gb", "United Kingdom", " great britain ", "G.B."])
+def test_registry_resolves_aliases_and_iso_codes(value):
+    profile = COUNTRY_REGISTRY.resolve(value)
+
+    assert profile.key == "uk"
+    options = profile.scraper_options("indeed")
+    assert options["domain"] == "uk.indeed.com"
+    assert options["api_country_code"] == "UK"
+    assert "London" in options["shard_locations"]
+
+
+def test_registry_precomputes_localized_headers():
+    assert COUNTRY_REGISTRY.resolve("DE").headers["accept-language"] == "de-DE,de;q=0.9,en;q=0.8"
+    assert COUNTRY_REGISTRY.resolve("").key == "usa"
+
+
+def test_unknown_country_is_rejected():
+    with pytest.raises(UnknownCountryError):
+        JobScraperManager("Atlantis")
+
+
+@pytest.mark.asyncio
+async def test_manager_builds_only_selected_scrapers():
+    manager = JobScraperManager("de")
+
+    async with httpx.AsyncClient() as client:
+        scrapers = manager._build_scrapers(client, ["Glassdoor", "indeed"])
+
+    assert set(scrapers) == {"glassdoor", "indeed"}
+    assert isinstance(scrapers["glassdoor"], GlassdoorScraper)
+    assert scrapers["glassdoor"].base_url == "https://www.glassdoor.de"
+    assert isinstance(scrapers["indeed"], IndeedScraper)
+    assert scrapers["indeed"].api_country_code == "DE"
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_each_countrys_headers(monkeypatch):
+    languages: dict[str, str] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        # The token page is fetched with the client's own headers.
+        if request.method == "GET":
+            languages[request.url.host] = request.headers["accept-language"]
+        return httpx.Response(503)
+
+    monkeypatch.setattr(glassdoor_scraper, "WARM_TOKENS", {})
+    monkeypatch.setattr(JobScraperManager, "_pool", _SharedTransport(httpx.MockTransport(handler)))
+    queries = [
+        ScrapeQuery(role="engineer", country=country, limit=5, sites=("glassdoor",))
+        for country in ("USA", "DE")
+    ]
+
+    results = [result async for result in JobScraperManager.scrape_many(queries)]
+
+    assert len(results) == 2
+    assert languages["www.glassdoor.de"] == COUNTRY_REGISTRY.resolve("DE").headers["accept-language"]
+    assert languages["www.glassdoor.com"] == COUNTRY_REGISTRY.resolve("USA").headers["accept-language"]
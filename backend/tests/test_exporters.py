@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import csv
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import exporters
+from job_scraper_manager import JobScraperManager
+from main import _frame_from_records, app
+from scrapers import JobRecord
+
+client = TestClient(app)
+
+
+def _records(count, source="indeed"):
+    return [
+        JobRecord(
+            title=f"Engineer {index}",
+            company="Example",
+            location=None if index % 2 else "Remote",
+            url=f"https://example.com/{index}",
+            source=source,
+        )
+        for index in range(count)
+    ]
+
+
+def test_csv_export_matches_dataframe_schema_and_dedupes():
+    records = _records(3) + _records(1)
+
+    body = b"".join(exporters.encode("csv", records, chunk_size=2))
+
+    rows = list(csv.DictReader(io.StringIO(body.decode())))
+    frame = _frame_from_records([record.to_dict() for record in records], limit=10)
+    assert list(rows[0]) == list(frame.columns)
+    assert [row["title"] for row in rows] == list(frame["title"])
+
+
+def test_export_yields_one_chunk_per_batch():
+    chunks = list(exporters.encode("csv", _records(10), chunk_size=3))
+
+    # Header, then ceil(10 / 3) row chunks: nothing waits for the full result.
+    assert len(chunks) == 5
+
+
+@pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+def test_columnar_exports_round_trip(export_format):
+    pa = pytest.importorskip("pyarrow")
+    records = _records(25)
+
+    body = b"".join(exporters.encode(export_format, records, limit=20, chunk_size=8))
+
+    if export_format == "arrow":
+        table = pa.ipc.open_stream(body).read_all()
+    else:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(io.BytesIO(body))
+        assert parquet_file.metadata.num_row_groups == 3
+        table = parquet_file.read()
+    assert table.column_names == exporters.RESULT_COLUMNS
+    assert table.num_rows == 20
+    assert table.column("location").to_pylist()[:2] == ["Remote", None]
+
+
+def test_scrape_export_endpoint_streams_csv(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        return _records(4), {"glassdoor": "timeout"}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+
+    response = client.get("/scrape/export?country=USA&role=engineer&limit=3&format=csv")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["x-scrape-errors"] == '{"glassdoor": "timeout"}'
+    assert len(response.text.strip().splitlines()) == 4
+
+
+def test_large_export_streams_through_large_result_mode(monkeypatch):
+    async def fake_stream_jobs(self, *, role, sites, location, limit, errors=None, filters=None):
+        errors["glassdoor"] = "timeout"
+        records = _records(limit)
+        for start in range(0, limit, 500):
+            yield records[start:start + 500]
+
+    async def unexpected_scrape_jobs(self, **kwargs):
+        raise AssertionError("large exports must not collect records")
+
+    monkeypatch.setattr(JobScraperManager, "stream_jobs", fake_stream_jobs)
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", unexpected_scrape_jobs)
+
+    response = client.get("/scrape/export?country=USA&role=engineer&limit=5000&format=csv")
+
+    assert response.status_code == 200
+    assert response.headers["x-scrape-errors"] == '{"glassdoor": "timeout"}'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5000
+    assert rows[-1]["title"] == "Engineer 4999"
+
+
+def test_json_scrape_keeps_the_smaller_limit():
+    response = client.get("/scrape?country=USA&role=engineer&limit=5000")
+
+    assert response.status_code == 422
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from scrapers import SearchQuery
+from scrapers.gazetteer import GAZETTEER, PLACES, Gazetteer
+
+
+def test_board_spellings_resolve_to_the_same_place():
+    austin = GAZETTEER.resolve("Austin, TX", "usa")
+
+    assert austin.key == "usa/texas/austin"
+    for text in ("Austin, TX 78701", "Remote in Austin, TX", "austin, texas, united states"):
+        assert GAZETTEER.resolve(text, "usa") == austin
+    assert GAZETTEER.resolve("Sydney NSW", "australia").key == "australia/new south wales/sydney"
+    assert GAZETTEER.resolve("80331 München", "germany").key == "germany/bavaria/munich"
+    assert GAZETTEER.resolve("San Francisco Bay Area", "usa").key == "usa/california/san francisco"
+    assert GAZETTEER.resolve("Brooklyn, NY", "usa").key == "usa/new york/new york"
+
+
+def test_ambiguous_names_use_country_and_enclosing_parts():
+    assert GAZETTEER.resolve("Portland", "usa").key == "usa/oregon/portland"
+    assert GAZETTEER.resolve("Portland, ME", "usa").key == "usa/maine/portland"
+    assert GAZETTEER.resolve("Birmingham", "uk").key == "uk/england/birmingham"
+    assert GAZETTEER.resolve("Birmingham", "usa").key == "usa/alabama/birmingham"
+    assert GAZETTEER.resolve("Seattle, Washington", "usa").key == "usa/washington/seattle"
+    # Unknown or contradictory parts only resolve to what encloses them.
+    assert GAZETTEER.resolve("Paris, TX", "usa") is None
+    place, exact = GAZETTEER.locate("Paris, TX", "usa")
+    assert (place.key, exact) == ("usa/texas", False)
+
+
+def test_each_gazetteer_caches_its_own_lookups():
+    usa_only = Gazetteer([entry for entry in PLACES if entry["key"] == "usa"])
+
+    assert usa_only.locate("Munich", "germany") == (None, False)
+    assert GAZETTEER.locate("Munich", "germany")[0].key == "germany/bavaria/munich"
+    assert usa_only._located.cache_info().currsize == 1
+
+
+def test_job_locations_match_by_containment_and_radius():
+    query = SearchQuery.parse("engineer", "Portland, OR", "usa")
+
+    assert query.matches_location("Portland, OR 97201")
+    assert not query.matches_location("Portland, ME")
+    # Old keyword matching kept any location containing "portland".
+    assert not query.matches_location("South Portland, ME")
+    assert not query.matches_location("Oregon")
+    assert query.matches_location(None)
+
+    new_york = SearchQuery.parse("engineer", "New York, NY", "usa")
+    assert not new_york.matches_location("Jersey City, NJ")
+    assert new_york.matches_location("Jersey City, NJ", radius=25)
+    assert not new_york.matches_location("Boston, MA", radius=25)
+    # Unknown towns are kept when the board searched a radius.
+    assert new_york.matches_location("Hoboken, NJ", radius=25)
+
+    texas = SearchQuery.parse("engineer", "Texas", "usa")
+    assert texas.matches_location("Remote in Austin, TX")
+    assert texas.matches_location("Round Rock, TX")
+    assert not texas.matches_location("Tulsa, OK")
+
+    unknown = SearchQuery.parse("engineer", "Round Rock, TX", "usa")
+    assert unknown.place is None
+    assert unknown.matches_location("Round Rock, TX")
+    assert not unknown.matches_location("Austin, TX")
+    assert unknown.matches_location("Austin, TX", radius=10)
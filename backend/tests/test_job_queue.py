@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from job_queue import QueueFullError, ScrapeJobQueue
+from job_scraper_manager import JobScraperManager
+from scrapers import JobRecord
+from shared_state import SharedState
+
+
+async def _wait_done(queue: ScrapeJobQueue, job_id: str):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job is not None and job.done:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_on_bounded_workers_and_record_results():
+    running = 0
+    peak = 0
+
+    async def run(params):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if params["role"] == "broken":
+            raise RuntimeError("board unreachable")
+        return {"role": params["role"]}
+
+    queue = ScrapeJobQueue(run, workers=2)
+    await queue.start()
+    try:
+        jobs = [await queue.submit({"role": f"role {index}"}) for index in range(5)]
+        failing = await queue.submit({"role": "broken"})
+
+        results = [await _wait_done(queue, job.id) for job in jobs]
+        failed = await _wait_done(queue, failing.id)
+    finally:
+        await queue.stop()
+
+    assert [job.result for job in results] == [{"role": f"role {index}"} for index in range(5)]
+    assert all(job.status == "succeeded" and job.expires_at > job.finished_at for job in results)
+    assert failed.status == "failed"
+    assert failed.error == "board unreachable"
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_jobs_beyond_queue_depth():
+    release = asyncio.Event()
+
+    async def run(params):
+        await release.wait()
+        return {}
+
+    queue = ScrapeJobQueue(run, workers=1, max_queued=2)
+    await queue.start()
+    try:
+        first = await queue.submit({})
+        while (await queue.get(first.id)).status != "running":
+            await asyncio.sleep(0.01)
+        await queue.submit({})
+        await queue.submit({})
+        with pytest.raises(QueueFullError):
+            await queue.submit({})
+        assert await queue.depth() == 2
+    finally:
+        release.set()
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire_after_retention():
+    async def run(params):
+        return {"ok": True}
+
+    queue = ScrapeJobQueue(run, retention=0.05)
+    await queue.start()
+    try:
+        job = await _wait_done(queue, (await queue.submit({})).id)
+        assert job.result == {"ok": True}
+        time.sleep(0.06)
+        assert await queue.get(job.id) is None
+        assert queue.purge() == 1
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_results_and_unfinished_jobs_survive_restart(tmp_path):
+    path = tmp_path / "jobs.db"
+    release = asyncio.Event()
+
+    async def run(params):
+        if params["role"] == "slow":
+            await release.wait()
+        return {"role": params["role"]}
+
+    first = ScrapeJobQueue(run, path=path, workers=1)
+    await first.start()
+    done = await _wait_done(first, (await first.submit({"role": "fast"})).id)
+    interrupted = await first.submit({"role": "slow"})
+    waiting = await first.submit({"role": "queued"})
+    await asyncio.sleep(0.05)
+    assert (await first.get(interrupted.id)).status == "running"
+    await first.stop()
+    first.close()
+
+    release.set()
+    second = ScrapeJobQueue(run, path=path, workers=1)
+    await second.start()
+    try:
+        assert (await second.get(done.id)).result == {"role": "fast"}
+        assert (await _wait_done(second, interrupted.id)).result == {"role": "slow"}
+        assert (await _wait_done(second, waiting.id)).result == {"role": "queued"}
+    finally:
+        await second.stop()
+        second.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_leave_jobs_running_on_a_live_sibling(tmp_path):
+    path = tmp_path / "jobs.db"
+    release = asyncio.Event()
+    runners = []
+
+    async def run(params):
+        await release.wait()
+        return {"role": params["role"]}
+
+    async def sibling_run(params):
+        runners.append("sibling")
+        return await run(params)
+
+    sibling = ScrapeJobQueue(sibling_run, path=path, workers=1, lease=0.3, poll_interval=0.05)
+    await sibling.start()
+    job = await sibling.submit({"role": "slow"})
+    while (await sibling.get(job.id)).status != "running":
+        await asyncio.sleep(0.01)
+
+    live = ScrapeJobQueue(run, path=path, workers=1, lease=0.3, poll_interval=0.05)
+    await live.start()
+    try:
+        assert await live.depth() == 0
+        # Heartbeats keep the job owned past its lease.
+        await asyncio.sleep(0.4)
+        assert (await live.get(job.id)).status == "running"
+        assert runners == ["sibling"]
+
+        # A sibling that dies without stopping stops heartbeating, and the
+        # live worker claims its job once the lease runs out.
+        for task in sibling._tasks:
+            task.cancel()
+        release.set()
+        assert (await _wait_done(live, job.id)).result == {"role": "slow"}
+        assert runners == ["sibling"]
+    finally:
+        await live.stop()
+        live.close()
+        sibling.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_claim_jobs_queued_by_a_dead_sibling(tmp_path):
+    path = tmp_path / "jobs.db"
+
+    async def run(params):
+        return {"role": params["role"]}
+
+    live = ScrapeJobQueue(run, path=path, workers=1, poll_interval=0.05)
+    await live.start()
+    sibling = ScrapeJobQueue(run, path=path, workers=1)
+    await sibling.start()
+    # The sibling dies right after accepting a job, before any worker of its own runs it.
+    for task in sibling._tasks:
+        task.cancel()
+    try:
+        job = await sibling.submit({"role": "orphaned"})
+        assert (await _wait_done(live, job.id)).result == {"role": "orphaned"}
+    finally:
+        await live.stop()
+        live.close()
+        sibling.close()
+
+
+def test_jobs_share_the_shared_state_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("JOB_SCRAPER_JOBS_PATH", raising=False)
+
+    async def run(params):
+        return {}
+
+    queue = ScrapeJobQueue.from_env(run, shared_state=SharedState(tmp_path / "state.db"))
+
+    assert queue.path == str(tmp_path / "state.db")
+    assert ScrapeJobQueue.from_env(run).path == ":memory:"
+
+
+def test_scrape_job_endpoints(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        await asyncio.sleep(0.01)
+        record = JobRecord(
+            title="Backend Engineer",
+            company="Example",
+            location="Remote",
+            url="https://example.com/job",
+            source="indeed",
+        )
+        return [record], {}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+
+    with TestClient(main.app) as client:
+        submitted = client.post("/scrape/jobs?country=USA&role=engineer&limit=5")
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+        assert submitted.json()["status"] == "queued"
+        assert submitted.headers["location"] == f"/scrape/jobs/{job_id}"
+
+        for _ in range(200):
+            body = client.get(f"/scrape/jobs/{job_id}").json()
+            if body["status"] == "succeeded":
+                break
+            time.sleep(0.01)
+
+        assert body["result"]["dataframe"]["rows"][0]["company"] == "Example"
+        assert body["result"]["total_rows"] == 1
+        assert client.get(f"/results/{body['result']['result_id']}").status_code == 200
+        assert client.get("/scrape/jobs/unknown").status_code == 404
+        assert client.post("/scrape/jobs?country=Atlantis&role=engineer").status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_jobs_stored_before_filters_existed_still_run(monkeypatch):
+    seen = []
+
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        seen.append(filters)
+        record = JobRecord(
+            title="Engineer",
+            company="Example",
+            location="Remote",
+            url="https://example.com/1",
+            source="indeed",
+        )
+        return [record], {}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+    params = {"country": "USA", "role": "engineer", "location": None, "limit": 5, "sites": ["indeed"]}
+
+    result = await main._run_scrape_job(params)
+
+    assert result["total_rows"] == 1
+    assert seen == [main.NO_FILTERS]
+
+
+def test_scrape_job_queue_full_returns_503(monkeypatch):
+    monkeypatch.setattr(main.job_queue, "max_queued", 0)
+
+    with TestClient(main.app) as client:
+        response = client.post("/scrape/jobs?country=USA&role=engineer")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(main.JOB_QUEUE_RETRY_AFTER)
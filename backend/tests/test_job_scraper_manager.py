@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from job_scraper_manager import JobScraperManager, merge_ranked, plan_quotas
+from scrapers import BaseJobScraper, JobRecord, SearchQuery
+
+
+class PagedScraper(BaseJobScraper):
+    """Serves fixed-size pages and records how many were requested."""
+
+    def __init__(self, site_name, *, total, page_size=10, fail_after=None):
+        super().__init__(site_name, client=None)
+        self.total = total
+        self.page_size = page_size
+        self.fail_after = fail_after
+        self.pages_requested = 0
+        self.limits = []
+
+    async def stream(self, *, role, location, country, limit):
+        self.limits.append(limit)
+        for start in range(0, self.total, self.page_size):
+            if self.fail_after is not None and self.pages_requested >= self.fail_after:
+                raise RuntimeError(f"{self.site_name} blocked")
+            self.pages_requested += 1
+            yield [
+                JobRecord(
+                    title=f"{role} {index}",
+                    company=self.site_name,
+                    location=location,
+                    url=f"https://{self.site_name}.example/{index}",
+                    source=self.site_name,
+                )
+                for index in range(start, min(start + self.page_size, self.total))
+            ]
+
+
+def _patch_scrapers(monkeypatch, scrapers):
+    monkeypatch.setattr(
+        JobScraperManager,
+        "_build_scrapers",
+        lambda self, client, sites: {site: scrapers[site] for site in sites},
+    )
+
+
+def test_plan_quotas_splits_limit_evenly():
+    assert plan_quotas(["linkedin", "indeed", "glassdoor"], 200) == {
+        "linkedin": 67,
+        "indeed": 67,
+        "glassdoor": 66,
+    }
+
+
+def _records(site, titles):
+    return [
+        JobRecord(
+            title=title,
+            company=site,
+            location=None,
+            url=f"https://{site}.example/{index}",
+            source=site,
+        )
+        for index, title in enumerate(titles)
+    ]
+
+
+def test_merge_ranked_orders_by_relevance_and_keeps_each_sites_share():
+    query = SearchQuery.parse("senior data engineer", None, "usa")
+    by_site = {
+        "linkedin": _records("linkedin", ["Senior Data Engineer"] * 8),
+        "indeed": _records("indeed", ["Sales Engineer", "Data Engineer", "Recruiter", "Data Engineer"]),
+    }
+
+    merged = merge_ranked(by_site, query, 6)
+
+    assert [record.title for record in merged] == [
+        "Senior Data Engineer",
+        "Senior Data Engineer",
+        "Senior Data Engineer",
+        "Data Engineer",
+        "Data Engineer",
+        "Sales Engineer",
+    ]
+    assert sum(record.source == "indeed" for record in merged) == 3
+
+
+def test_merge_ranked_gives_unused_share_to_the_best_remaining_rows():
+    query = SearchQuery.parse("data engineer", None, "usa")
+    by_site = {
+        "linkedin": _records("linkedin", ["Recruiter", "Data Engineer", "Designer", "Data Engineer"]),
+        "indeed": _records("indeed", ["Data Engineer"] * 5),
+        "glassdoor": [],
+    }
+
+    merged = merge_ranked(by_site, query, 6)
+
+    # Glassdoor's two slots go to Indeed's matches, not LinkedIn's misfits.
+    assert [record.source for record in merged].count("indeed") == 4
+    assert {record.title for record in merged if record.source == "linkedin"} == {"Data Engineer"}
+    assert len(merge_ranked(by_site, query, 100)) == 9
+
+
+@pytest.mark.asyncio
+async def test_scrape_jobs_fetches_only_each_sites_quota(monkeypatch):
+    scrapers = {
+        site: PagedScraper(site, total=500)
+        for site in ("linkedin", "indeed", "glassdoor")
+    }
+    _patch_scrapers(monkeypatch, scrapers)
+
+    records, errors = await JobScraperManager("usa").scrape_jobs(
+        role="engineer",
+        sites=list(scrapers),
+        location=None,
+        limit=60,
+    )
+
+    assert errors == {}
+    assert len(records) == 60
+    assert {site: scraper.limits for site, scraper in scrapers.items()} == {
+        "linkedin": [20],
+        "indeed": [20],
+        "glassdoor": [20],
+    }
+    assert all(scraper.pages_requested == 2 for scraper in scrapers.values())
+
+
+@pytest.mark.asyncio
+async def test_scrape_jobs_redistributes_unused_quota(monkeypatch):
+    scrapers = {
+        "linkedin": PagedScraper("linkedin", total=500),
+        "indeed": PagedScraper("indeed", total=5),
+        "glassdoor": PagedScraper("glassdoor", total=500, fail_after=0),
+    }
+    _patch_scrapers(monkeypatch, scrapers)
+
+    records, errors = await JobScraperManager("usa").scrape_jobs(
+        role="engineer",
+        sites=list(scrapers),
+        location=None,
+        limit=60,
+    )
+
+    assert set(errors) == {"glassdoor"}
+    counts = {site: sum(record.source == site for record in records) for site in scrapers}
+    assert counts == {"linkedin": 55, "indeed": 5, "glassdoor": 0}
+    assert scrapers["linkedin"].pages_requested == 6
+
+
+@pytest.mark.asyncio
+async def test_stream_jobs_yields_pages_and_redistributes_quota(monkeypatch):
+    scrapers = {
+        "linkedin": PagedScraper("linkedin", total=5000, page_size=100),
+        "indeed": PagedScraper("indeed", total=200, page_size=100),
+        "glassdoor": PagedScraper("glassdoor", total=5000, page_size=100, fail_after=1),
+    }
+    _patch_scrapers(monkeypatch, scrapers)
+    errors = {}
+
+    pages = [
+        page
+        async for page in JobScraperManager("usa").stream_jobs(
+            role="engineer",
+            sites=list(scrapers),
+            location=None,
+            limit=3000,
+            errors=errors,
+        )
+    ]
+
+    records = [record for page in pages for record in page]
+    assert len(records) == 3000
+    assert len({record.url for record in records}) == 3000
+    assert sum(record.source == "indeed" for record in records) == 200
+    assert sum(record.source == "glassdoor" for record in records) == 100
+    assert errors == {"glassdoor": "glassdoor blocked"}
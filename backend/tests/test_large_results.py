@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from large_results import BloomFilter, SpillBuffer
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10_000, error_rate=1e-3)
+
+    added = sum(bloom.add(("title", index)) for index in range(10_000))
+    assert added > 9_950
+    assert not any(bloom.add(("title", index)) for index in range(10_000))
+    false_positives = sum(("other", index) in bloom for index in range(10_000))
+    assert false_positives < 50
+    assert bloom.nbytes < 20_000
+
+
+def test_spill_buffer_round_trips_rows_through_disk():
+    rows = [{"title": f"Engineer {index}", "source": "indeed"} for index in range(2000)]
+
+    with SpillBuffer(threshold=1024) as spill:
+        spill.write(rows)
+
+        assert len(spill) == 2000
+        assert list(spill.rows()) == rows
+        assert list(spill.rows()) == rows
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from job_scraper_manager import JobScraperManager
+from live_feeds import FeedHub
+from scrapers import JobRecord
+
+
+def _row(index):
+    return {
+        "title": f"Engineer {index}",
+        "company": "Example",
+        "location": "Remote",
+        "url": f"https://example.com/{index}",
+        "source": "indeed",
+    }
+
+
+async def _next(events):
+    return await asyncio.wait_for(anext(events), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_poller_and_get_only_new_jobs():
+    hub = FeedHub()
+    hub.interval = 0.01
+    results = [[_row(1), _row(2)], [_row(2), _row(3)], [_row(3)], [_row(3), _row(4)]]
+    polls = []
+
+    async def poll():
+        polls.append(len(polls))
+        return results[min(len(polls) - 1, len(results) - 1)], {}
+
+    async def unexpected_poll():
+        raise AssertionError("the second subscriber must join the running feed")
+
+    async with hub.subscribe("search", poll) as first:
+        first_events = first.events()
+        assert [row["url"] for row in (await _next(first_events)).rows] == [
+            "https://example.com/1",
+            "https://example.com/2",
+        ]
+        async with hub.subscribe("search", unexpected_poll) as second:
+            second_events = second.events()
+            # A late subscriber starts from the latest result set.
+            assert len((await _next(second_events)).rows) == 2
+            new = await _next(first_events)
+            assert [row["url"] for row in new.rows] == ["https://example.com/3"]
+            assert (await _next(second_events)).rows == new.rows
+        assert len(hub) == 1
+
+    assert len(hub) == 0
+    stopped_after = len(polls)
+    await asyncio.sleep(0.05)
+    assert len(polls) == stopped_after
+
+
+@pytest.mark.asyncio
+async def test_failed_polls_are_reported_and_polling_continues():
+    hub = FeedHub()
+    hub.interval = 0.01
+    polls = []
+
+    async def poll():
+        polls.append(None)
+        if len(polls) == 1:
+            raise RuntimeError("boom")
+        return [_row(1)], {"glassdoor": "timeout"}
+
+    async with hub.subscribe("search", poll) as subscription:
+        events = subscription.events()
+        failed = await _next(events)
+        assert (failed.kind, failed.errors) == ("error", {"feed": "boom"})
+        assert (await _next(events)).rows == [_row(1)]
+        assert (await _next(events)).errors == {"glassdoor": "timeout"}
+
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_streams_events_and_stops_the_feed_on_disconnect(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        record = JobRecord(**_row(1))
+        return [record], {}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+    monkeypatch.setattr(main, "live_feeds", FeedHub())
+    requested = False
+    sent = []
+    first_event = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await first_event.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_event.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/scrape/subscribe",
+        "raw_path": b"/scrape/subscribe",
+        "root_path": "",
+        "query_string": b"country=USA&role=engineer&limit=5&sites=indeed",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(main.app(scope, receive, send), timeout=5)
+
+    start = next(message for message in sent if message["type"] == "http.response.start")
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in start["headers"]
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    event, data = body.decode().split("\n")[:2]
+    assert event == "event: jobs"
+    assert json.loads(data.removeprefix("data: "))["rows"] == [_row(1)]
+    assert len(main.live_feeds) == 0
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+import profiling
+from job_scraper_manager import JobScraperManager
+from scrapers import BaseJobScraper, JobRecord
+from search_cache import SearchCache
+
+client = TestClient(main.app)
+
+
+class OnePageScraper(BaseJobScraper):
+    def __init__(self, site_name):
+        super().__init__(site_name, client=None)
+
+    async def stream(self, *, role, location, country, limit):
+        with profiling.stage("parse"):
+            page = [
+                JobRecord(
+                    title=f"Engineer {index}",
+                    company="Example",
+                    location="Remote",
+                    url=f"https://{self.site_name}.example/{index}",
+                    source=self.site_name,
+                )
+                for index in range(limit)
+            ]
+        yield page
+
+
+def _patch_scrapers(monkeypatch):
+    monkeypatch.setattr(
+        JobScraperManager,
+        "_build_scrapers",
+        lambda self, client, sites: {site: OnePageScraper(site) for site in sites},
+    )
+    # Every test crawls; nothing is answered from an earlier test's cache.
+    monkeypatch.setattr(main, "search_cache", SearchCache())
+
+
+def test_stage_is_a_no_op_without_a_profile():
+    with profiling.stage("parse"):
+        pass
+
+    assert profiling.current_timeline() is None
+
+
+@pytest.mark.asyncio
+async def test_http_tracer_records_network_stages():
+    timeline = profiling.Timeline(method="GET", path="/scrape")
+    tracer = profiling._HttpTracer(timeline, "www.indeed.com/jobs")
+
+    with profiling.site_page("indeed", 2):
+        for event in (
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.complete",
+            "http11.send_request_headers.started",
+            "http11.receive_response_headers.complete",
+            "http11.receive_response_body.started",
+            "http11.receive_response_body.complete",
+        ):
+            await tracer(event, {})
+
+    assert [span.stage for span in timeline.spans] == ["connect", "ttfb", "download"]
+    assert {(span.site, span.page) for span in timeline.spans} == {("indeed", 2)}
+
+
+def test_profiled_scrape_reports_a_per_site_timeline(monkeypatch):
+    _patch_scrapers(monkeypatch)
+
+    response = client.get(
+        "/scrape?country=USA&role=engineer&limit=4&sites=indeed&sites=linkedin",
+        headers={"x-profile": "1"},
+    )
+
+    assert response.status_code == 200
+    for stage in ("page", "parse", "dedupe", "dataframe", "serialize"):
+        assert f"{stage};dur=" in response.headers["server-timing"]
+    timeline = client.get(f"/debug/profiles/{response.headers['x-profile-id']}").json()
+    parse_spans = [span for span in timeline["spans"] if span["stage"] == "parse"]
+    assert {(span["site"], span["page"]) for span in parse_spans} == {("indeed", 0), ("linkedin", 0)}
+
+
+def test_unprofiled_requests_carry_no_timeline(monkeypatch):
+    _patch_scrapers(monkeypatch)
+
+    response = client.get("/scrape?country=USA&role=engineer&limit=4&sites=indeed")
+
+    assert "server-timing" not in response.headers
+    assert client.get("/debug/profiles/unknown").status_code == 404
+
+
+def test_slow_requests_are_captured(monkeypatch):
+    _patch_scrapers(monkeypatch)
+    monkeypatch.setattr(main.profiler, "slow_request_seconds", 0.0)
+    main.profiler.slow_requests.clear()
+
+    client.get("/scrape?country=USA&role=engineer&limit=4&sites=indeed&profile=1")
+
+    captured = client.get("/debug/slow-requests").json()["requests"]
+    assert captured[0]["path"] == "/scrape"
+    assert captured[0]["timeline"]["totals"]["dedupe"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_a_blocked_loop():
+    monitor = profiling.LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)  # Block the event loop.
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    assert monitor.snapshot()["max_seconds"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_streamed_responses_are_timed_until_the_last_chunk():
+    profiler = profiling.RequestProfiler(slow_request_seconds=0.05)
+    request = Request({"type": "http", "method": "GET", "path": "/scrape/export", "query_string": b"", "headers": []})
+
+    async def body():
+        yield b"header\n"
+        await asyncio.sleep(0.1)
+        yield b"row\n"
+
+    async def call_next(request):
+        return StreamingResponse(body())
+
+    response = await profiler.dispatch(request, call_next)
+    assert not profiler.slow_requests
+
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert chunks == [b"header\n", b"row\n"]
+    (captured,) = profiler.slow_requests
+    assert captured["path"] == "/scrape/export"
+    assert captured["duration_seconds"] >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_detached_tasks_do_not_record_into_the_request_timeline():
+    timeline = profiling.Timeline(method="GET", path="/scrape/subscribe")
+    token = profiling._timeline.set(timeline)
+    try:
+
+        async def poll():
+            with profiling.stage("parse"):
+                await asyncio.sleep(0)
+            return profiling.current_timeline()
+
+        detached = await asyncio.create_task(poll(), context=profiling.detached_context())
+        inherited = await asyncio.create_task(poll())
+    finally:
+        profiling._timeline.reset(token)
+
+    assert detached is None
+    assert inherited is timeline
+    assert [span.stage for span in timeline.spans] == ["parse"]
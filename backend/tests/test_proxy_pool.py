@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from proxy_pool import BASE_COOLDOWN, ProxyPool
+from scrapers import glassdoor_scraper
+from scrapers.glassdoor_scraper import GlassdoorScraper
+
+
+class StandInProxy:
+    """A local HTTP proxy that answers every proxied request itself."""
+
+    def __init__(self, name: str, statuses: list[int] | None = None):
+        self.name = name
+        self.statuses = list(statuses or [])
+        self.connections = 0
+        self.requests: list[str] = []
+        self.server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> StandInProxy:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.server.close()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.requests.append(head.split(b"\r\n", 1)[0].decode())
+                status = self.statuses.pop(0) if self.statuses else 200
+                body = self.name.encode()
+                extra = "Retry-After: 60\r\n" if status == 429 else ""
+                writer.write(
+                    f"HTTP/1.1 {status} Stand-in\r\nContent-Length: {len(body)}\r\n{extra}\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_proxy_connections_and_skip_rate_limited_proxies():
+    async with StandInProxy("limited", [429] * 4) as limited, StandInProxy("healthy") as healthy:
+        pool = ProxyPool([limited.url, healthy.url])
+        # A slower first sample makes the untimed, rate-limited proxy go first.
+        pool.proxies[1].succeeded(0.5)
+        async with httpx.AsyncClient(transport=pool) as client:
+            bodies = [(await client.get("http://board.test/jobs")).text for _ in range(4)]
+        await pool.aclose()
+        limited_proxy, healthy_proxy = pool.snapshot()["proxies"]
+
+    assert bodies == ["healthy"] * 4
+    assert len(limited.requests) == 1
+    assert healthy.requests == ["GET http://board.test/jobs HTTP/1.1"] * 4
+    assert healthy.connections == 1
+    assert healthy_proxy["requests"] == 4
+    assert limited_proxy["evictions"] == 1
+    assert not limited_proxy["available"]
+    assert limited_proxy["cooldown_seconds"] > 50
+
+
+def _mock_proxies(url: str) -> httpx.AsyncBaseTransport:
+    name = httpx.URL(url).host
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if name.startswith("down"):
+            raise httpx.ConnectError("Proxy unreachable", request=request)
+        return httpx.Response(200, text=name)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_pool_prefers_healthy_fast_proxies_and_evicts_failing_ones():
+    pool = ProxyPool(["http://slow.test", "http://fast.test"], transport_factory=_mock_proxies)
+    slow, fast = pool.proxies
+    slow.succeeded(0.1)
+    fast.succeeded(0.02)
+    assert all(pool.choose() is fast for _ in range(10))
+    fast.failed()
+    fast.failed()
+    assert pool.choose() is slow
+
+    retried = ProxyPool(["http://down.test", "http://up.test"], transport_factory=_mock_proxies)
+    async with httpx.AsyncClient(transport=retried) as client:
+        assert (await client.get("http://board.test/jobs")).text == "up.test"
+
+    alone = ProxyPool(["http://down.test"], transport_factory=_mock_proxies)
+    async with httpx.AsyncClient(transport=alone) as client:
+        for _ in range(3):
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://board.test/jobs")
+    proxy = alone.snapshot()["proxies"][0]
+    assert proxy["evictions"] == 1
+    assert not proxy["available"]
+    assert proxy["cooldown_seconds"] == pytest.approx(BASE_COOLDOWN, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_token_and_searches_share_one_proxy(monkeypatch):
+    monkeypatch.setattr(glassdoor_scraper, "WARM_TOKENS", {})
+    seen: dict[str, set[str]] = {}
+    empty_graph = {"data": {"jobListings": {"jobListings": [], "paginationCursors": []}}}
+
+    def factory(url: str) -> httpx.AsyncBaseTransport:
+        name = httpx.URL(url).host
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/Job/jobs.htm"):
+                return httpx.Response(200, text=f'{{"token":"{name}"}}')
+            # A token is only accepted from the address that fetched it.
+            assert request.headers["gd-csrf-token"] == name
+            seen.setdefault(request.headers["x-scraper"], set()).add(name)
+            return httpx.Response(200, json=[empty_graph])
+
+        return httpx.MockTransport(handler)
+
+    pool = ProxyPool(
+        [f"http://proxy-{index}.test" for index in range(4)],
+        transport_factory=factory,
+        rng=random.Random(7),
+    )
+
+    async def search(scraper_id: str) -> None:
+        async with httpx.AsyncClient(transport=pool, headers={"x-scraper": scraper_id}) as client:
+            scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+            await asyncio.gather(
+                *(
+                    scraper.fetch(role=role, location="Austin, TX", country="usa", limit=5)
+                    for role in ("engineer", "designer", "analyst")
+                )
+            )
+
+    await asyncio.gather(*(search(str(index)) for index in range(6)))
+
+    assert len(seen) == 6
+    assert all(len(proxies) == 1 for proxies in seen.values())
+    assert pool.snapshot()["pinned_sessions"] == 6
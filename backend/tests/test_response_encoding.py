@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import gzip
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import response_encoding
+from response_encoding import MIN_COMPRESS_SIZE, compress, negotiate
+
+
+def test_negotiate_honours_quality_values():
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("deflate, gzip;q=0.5") == "gzip"
+    assert negotiate("*") == next(iter(response_encoding.ENCODERS))
+
+
+def test_compress_skips_small_bodies():
+    body = b"x" * (MIN_COMPRESS_SIZE - 1)
+
+    assert compress(body, "gzip") == (body, None)
+
+
+def test_compress_round_trips_gzip():
+    body = b'{"rows": []}' * 200
+
+    compressed, encoding = compress(body, "gzip")
+
+    assert encoding == "gzip"
+    assert len(compressed) < len(body)
+    assert gzip.decompress(compressed) == body
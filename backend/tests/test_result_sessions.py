@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from job_scraper_manager import JobScraperManager
+from main import app
+from result_sessions import InvalidCursorError, ResultSessionStore, ResultView
+from scrapers import JobRecord
+from shared_state import SharedState
+
+client = TestClient(app)
+
+
+def _rows():
+    return [
+        {"title": "Zeta Engineer", "company": "B", "location": "Berlin", "url": "u1", "source": "indeed"},
+        {"title": "Alpha Engineer", "company": "A", "location": None, "url": "u2", "source": "linkedin"},
+        {"title": "Mid Analyst", "company": "C", "location": "Munich", "url": "u3", "source": "indeed"},
+        {"title": "Beta Engineer", "company": "D", "location": "Berlin", "url": "u4", "source": "glassdoor"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_keep_their_sort_and_filter():
+    store = ResultSessionStore()
+    session = await store.create(_rows(), country="DE")
+    view = ResultView(sort="title", text="engineer")
+
+    first = store.page(session, page_size=2, view=view)
+    second = store.page(session, page_size=2, cursor=first.next_cursor)
+
+    assert [row["title"] for row in first.rows] == ["Alpha Engineer", "Beta Engineer"]
+    assert [row["title"] for row in second.rows] == ["Zeta Engineer"]
+    assert first.total_rows == second.total_rows == 3
+    assert second.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_from_another_result_is_rejected():
+    store = ResultSessionStore()
+    first = await store.create(_rows())
+    other = await store.create(_rows()[1:])
+    cursor = store.page(first, page_size=1).next_cursor
+
+    with pytest.raises(InvalidCursorError):
+        store.page(other, page_size=1, cursor=cursor)
+    with pytest.raises(InvalidCursorError):
+        store.page(other, page_size=1, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_shared_between_workers(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+    session = await ResultSessionStore(shared_state=state).create(_rows(), country="DE")
+
+    restored = await ResultSessionStore(shared_state=state).get(session.id)
+
+    assert restored.rows == session.rows
+    assert restored.source_counts == {"indeed": 2, "linkedin": 1, "glassdoor": 1}
+
+
+def test_scrape_returns_first_page_and_serves_the_rest(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        return [JobRecord(**row) for row in _rows()], {}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+
+    first = client.get("/scrape?country=DE&role=engineer&page_size=3").json()
+    assert first["dataframe"]["row_count"] == 3
+    assert first["total_rows"] == 4
+    assert first["source_counts"] == {"indeed": 2, "linkedin": 1, "glassdoor": 1}
+
+    rest = client.get(
+        f"/results/{first['result_id']}",
+        params={"cursor": first["next_cursor"], "page_size": 3},
+    ).json()
+    assert [row["url"] for row in rest["dataframe"]["rows"]] == ["u4"]
+    assert rest["next_cursor"] is None
+
+    filtered = client.get(
+        f"/results/{first['result_id']}",
+        params={"sources": "indeed", "sort": "title", "order": "desc"},
+    ).json()
+    assert [row["title"] for row in filtered["dataframe"]["rows"]] == ["Zeta Engineer", "Mid Analyst"]
+
+
+def test_unknown_result_id_is_not_found():
+    assert client.get("/results/missing").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_identical_results_share_a_session_id():
+    store = ResultSessionStore()
+    first = await store.create(_rows(), country="DE")
+    again = await store.create(list(reversed(_rows())), country="DE")
+    elsewhere = await store.create(_rows(), country="FR")
+
+    assert again.id == first.id
+    assert again.rows == first.rows
+    assert elsewhere.id != first.id
+
+
+@pytest.mark.asyncio
+async def test_reused_session_takes_the_new_metadata():
+    store = ResultSessionStore()
+    first = await store.create([{"title": "a", "source": "indeed"}], identity={"query": "q"}, fetched_at={"indeed": 1.0})
+    again = await store.create([{"title": "a", "source": "indeed"}], identity={"query": "q"}, fetched_at={"indeed": 2.0})
+
+    assert again is first
+    assert again.meta["fetched_at"] == {"indeed": 2.0}
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import sys
 from pathlib import Path
 
@@ -11,13 +12,13 @@ if str(ROOT) not in sys.path:
 
 from job_scraper_manager import JobScraperManager
 from main import app
-from scrapers import JobRecord
+from scrapers import BaseJobScraper, JobRecord, SearchFilters
 
 client = TestClient(app)
 
 
 def test_scrape_success(monkeypatch):
-    async def fake_scrape_jobs(self, *, role, sites, location, limit):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
         return (
             [
                 JobRecord(
@@ -42,7 +43,7 @@ def test_scrape_success(monkeypatch):
 
 
 def test_scrape_failure(monkeypatch):
-    async def fake_scrape_jobs(self, *, role, sites, location, limit):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
         return ([], {"indeed": "timeout"})
 
     monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
@@ -58,3 +59,154 @@ def test_scrape_rejects_unknown_site(monkeypatch):
     )
     assert response.status_code == 400
 
+
+
+def test_scrape_rejects_unknown_country():
+    response = client.get("/scrape?country=Atlantis&role=engineer")
+    assert response.status_code == 400
+    assert "Atlantis" in response.json()["detail"]
+
+
+def test_scrape_batch_streams_one_line_per_query(monkeypatch):
+    class FakeScraper(BaseJobScraper):
+        def __init__(self, site_name, country):
+            super().__init__(site_name, client=None)
+            self.country = country
+
+        async def stream(self, *, role, location, country, limit):
+            yield [
+                JobRecord(
+                    title=f"{role} ({self.country})",
+                    company="Example",
+                    location=location,
+                    url=f"https://example.com/{self.site_name}/{role}",
+                    source=self.site_name,
+                )
+            ]
+
+    def fake_build_scrapers(self, client, sites):
+        return {site: FakeScraper(site, self.country) for site in sites}
+
+    monkeypatch.setattr(JobScraperManager, "_build_scrapers", fake_build_scrapers)
+
+    response = client.post(
+        "/scrape/batch",
+        json={
+            "queries": [
+                {"country": "USA", "role": "engineer", "sites": ["indeed"]},
+                {"country": "Germany", "role": "analyst", "location": "Berlin"},
+            ],
+            "concurrency": 2,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert set(by_index) == {0, 1}
+    assert by_index[0]["dataframe"]["row_count"] == 1
+    assert by_index[0]["dataframe"]["rows"][0]["title"] == "engineer (usa)"
+    assert by_index[1]["dataframe"]["row_count"] == 3
+    assert by_index[1]["sites"] == ["linkedin", "indeed", "glassdoor"]
+
+
+def test_scrape_batch_rejects_unknown_site():
+    response = client.post(
+        "/scrape/batch",
+        json={"queries": [{"country": "USA", "role": "engineer", "sites": ["monster"]}]},
+    )
+    assert response.status_code == 400
+
+
+def _many_records(count):
+    return [
+        JobRecord(
+            title=f"Data Engineer {index}",
+            company="Example",
+            location="Remote",
+            url=f"https://example.com/job/{index}",
+            source="indeed",
+        )
+        for index in range(count)
+    ]
+
+
+def test_scrape_compresses_large_payloads(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        return (_many_records(60), {})
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+
+    response = client.get(
+        "/scrape?country=USA&role=engineer&limit=60",
+        headers={"accept-encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["dataframe"]["row_count"] == 60
+
+
+def test_scrape_returns_304_for_unchanged_results(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        return (_many_records(3), {})
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+
+    first = client.get("/scrape?country=USA&role=engineer&limit=5")
+    etag = first.headers["etag"]
+    again = client.get(
+        "/scrape?country=USA&role=engineer&limit=5",
+        headers={"if-none-match": etag},
+    )
+    paged = client.get(
+        "/scrape?country=USA&role=engineer&limit=5&page_size=2",
+        headers={"if-none-match": etag},
+    )
+
+    assert "content-encoding" not in first.headers
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+    assert paged.status_code == 200
+    assert paged.headers["etag"] != etag
+
+
+def test_scrape_etag_changes_when_identical_rows_are_refetched(monkeypatch):
+    fetches = iter([1000.0, 1000.0, 2000.0])
+
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        self.fetched_at = {"indeed": next(fetches)}
+        return (_many_records(3), {})
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+    url = "/scrape?country=USA&role=engineer&limit=5&sites=indeed"
+
+    etag = client.get(url).headers["etag"]
+    unchanged = client.get(url, headers={"if-none-match": etag})
+    refreshed = client.get(url, headers={"if-none-match": etag})
+
+    assert unchanged.status_code == 304
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+
+
+def test_scrape_passes_filters_to_the_manager(monkeypatch):
+    seen = []
+
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        seen.append(filters)
+        return ([JobRecord(title="Engineer", company="Example", location="Remote", url="https://example.com/1", source="indeed")], {})
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+
+    response = client.get(
+        "/scrape?country=USA&role=filtered engineer&posted_within_days=3&job_type=contract&radius=25&remote=true",
+    )
+
+    assert response.status_code == 200
+    assert seen == [SearchFilters(posted_within_days=3, job_type="contract", radius=25, remote=True)]
+    assert client.get("/scrape?country=USA&role=engineer&job_type=gig").status_code == 422
+    assert client.get("/scrape?country=USA&role=engineer&posted_within_days=90").status_code == 422
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from job_scraper_manager import JobScraperManager
+from scrapers import BaseJobScraper, JobRecord, ScraperRegistry, registry
+
+
+class EchoScraper(BaseJobScraper):
+    def __init__(self, client):
+        super().__init__("echo", client)
+
+    async def stream(self, *, role, location, country, limit):
+        yield [
+            JobRecord(
+                title=role,
+                company="Echo",
+                location=location,
+                url="https://echo.example/1",
+                source=self.site_name,
+            )
+        ]
+
+
+class FakeEntryPoint:
+    name = "Echo"
+    value = f"{__name__}:EchoScraper"
+
+
+def test_importing_manager_does_not_import_scraper_modules():
+    code = (
+        "import sys, job_scraper_manager; "
+        "print(sorted(m for m in sys.modules "
+        "if m.startswith('scrapers.') and m.endswith('_scraper') or m == 'bs4'))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == "['scrapers.base_scraper']"
+
+
+def test_registry_discovers_entry_points_lazily(monkeypatch):
+    monkeypatch.setattr(registry, "entry_points", lambda group: [FakeEntryPoint()])
+    scrapers = ScraperRegistry()
+    scrapers.register("linkedin", "scrapers.linkedin_scraper:LinkedInScraper")
+
+    assert scrapers.names() == ("linkedin", "echo")
+    assert "ECHO" in scrapers
+    assert scrapers.get("echo") is EchoScraper
+
+
+@pytest.mark.asyncio
+async def test_registered_scraper_is_usable_by_manager(monkeypatch):
+    scrapers = ScraperRegistry(entry_point_group=None)
+    scrapers.register("echo")(EchoScraper)
+    monkeypatch.setattr("job_scraper_manager.SCRAPER_REGISTRY", scrapers)
+
+    records, errors = await JobScraperManager("uk").scrape_jobs(
+        role="engineer",
+        sites=["echo"],
+        location="London",
+        limit=5,
+    )
+
+    assert errors == {}
+    assert [record.company for record in records] == ["Echo"]
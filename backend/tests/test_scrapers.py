@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import re
 import sys
 from pathlib import Path
 
@@ -10,6 +13,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
+from scrapers import SearchFilters, glassdoor_scraper
 from scrapers.glassdoor_scraper import GlassdoorScraper
 from scrapers.indeed_scraper import IndeedScraper
 from scrapers.linkedin_scraper import LinkedInScraper
@@ -47,6 +51,35 @@ async def test_linkedin_scraper_parses_jobs():
     assert jobs[0].company == "Acme Corp"
 
 
+@pytest.mark.asyncio
+async def test_linkedin_scraper_keeps_jobs_inside_the_searched_place():
+    cards = "".join(
+        f"""
+        <div class="base-search-card">
+            <a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/{index}/" />
+            <h3 class="base-search-card__title">Engineer</h3>
+            <h4 class="base-search-card__subtitle">Acme Corp</h4>
+            <span class="job-search-card__location">{where}</span>
+        </div>
+        """
+        for index, where in enumerate(["Portland, OR", "Portland, ME", "Portland, Oregon Metropolitan Area"])
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=cards if request.url.params["start"] == "0" else "")
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        jobs = await LinkedInScraper(client).fetch(
+            role="engineer",
+            location="Portland, OR",
+            country="usa",
+            limit=5,
+        )
+
+    assert [job.location for job in jobs] == ["Portland, OR", "Portland, Oregon Metropolitan Area"]
+
+
 @pytest.mark.asyncio
 async def test_indeed_scraper_parses_jobs():
     payload = {
@@ -162,3 +195,372 @@ async def test_glassdoor_scraper_parses_jobs():
     assert jobs[0].source == "glassdoor"
     assert "glassdoor.com" in jobs[0].url
 
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_reuses_token_and_location_lookups():
+    calls = {"token": 0, "location": 0}
+    graph = {
+        "data": {
+            "jobListings": {
+                "jobListings": [],
+                "paginationCursors": [],
+            }
+        }
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/Job/jobs.htm"):
+            calls["token"] += 1
+            return httpx.Response(200, text='{"token":"mock-token"}')
+        if request.url.path.endswith("findPopularLocationAjax.htm"):
+            calls["location"] += 1
+            return httpx.Response(200, json=[{"locationId": 1, "locationType": "C"}])
+        return httpx.Response(200, json=[graph])
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        await asyncio.gather(
+            *(
+                scraper.fetch(role=role, location="Texas", country="usa", limit=5)
+                for role in ("engineer", "designer", "analyst")
+            )
+        )
+
+    assert calls == {"token": 1, "location": 1}
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_skips_the_lookup_for_known_places():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path.endswith("/graph"):
+            variables = json.loads(request.content)[0]["variables"]
+            assert (variables["locationId"], variables["locationType"]) == (1139761, "CITY")
+            return httpx.Response(200, json=[_glassdoor_page(1)])
+        return _glassdoor_setup_response(request)
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        jobs = await scraper.fetch(role="engineer", location="Austin, TX", country="usa", limit=10)
+
+    assert len(jobs) == 10
+    assert not any(path.endswith("findPopularLocationAjax.htm") for path in requests)
+
+
+def _glassdoor_page(page_number, *, cursor_for_next=None):
+    cursors = [{"pageNumber": page_number + 1, "cursor": cursor_for_next}] if cursor_for_next else []
+    return {
+        "data": {
+            "jobListings": {
+                "jobListings": [
+                    {
+                        "jobview": {
+                            "job": {"listingId": f"{page_number}-{index}"},
+                            "header": {
+                                "jobTitleText": f"Engineer {page_number}-{index}",
+                                "employerNameFromSearch": "Example",
+                                "locationName": "Austin, TX",
+                                "jobLink": f"/job-listing/j?jl={page_number}-{index}",
+                            },
+                        }
+                    }
+                    for index in range(30)
+                ],
+                "paginationCursors": cursors,
+            }
+        }
+    }
+
+
+def _glassdoor_setup_response(request):
+    if request.url.path.endswith("/Job/jobs.htm"):
+        return httpx.Response(200, text='{"token":"mock-token"}')
+    if request.url.path.endswith("findPopularLocationAjax.htm"):
+        return httpx.Response(200, json=[{"locationId": 1, "locationType": "C"}])
+    return None
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_batches_numbered_pages_in_one_post():
+    graph_posts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        setup = _glassdoor_setup_response(request)
+        if setup is not None:
+            return setup
+        payloads = json.loads(request.content)
+        graph_posts.append([payload["variables"]["pageNumber"] for payload in payloads])
+        return httpx.Response(
+            200,
+            json=[_glassdoor_page(payload["variables"]["pageNumber"]) for payload in payloads],
+        )
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        jobs = await scraper.fetch(role="engineer", location=None, country="usa", limit=60)
+
+    assert graph_posts == [[1, 2]]
+    assert len(jobs) == 60
+    assert scraper._page_numbers_honored is True
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_falls_back_to_cursors_when_page_numbers_are_ignored():
+    graph_posts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        setup = _glassdoor_setup_response(request)
+        if setup is not None:
+            return setup
+        payloads = json.loads(request.content)
+        graph_posts.append(len(payloads))
+        pages = []
+        for payload in payloads:
+            # Without a cursor this API always answers with the first page.
+            page = 2 if payload["variables"]["pageCursor"] == "cursor-2" else 1
+            pages.append(_glassdoor_page(page, cursor_for_next="cursor-2" if page == 1 else None))
+        return httpx.Response(200, json=pages)
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        jobs = await scraper.fetch(role="engineer", location=None, country="usa", limit=60)
+        # Every crawl builds a new scraper; what the first one learned sticks.
+        later = GlassdoorScraper(client, domain="www.glassdoor.com")
+        await later.fetch(role="analyst", location=None, country="usa", limit=60)
+
+    assert len({job.url for job in jobs}) == 60
+    assert later._page_numbers_honored is False
+    # First search: one speculative batch, then one chained page. Second
+    # search: chained pages only.
+    assert graph_posts == [2, 1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_resolves_token_and_location_concurrently():
+    location_requested = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/Job/jobs.htm"):
+            # Only answers once the location lookup is already in flight.
+            await asyncio.wait_for(location_requested.wait(), timeout=1)
+            return httpx.Response(200, text='{"token":"mock-token"}')
+        if request.url.path.endswith("findPopularLocationAjax.htm"):
+            location_requested.set()
+            return httpx.Response(200, json=[{"locationId": 1, "locationType": "C"}])
+        assert request.headers["gd-csrf-token"] == "mock-token"
+        return httpx.Response(200, json=[_glassdoor_page(1)])
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        jobs = await scraper.fetch(role="engineer", location="Texas", country="usa", limit=10)
+
+    assert len(jobs) == 10
+
+
+def _indeed_sharded_handler(requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        match = re.search(r'where: "([^"]*)", radius: (\d+)', query)
+        where, radius = (match.group(1), int(match.group(2))) if match else ("", 0)
+        requests.append((where, radius))
+        results = [
+            {
+                "job": {
+                    "key": f"{where or 'national'}-{radius}-{len(requests)}",
+                    "title": "Data Scientist",
+                    "employer": {"name": "Example Inc"},
+                    "location": {"formatted": {"long": where or "Remote"}},
+                }
+            },
+            # Every shard also returns the same nationwide listing.
+            {
+                "job": {
+                    "key": "shared",
+                    "title": "Data Scientist",
+                    "employer": {"name": "Everywhere Inc"},
+                    "location": {"formatted": {"long": "Remote"}},
+                }
+            },
+        ]
+        return httpx.Response(
+            200,
+            json={"data": {"jobSearch": {"pageInfo": {"nextCursor": "next"}, "results": results}}},
+        )
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_indeed_scraper_shards_nationwide_search_within_budget():
+    requests = []
+    transport = httpx.MockTransport(_indeed_sharded_handler(requests))
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = IndeedScraper(
+            client,
+            domain="www.indeed.com",
+            api_country_code="US",
+            shard_locations=["Austin, TX", "Boston, MA"],
+            request_budget=6,
+        )
+        jobs = await scraper.fetch(role="data scientist", location=None, country="usa", limit=300)
+
+    assert len(requests) == 6
+    assert {where for where, _ in requests} == {"", "Austin, TX", "Boston, MA"}
+    assert len(jobs) == 7
+    assert sum(job.company == "Everywhere Inc" for job in jobs) == 1
+
+
+@pytest.mark.asyncio
+async def test_indeed_scraper_splits_a_city_search_into_radius_rings():
+    requests = []
+    transport = httpx.MockTransport(_indeed_sharded_handler(requests))
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = IndeedScraper(
+            client,
+            domain="www.indeed.com",
+            api_country_code="US",
+            shard_locations=["Austin, TX"],
+            request_budget=4,
+        )
+        await scraper.fetch(role="data scientist", location="Austin, TX", country="usa", limit=300)
+        # Rings stop at the default radius, so sharding never widens a search.
+        assert {radius for _, radius in requests} == {10, 25}
+        requests.clear()
+        await scraper.fetch(
+            role="data scientist",
+            location="Austin, TX",
+            country="usa",
+            limit=300,
+            filters=SearchFilters(radius=100),
+        )
+        assert sorted(radius for _, radius in requests[:4]) == [10, 25, 50, 100]
+        requests.clear()
+        small = await scraper.fetch(role="data scientist", location="Austin, TX", country="usa", limit=5)
+
+    # Small searches keep the single cursor chain at the default radius.
+    assert set(requests) == {("Austin, TX", 25)}
+    assert len(small) == 5
+
+
+@pytest.mark.asyncio
+async def test_indeed_scraper_pushes_filters_into_job_search():
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        queries.append(json.loads(request.content)["query"])
+        return httpx.Response(200, json={"data": {"jobSearch": {"pageInfo": {}, "results": []}}})
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = IndeedScraper(client, domain="www.indeed.com", api_country_code="US")
+        await scraper.fetch(
+            role="data scientist",
+            location=None,
+            country="usa",
+            limit=10,
+            filters=SearchFilters(posted_within_days=3, job_type="contract", remote=True),
+        )
+
+    (query,) = queries
+    assert 'date: {field: "dateOnIndeed", start: "72h"}' in query
+    assert 'keys: ["NJXCK"]' in query
+    assert 'keys: ["DSQF7"]' in query
+    # Remote is an attribute filter, not a place called "remote".
+    assert "where:" not in query
+
+
+@pytest.mark.asyncio
+async def test_linkedin_scraper_maps_filters_to_guest_search_params():
+    params = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params.append(dict(request.url.params))
+        return httpx.Response(200, text="")
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = LinkedInScraper(client)
+        await scraper.fetch(
+            role="engineer",
+            location="Austin, TX",
+            country="usa",
+            limit=5,
+            filters=SearchFilters(
+                posted_within_days=7,
+                job_type="fulltime",
+                experience="mid_senior",
+                radius=50,
+            ),
+        )
+
+    assert params[0]["f_TPR"] == "r604800"
+    assert params[0]["f_JT"] == "F"
+    assert params[0]["f_E"] == "4"
+    assert params[0]["distance"] == "50"
+    assert "f_WT" not in params[0]
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_sends_filter_params():
+    variables = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        setup = _glassdoor_setup_response(request)
+        if setup is not None:
+            return setup
+        payloads = json.loads(request.content)
+        variables.extend(payload["variables"] for payload in payloads)
+        return httpx.Response(200, json=[_glassdoor_page(1)])
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        await scraper.fetch(
+            role="engineer",
+            location=None,
+            country="usa",
+            limit=10,
+            filters=SearchFilters(posted_within_days=14, job_type="internship", experience="entry"),
+        )
+
+    assert variables[0]["filterParams"] == [
+        {"filterKey": "fromAge", "values": "14"},
+        {"filterKey": "jobType", "values": "internship"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_glassdoor_scraper_retries_failed_token_and_location_lookups():
+    setup_requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        setup_requests.append(request.url.path)
+        # Every setup call fails the first time only.
+        if setup_requests.count(request.url.path) == 1:
+            return httpx.Response(503)
+        return _glassdoor_setup_response(request)
+
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+        assert await scraper._csrf_token() == glassdoor_scraper.FALLBACK_TOKEN
+        assert await scraper._cached_location("Austin", "token") == (
+            glassdoor_scraper.DEFAULT_LOCATION_ID,
+            glassdoor_scraper.DEFAULT_LOCATION_TYPE,
+        )
+
+        assert await scraper._csrf_token() == "mock-token"
+        assert await scraper._cached_location("Austin", "token") == (1, "CITY")
+        # Successes are memoized as before.
+        assert await scraper._csrf_token() == "mock-token"
+        assert await scraper._cached_location("Austin", "token") == (1, "CITY")
+
+    assert len(setup_requests) == 4
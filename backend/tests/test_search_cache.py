@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from job_scraper_manager import JobScraperManager
+from scrapers import BaseJobScraper, JobRecord
+from search_cache import CachedSite, SearchCache
+from shared_state import SharedState
+
+
+class VersionedScraper(BaseJobScraper):
+    """Serves one page whose titles carry how often the site was crawled."""
+
+    crawls: dict[str, int] = {}
+    failing: set[str] = set()
+
+    def __init__(self, site_name):
+        super().__init__(site_name, client=None)
+
+    async def stream(self, *, role, location, country, limit):
+        crawl = self.crawls[self.site_name] = self.crawls.get(self.site_name, 0) + 1
+        if self.site_name in self.failing:
+            raise RuntimeError(f"{self.site_name} is down")
+        yield [
+            JobRecord(
+                title=f"Engineer v{crawl}",
+                company="Example",
+                location="Remote",
+                url=f"https://{self.site_name}.example/{crawl}/{index}",
+                source=self.site_name,
+            )
+            for index in range(limit)
+        ]
+
+
+@pytest.fixture
+def scrapers(monkeypatch):
+    VersionedScraper.crawls = {}
+    VersionedScraper.failing = set()
+    monkeypatch.setattr(
+        JobScraperManager,
+        "_build_scrapers",
+        lambda self, client, sites: {site: VersionedScraper(site) for site in sites},
+    )
+    return VersionedScraper
+
+
+async def _search(cache: SearchCache) -> tuple[JobScraperManager, list[JobRecord], dict[str, str]]:
+    manager = JobScraperManager("usa", cache=cache)
+    records, errors = await manager.scrape_jobs(
+        role="engineer",
+        sites=["indeed", "linkedin"],
+        location=None,
+        limit=4,
+    )
+    return manager, records, errors
+
+
+def _age(cache: SearchCache, site: str, seconds: float) -> None:
+    key = next(iter(cache._entries))
+    entry = cache._entries[key][site]
+    entry.fetched_at = time.time() - seconds
+
+
+@pytest.mark.asyncio
+async def test_fresh_results_are_served_without_crawling(scrapers):
+    cache = SearchCache(soft_ttl=60, hard_ttl=600)
+
+    await _search(cache)
+    manager, records, errors = await _search(cache)
+
+    assert scrapers.crawls == {"indeed": 1, "linkedin": 1}
+    assert len(records) == 4
+    assert errors == {}
+    assert set(manager.fetched_at) == {"indeed", "linkedin"}
+
+
+@pytest.mark.asyncio
+async def test_soft_stale_site_is_served_then_refreshed_in_background(scrapers):
+    cache = SearchCache(soft_ttl=60, hard_ttl=600)
+    await _search(cache)
+    _age(cache, "indeed", 120)
+
+    manager, records, _ = await _search(cache)
+
+    # The stale rows are answered immediately...
+    assert {record.title for record in records if record.source == "indeed"} == {"Engineer v1"}
+    assert time.time() - manager.fetched_at["indeed"] >= 120
+    await cache.drain()
+    # ...and only the stale board was crawled again.
+    assert scrapers.crawls == {"indeed": 2, "linkedin": 1}
+
+    _, records, _ = await _search(cache)
+    assert {record.title for record in records if record.source == "indeed"} == {"Engineer v2"}
+    assert {record.title for record in records if record.source == "linkedin"} == {"Engineer v1"}
+
+
+@pytest.mark.asyncio
+async def test_past_hard_ttl_blocks_on_a_crawl_of_expired_sites_only(scrapers):
+    cache = SearchCache(soft_ttl=60, hard_ttl=600)
+    await _search(cache)
+    _age(cache, "linkedin", 900)
+
+    manager, records, _ = await _search(cache)
+
+    assert scrapers.crawls == {"indeed": 1, "linkedin": 2}
+    assert {record.title for record in records if record.source == "linkedin"} == {"Engineer v2"}
+    assert time.time() - manager.fetched_at["linkedin"] < 5
+    assert not cache._refreshing
+
+
+@pytest.mark.asyncio
+async def test_failed_site_is_served_with_its_error_and_retried_in_background(scrapers):
+    cache = SearchCache(soft_ttl=60, hard_ttl=600)
+    scrapers.failing.add("linkedin")
+    _, records, errors = await _search(cache)
+    assert errors == {"linkedin": "linkedin is down"}
+    assert {record.source for record in records} == {"indeed"}
+
+    scrapers.failing.clear()
+    _, _, errors = await _search(cache)
+    assert errors == {"linkedin": "linkedin is down"}
+    await cache.drain()
+
+    _, records, errors = await _search(cache)
+    assert errors == {}
+    assert {record.source for record in records} == {"indeed", "linkedin"}
+    assert scrapers.crawls == {"indeed": 1, "linkedin": 2}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_equivalent_searches_share_one_crawl(scrapers):
+    cache = SearchCache(soft_ttl=60, hard_ttl=600)
+
+    async def search(role):
+        manager = JobScraperManager("usa", cache=cache)
+        records, _ = await manager.scrape_jobs(role=role, sites=["indeed"], location=None, limit=4)
+        return records
+
+    first, second = await asyncio.gather(
+        search("Senior Python Developer"),
+        search("python developer senior"),
+    )
+
+    assert scrapers.crawls == {"indeed": 1}
+    assert first == second
+    assert not cache._flights
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_keeps_per_site_entries(tmp_path):
+    cache = SearchCache(shared_state=SharedState(tmp_path / "state.db"))
+    await cache.put("search:1", {"indeed": CachedSite(records=[], fetched_at=time.time() - 30)})
+    await cache.put("search:1", {"linkedin": CachedSite(records=[], error="timeout")})
+
+    entries = await cache.get("search:1")
+
+    assert set(entries) == {"indeed", "linkedin"}
+    assert entries["indeed"].age() >= 30
+    assert entries["linkedin"].error == "timeout"
+    assert cache.stale(entries["linkedin"])
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_merges_sites_written_by_another_worker(tmp_path):
+    path = tmp_path / "state.db"
+    first = SearchCache(shared_state=SharedState(path))
+    second = SearchCache(shared_state=SharedState(path))
+
+    # Both workers read the entry before either writes its board.
+    assert await first.get("search:1") == await second.get("search:1") == {}
+    await first.put("search:1", {"indeed": CachedSite(records=[])})
+    await second.put("search:1", {"linkedin": CachedSite(records=[])})
+
+    assert set(await first.get("search:1")) == {"indeed", "linkedin"}
+
+
+def test_scrape_reports_data_age(scrapers, monkeypatch):
+    monkeypatch.setattr(main, "search_cache", SearchCache(soft_ttl=60, hard_ttl=600))
+    client = TestClient(main.app)
+    url = "/scrape?country=USA&role=engineer&limit=4&sites=indeed"
+
+    first = client.get(url)
+    assert first.json()["data_age"]["indeed"] < 5
+
+    _age(main.search_cache, "indeed", 30)
+    second = client.get(url)
+
+    assert second.json()["data_age"]["indeed"] >= 30
+    assert int(second.headers["age"]) >= 30
+    assert scrapers.crawls == {"indeed": 1}
+
+
+class HangingScraper(BaseJobScraper):
+    """Serves one page, then waits forever for the next one."""
+
+    first_page: asyncio.Event
+    closed: list[str]
+
+    def __init__(self, site_name):
+        super().__init__(site_name, client=None)
+
+    async def stream(self, *, role, location, country, limit):
+        try:
+            yield [
+                JobRecord(
+                    title="Engineer",
+                    company="Example",
+                    location="Remote",
+                    url=f"https://{self.site_name}.example/1",
+                    source=self.site_name,
+                )
+            ]
+            self.first_page.set()
+            await asyncio.Event().wait()
+        finally:
+            self.closed.append(self.site_name)
+
+
+@pytest.fixture
+def hanging(monkeypatch):
+    HangingScraper.first_page = asyncio.Event()
+    HangingScraper.closed = []
+    monkeypatch.setattr(
+        JobScraperManager,
+        "_build_scrapers",
+        lambda self, client, sites: {site: HangingScraper(site) for site in sites},
+    )
+    return HangingScraper
+
+
+@pytest.mark.asyncio
+async def test_cancelled_crawl_closes_scrapers_and_caches_partial_rows(hanging):
+    cache = SearchCache(soft_ttl=60, hard_ttl=600)
+    search = asyncio.create_task(_search(cache))
+    await hanging.first_page.wait()
+
+    search.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await search
+
+    assert sorted(hanging.closed) == ["indeed", "linkedin"]
+    (entries,) = cache._entries.values()
+    assert set(entries) == {"indeed", "linkedin"}
+    assert all(entry.partial and len(entry.records) == 1 for entry in entries.values())
+    assert cache.stale(entries["indeed"])
+
+
+@pytest.mark.asyncio
+async def test_scrape_cancels_the_crawl_when_the_client_disconnects(hanging, monkeypatch):
+    monkeypatch.setattr(main, "search_cache", SearchCache(soft_ttl=60, hard_ttl=600))
+    requested = False
+    sent = []
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if hanging.first_page.is_set():
+            return {"type": "http.disconnect"}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/scrape",
+        "raw_path": b"/scrape",
+        "root_path": "",
+        "query_string": b"country=USA&role=engineer&limit=4&sites=indeed",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(main.app(scope, receive, send), timeout=5)
+
+    assert hanging.closed == ["indeed"]
+    (entries,) = main.search_cache._entries.values()
+    assert entries["indeed"].partial
+    assert [message["status"] for message in sent if message["type"] == "http.response.start"] == [
+        main.CLIENT_CLOSED_REQUEST
+    ]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from job_scraper_manager import JobScraperManager
+from scrapers import JobRecord
+import search_index
+from search_index import JobSearchIndex
+
+
+def _job(title, company="Example", location="Berlin", source="indeed"):
+    return JobRecord(
+        title=title,
+        company=company,
+        location=location,
+        url=f"https://{source}.example/{title.replace(' ', '-')}",
+        source=source,
+    )
+
+
+def test_search_ranks_title_matches_first():
+    index = JobSearchIndex()
+    index.add(
+        [
+            _job("Office Manager", company="Python Software Foundation"),
+            _job("Senior Python Developer"),
+            _job("Data Analyst"),
+        ],
+        country="germany",
+    )
+
+    hits = index.search("python")
+
+    assert [hit.title for hit in hits] == ["Senior Python Developer", "Office Manager"]
+    assert hits[0].score > hits[1].score
+
+
+def test_search_filters_by_source_and_country_and_updates_incrementally():
+    index = JobSearchIndex()
+    index.add([_job("Python Developer", source="indeed")], country="germany")
+    index.add([_job("Python Developer", source="linkedin")], country="uk")
+    index.add([_job("Python Developer", source="indeed")], country="germany")
+
+    assert len(index) == 2
+    assert [hit.source for hit in index.search("pyth", sources=["linkedin"])] == ["linkedin"]
+    assert [hit.country for hit in index.search("python", country="germany")] == ["germany"]
+
+
+def test_index_prunes_old_and_excess_jobs_on_insert(monkeypatch):
+    index = JobSearchIndex(max_rows=3, max_age=60)
+    clock = iter([1000.0, 1010.0, 1100.0])
+    monkeypatch.setattr(search_index.time, "time", lambda: next(clock))
+
+    index.add([_job("Python Developer"), _job("Python Tester")], country="usa")
+    index.add([_job("Python Lead"), _job("Python Architect")], country="usa")
+
+    # The least recently scraped job goes first once the index is over its cap.
+    assert {hit.title for hit in index.search("python")} == {
+        "Python Tester",
+        "Python Lead",
+        "Python Architect",
+    }
+
+    index.add([_job("Data Analyst")], country="usa")
+
+    assert [hit.title for hit in index.search("analyst")] == ["Data Analyst"]
+    assert index.search("python") == []
+
+
+@pytest.mark.parametrize("text", ['"unbalanced', "title:python OR", "*", "NEAR("])
+def test_search_treats_input_as_plain_words(text):
+    index = JobSearchIndex()
+    index.add([_job("Python Developer")], country="usa")
+
+    index.search(text)
+
+
+def test_search_endpoint_serves_previously_scraped_jobs(monkeypatch):
+    async def fake_scrape_jobs(self, *, role, sites, location, limit, filters=None):
+        return [_job("Backend Engineer", location="Remote")], {}
+
+    monkeypatch.setattr(JobScraperManager, "scrape_jobs", fake_scrape_jobs)
+    monkeypatch.setattr(main, "search_index", JobSearchIndex())
+    client = TestClient(main.app)
+
+    client.get("/scrape?country=USA&role=engineer")
+    response = client.get("/search?q=backend&country=us&sources=indeed")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["country"] == "usa"
+    assert [result["title"] for result in body["results"]] == ["Backend Engineer"]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from job_scraper_manager import JobScraperManager
+from scrapers import NO_FILTERS, SearchFilters, SearchQuery
+
+
+@pytest.mark.parametrize(
+    "role",
+    ["Senior Python Developer", "python developer senior", "Python Developer (Senior)", "Sr. Python Dev"],
+)
+def test_equivalent_roles_share_a_canonical_form(role):
+    query = SearchQuery.parse(role, None, "usa")
+
+    assert query.role == "senior python developer"
+    assert query.key == SearchQuery.parse("senior python developer", None, "usa").key
+
+
+def test_technology_tokens_survive_parsing():
+    query = SearchQuery.parse("C++ / .NET developer, Node.js", None)
+
+    assert query.role_tokens == ("c++", ".net", "developer", "node.js")
+
+
+def test_remote_is_a_flag_wherever_it_is_written():
+    in_role = SearchQuery.parse("remote data engineer", None, "uk")
+    in_location = SearchQuery.parse("Data Engineer", "Work from home", "uk")
+    with_city = SearchQuery.parse("data engineer", "Remote - London", "uk")
+
+    assert in_role == in_location
+    assert in_role.remote and in_role.nationwide
+    assert with_city.location == "london"
+    assert with_city.location_keywords == frozenset()
+
+
+def test_location_naming_the_country_is_nationwide():
+    manager = JobScraperManager("USA")
+
+    assert manager.parse_query("engineer", "United States").key == manager.parse_query("engineer", None).key
+    assert manager.parse_query("engineer", "Austin, TX").location == "austin, tx"
+
+
+def test_canonical_text_parses_back_to_the_same_query():
+    query = SearchQuery.parse("Lead ML Engineer", "Remote, Berlin", "germany")
+
+    assert SearchQuery.parse(query.role, query.location_text, "germany") == query
+
+
+def test_role_keywords_skip_generic_words():
+    assert SearchQuery.parse("Senior Data Engineer", None).role_keywords == {"data"}
+    assert SearchQuery.parse("Engineer", None).role_keywords == {"engineer"}
+    assert SearchQuery.parse("ML engineer", None).role_keywords == {"ml"}
+
+
+def test_filters_are_part_of_the_key_and_remote_folds_into_the_query():
+    plain = SearchQuery.parse("data engineer", None, "usa")
+    filtered = SearchQuery.parse(
+        "data engineer",
+        None,
+        "usa",
+        filters=SearchFilters(posted_within_days=7, job_type="contract", remote=True),
+    )
+
+    assert filtered.remote
+    assert filtered.filters == SearchFilters(posted_within_days=7, job_type="contract")
+    assert filtered.key != plain.key
+    assert SearchQuery.parse("data engineer", None, "usa", filters=NO_FILTERS).key == plain.key
+
+
+def test_punctuation_inside_place_names_separates_words():
+    query = SearchQuery.parse("engineer", "Remote - Winston-Salem, NC", "usa")
+
+    assert query.location == "winston salem, nc"
+    assert SearchQuery.parse("engineer", "Winston-Salem, NC").location_keywords == {"winston", "salem"}
+    # Boards get the place as written; only the key uses the canonical form.
+    assert query.board_location == "Winston-Salem, NC"
+    assert SearchQuery.parse("engineer", query.location_text, "usa") == query
+    assert SearchQuery.parse("engineer", "remote, winston salem, nc", "usa").key == query.key
+    assert SearchQuery.parse("engineer", "Aix-en-Provence", "france").location == "aix en provence"
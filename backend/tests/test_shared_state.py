@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from job_scraper_manager import JobScraperManager
+from scrapers import JobRecord
+from shared_state import SharedState
+
+
+def _single_flight_worker(db_path: str, counter_path: str, results) -> None:
+    manager = JobScraperManager("usa", shared_state=SharedState(db_path))
+    query = manager.parse_query("backend engineer", None)
+
+    async def scrape(sites, limit, runs):
+        # Record every real crawl so the parent can count them.
+        with open(counter_path, "a") as handle:
+            handle.write("crawl\n")
+        await asyncio.sleep(0.3)
+        return [
+            JobRecord(
+                title="Backend Engineer",
+                company="Example",
+                location="Remote",
+                url=f"https://example.com/{index}",
+                source="indeed",
+            )
+            for index in range(3)
+        ], {}
+
+    records, errors, _ = asyncio.run(manager._cached(query, ["indeed"], 3, scrape))
+    results.put([record.url for record in records])
+
+
+def _rate_worker(db_path: str, results) -> None:
+    state = SharedState(db_path, host_rate=10.0, host_burst=5.0)
+    results.put([state.reserve("www.example.com") for _ in range(5)])
+
+
+def _spawn(target, *args, workers: int = 4) -> list:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=target, args=(*args, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+    return collected
+
+
+def test_workers_share_single_flight_and_cache(tmp_path):
+    db_path = str(tmp_path / "state.db")
+    counter_path = tmp_path / "crawls.log"
+    counter_path.touch()
+
+    results = _spawn(_single_flight_worker, db_path, str(counter_path))
+
+    assert results == [[f"https://example.com/{index}" for index in range(3)]] * 4
+    assert counter_path.read_text().count("crawl") == 1
+
+
+def test_workers_share_host_rate_budget(tmp_path):
+    db_path = str(tmp_path / "state.db")
+
+    results = _spawn(_rate_worker, db_path, workers=3)
+
+    delays = sorted(delay for worker in results for delay in worker)
+    # 15 requests against a burst of 5 at 10/s: the last one waits ~1s no
+    # matter which worker issued it.
+    assert delays[:5] == [0.0] * 5
+    assert delays[-1] == pytest.approx(1.0, abs=0.2)
+
+
+def test_expired_lease_can_be_taken_over(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+
+    assert state.try_acquire("query", "worker-a", lease=0.05)
+    assert not state.try_acquire("query", "worker-b")
+    time.sleep(0.1)
+    assert state.try_acquire("query", "worker-b")
+
+
+@pytest.mark.asyncio
+async def test_single_flight_renews_its_lease_while_held(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+
+    async with state.single_flight("query", lease=0.1):
+        await asyncio.sleep(0.3)
+        # Three lease lengths later the holder still owns it.
+        assert not state.try_acquire("query", "worker-b")
+
+    assert state.try_acquire("query", "worker-b")
+
+
+@pytest.mark.asyncio
+async def test_manager_serves_repeat_queries_from_shared_cache(tmp_path, monkeypatch):
+    calls = {"value": 0}
+
+    async def fake_run_sites(self, scrapers, query, sites, limit, *, semaphore=None, runs=None):
+        calls["value"] += 1
+        return (
+            [
+                JobRecord(
+                    title="Backend Engineer",
+                    company="Example",
+                    location="Remote",
+                    url="https://example.com/job",
+                    source="indeed",
+                )
+            ],
+            {},
+        )
+
+    monkeypatch.setattr(JobScraperManager, "_run_sites", fake_run_sites)
+    state = SharedState(tmp_path / "state.db")
+
+    # Equivalent spellings of the same search share one cache entry.
+    for role, location in (("Backend Engineer", None), ("engineer  BACKEND", "U.S.A.")):
+        manager = JobScraperManager("usa", shared_state=state)
+        records, errors = await manager.scrape_jobs(
+            role=role,
+            sites=["indeed"],
+            location=location,
+            limit=5,
+        )
+
+    assert calls["value"] == 1
+    assert records[0].company == "Example"
+    assert errors == {}
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import main
+from job_scraper_manager import JobScraperManager
+from scrapers import glassdoor_scraper
+from scrapers.glassdoor_scraper import GlassdoorScraper
+
+
+def test_importing_main_defers_heavy_dependencies():
+    # A fresh interpreter; this test process has long since imported them.
+    code = (
+        "import sys, main; "
+        "print(','.join(m for m in ('pandas', 'bs4', 'scrapers.linkedin_scraper') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_warmup_countries_read_from_env(monkeypatch):
+    monkeypatch.setenv(main.WARMUP_ENV, " USA, de ,")
+    assert main._warmup_countries() == ["USA", "de"]
+
+    monkeypatch.delenv(main.WARMUP_ENV)
+    assert main._warmup_countries() == []
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pools_connections_and_prefetches_glassdoor_token():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.host))
+        if request.url.path == "/Job/jobs.htm":
+            return httpx.Response(200, text='{"token": "warm-token"}')
+        if request.url.host == "apis.indeed.com":
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(405)
+
+    try:
+        errors = await JobScraperManager.warm_up(["USA", "usa"], transport=httpx.MockTransport(handler))
+
+        assert sorted(requests) == [
+            ("GET", "www.glassdoor.com"),
+            ("HEAD", "apis.indeed.com"),
+            ("HEAD", "www.linkedin.com"),
+        ]
+        assert list(errors) == ["usa:indeed"]
+
+        # Later per-request clients share the pool and the prefetched token.
+        requests.clear()
+        async with JobScraperManager._open_client(None, {}) as client:
+            scraper = GlassdoorScraper(client, domain="www.glassdoor.com")
+            assert await scraper._csrf_token() == "warm-token"
+            await client.head("https://www.linkedin.com/")
+        assert requests == [("HEAD", "www.linkedin.com")]
+    finally:
+        await JobScraperManager.close_pool()
+        glassdoor_scraper.WARM_TOKENS.clear()
+
+    assert JobScraperManager._pool is None
@@ -1,36 +1,30 @@
 "use client"
 
-import { useState } from "react"
+import { useEffect, useRef, useState } from "react"
 import { JobScraperForm, SearchParams } from "@/components/job-scraper-form"
 import { JobResultsTable } from "@/components/job-results-table"
+import { API_BASE_URL, PAGE_SIZE, ScrapeResponse } from "@/lib/api"
 import { toast } from "sonner"
 
-interface JobData {
-  title: string
-  company: string
-  location: string
-  url: string
-  source: string
-}
-
-interface ScrapeResponse {
-  country: string
-  role: string
-  location?: string
-  sites: string[]
-  dataframe: {
-    columns: string[]
-    rows: JobData[]
-    row_count: number
-  }
-  errors?: Record<string, string>
-}
-
 export default function Home() {
   const [isLoading, setIsLoading] = useState(false)
   const [results, setResults] = useState<ScrapeResponse | null>(null)
+  // Aborting the fetch closes the connection, which cancels the backend crawl.
+  const searchRef = useRef<AbortController | null>(null)
+
+  useEffect(() => () => searchRef.current?.abort(), [])
+
+  const handleCancel = () => {
+    searchRef.current?.abort()
+    searchRef.current = null
+    setIsLoading(false)
+  }
 
   const handleSearch = async (params: SearchParams) => {
+    // A new search replaces one still running.
+    searchRef.current?.abort()
+    const controller = new AbortController()
+    searchRef.current = controller
     setIsLoading(true)
     setResults(null)
 
@@ -39,6 +33,7 @@ export default function Home() {
         country: params.country,
         role: params.role,
         limit: params.limit.toString(),
+        page_size: PAGE_SIZE.toString(),
       })
 
       if (params.location) {
@@ -50,7 +45,8 @@ export default function Home() {
       })
 
       const response = await fetch(
-        `http://localhost:8000/scrape?${queryParams.toString()}`
+        `${API_BASE_URL}/scrape?${queryParams.toString()}`,
+        { signal: controller.signal }
       )
 
       if (!response.ok) {
@@ -63,17 +59,21 @@ export default function Home() {
       const data: ScrapeResponse = await response.json()
       setResults(data)
 
-      toast.success(`Found ${data.dataframe.row_count} jobs!`, {
+      toast.success(`Found ${data.total_rows ?? data.dataframe.row_count} jobs!`, {
         description: `Scraped from ${data.sites.join(", ")}`,
       })
     } catch (error) {
+      if (controller.signal.aborted) return
       const message = error instanceof Error ? error.message : "An error occurred"
       toast.error("Search failed", {
         description: message,
       })
       console.error("Search error:", error)
     } finally {
-      setIsLoading(false)
+      if (searchRef.current === controller) {
+        searchRef.current = null
+        setIsLoading(false)
+      }
     }
   }
 
@@ -90,11 +90,16 @@ export default function Home() {
         </div>
 
         <div className="space-y-8">
-          <JobScraperForm onSearch={handleSearch} isLoading={isLoading} />
+          <JobScraperForm onSearch={handleSearch} onCancel={handleCancel} isLoading={isLoading} />
 
           {results && (
             <JobResultsTable
-              jobs={results.dataframe.rows}
+              key={results.result_id}
+              resultId={results.result_id}
+              initialJobs={results.dataframe.rows}
+              totalRows={results.total_rows ?? results.dataframe.row_count}
+              nextCursor={results.next_cursor ?? null}
+              sourceCounts={results.source_counts ?? {}}
               country={results.country}
               role={results.role}
               location={results.location}
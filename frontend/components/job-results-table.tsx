@@ -1,7 +1,9 @@
 "use client"
 
-import { useState } from "react"
-import { ExternalLink, Building2, MapPin, Briefcase, TrendingUp, AlertCircle } from "lucide-react"
+import { useEffect, useRef, useState } from "react"
+import { ExternalLink, Building2, MapPin, Briefcase, TrendingUp, AlertCircle, ArrowUpDown, Loader2 } from "lucide-react"
+import { toast } from "sonner"
+import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import {
   Table,
@@ -13,17 +15,14 @@ import {
 } from "@/components/ui/table"
 import { Badge } from "@/components/ui/badge"
 import { Tabs, TabsList, TabsTrigger, TabsContent } from "@/components/ui/tabs"
-
-interface JobData {
-  title: string
-  company: string
-  location: string
-  url: string
-  source: string
-}
+import { fetchResultPage, JobData, ResultQuery, SortColumn } from "@/lib/api"
 
 interface JobResultsTableProps {
-  jobs: JobData[]
+  resultId?: string
+  initialJobs: JobData[]
+  totalRows: number
+  nextCursor: string | null
+  sourceCounts: Record<string, number>
   country: string
   role: string
   location?: string
@@ -32,7 +31,11 @@ interface JobResultsTableProps {
 }
 
 export const JobResultsTable = ({ 
-  jobs, 
+  resultId,
+  initialJobs,
+  totalRows,
+  nextCursor,
+  sourceCounts,
   country, 
   role, 
   location, 
@@ -40,6 +43,57 @@ export const JobResultsTable = ({
   errors 
 }: JobResultsTableProps) => {
   const [activeTab, setActiveTab] = useState<string>("all")
+  const [sort, setSort] = useState<{ column: SortColumn; order: "asc" | "desc" } | null>(null)
+  // Rows of the current tab/sort view; pages are fetched from the server.
+  const [jobs, setJobs] = useState<JobData[]>(initialJobs)
+  const [viewTotal, setViewTotal] = useState(totalRows)
+  const [cursor, setCursor] = useState<string | null>(nextCursor)
+  const [isFetching, setIsFetching] = useState(false)
+  // Only the latest request may update the view; older ones are aborted so a
+  // slow response for a previous tab or sort cannot overwrite a newer page.
+  const pageRequestRef = useRef<AbortController | null>(null)
+
+  useEffect(() => () => pageRequestRef.current?.abort(), [])
+
+  const allCount = Object.values(sourceCounts).reduce((sum, count) => sum + count, 0) || totalRows
+
+  const loadPage = async (query: ResultQuery, append: boolean) => {
+    if (!resultId) return
+    pageRequestRef.current?.abort()
+    const controller = new AbortController()
+    pageRequestRef.current = controller
+    setIsFetching(true)
+    try {
+      const page = await fetchResultPage(resultId, query, controller.signal)
+      if (controller.signal.aborted) return
+      setJobs(prev => (append ? [...prev, ...page.dataframe.rows] : page.dataframe.rows))
+      setViewTotal(page.total_rows ?? page.dataframe.row_count)
+      setCursor(page.next_cursor ?? null)
+    } catch (error) {
+      if (controller.signal.aborted) return
+      const message = error instanceof Error ? error.message : "An error occurred"
+      toast.error("Could not load results", { description: message })
+    } finally {
+      if (pageRequestRef.current === controller) {
+        pageRequestRef.current = null
+        setIsFetching(false)
+      }
+    }
+  }
+
+  const handleTabChange = (tab: string) => {
+    setActiveTab(tab)
+    loadPage({ source: tab, sort: sort?.column, order: sort?.order }, false)
+  }
+
+  const handleSort = (column: SortColumn) => {
+    const next: { column: SortColumn; order: "asc" | "desc" } = {
+      column,
+      order: sort?.column === column && sort.order === "asc" ? "desc" : "asc",
+    }
+    setSort(next)
+    loadPage({ source: activeTab, sort: next.column, order: next.order }, false)
+  }
   
   const getSiteColor = (site: string) => {
     switch (site.toLowerCase()) {
@@ -54,16 +108,12 @@ export const JobResultsTable = ({
     }
   }
 
-  const getJobsBySource = (source: string) => {
-    if (source === "all") return jobs
-    return jobs.filter(job => job.source.toLowerCase() === source.toLowerCase())
-  }
-
   const getJobCount = (source: string) => {
-    return getJobsBySource(source).length
+    if (source === "all") return allCount
+    return sourceCounts[source.toLowerCase()] ?? 0
   }
 
-  if (jobs.length === 0) {
+  if (allCount === 0) {
     return (
       <Card className="w-full border-border/50 shadow-sm">
         <CardHeader>
@@ -89,22 +139,37 @@ export const JobResultsTable = ({
           <TableRow className="hover:bg-transparent">
             <TableHead className="w-[5%] font-semibold">S.N.</TableHead>
             <TableHead className="w-[30%] font-semibold">
-              <div className="flex items-center gap-2">
+              <button
+                type="button"
+                className="flex items-center gap-2"
+                onClick={() => handleSort("title")}
+              >
                 <Briefcase className="h-4 w-4" />
                 Job Title
-              </div>
+                <ArrowUpDown className="h-3 w-3 text-muted-foreground" />
+              </button>
             </TableHead>
             <TableHead className="w-[25%] font-semibold">
-              <div className="flex items-center gap-2">
+              <button
+                type="button"
+                className="flex items-center gap-2"
+                onClick={() => handleSort("company")}
+              >
                 <Building2 className="h-4 w-4" />
                 Company
-              </div>
+                <ArrowUpDown className="h-3 w-3 text-muted-foreground" />
+              </button>
             </TableHead>
             <TableHead className="w-[20%] font-semibold">
-              <div className="flex items-center gap-2">
+              <button
+                type="button"
+                className="flex items-center gap-2"
+                onClick={() => handleSort("location")}
+              >
                 <MapPin className="h-4 w-4" />
                 Location
-              </div>
+                <ArrowUpDown className="h-3 w-3 text-muted-foreground" />
+              </button>
             </TableHead>
             <TableHead className="w-[10%] text-center font-semibold">Source</TableHead>
             <TableHead className="w-[10%] text-center font-semibold">Action</TableHead>
@@ -155,6 +220,18 @@ export const JobResultsTable = ({
           )}
         </TableBody>
       </Table>
+      {cursor && (
+        <div className="flex justify-center border-t p-4">
+          <Button
+            variant="outline"
+            disabled={isFetching}
+            onClick={() => loadPage({ cursor }, true)}
+          >
+            {isFetching && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+            Load more ({jobs.length} of {viewTotal})
+          </Button>
+        </div>
+      )}
     </div>
   )
 
@@ -165,7 +242,7 @@ export const JobResultsTable = ({
         <Card className="border-border/50 shadow-sm">
           <CardHeader className="pb-3">
             <CardDescription className="text-xs font-medium">Total Jobs Found</CardDescription>
-            <CardTitle className="text-3xl font-bold">{jobs.length}</CardTitle>
+            <CardTitle className="text-3xl font-bold">{allCount}</CardTitle>
           </CardHeader>
         </Card>
         <Card className="border-border/50 shadow-sm">
@@ -208,7 +285,7 @@ export const JobResultsTable = ({
       {/* Tabbed Results */}
       <Card className="w-full border-border/50 shadow-sm">
         <CardContent className="p-0">
-          <Tabs defaultValue="all" value={activeTab} onValueChange={setActiveTab}>
+          <Tabs defaultValue="all" value={activeTab} onValueChange={handleTabChange}>
             <div className="border-b px-6 pt-6">
               <div className="flex items-center justify-between mb-4">
                 <div>
@@ -217,7 +294,7 @@ export const JobResultsTable = ({
                     {activeTab === "all" ? "All Jobs" : `${activeTab.charAt(0).toUpperCase() + activeTab.slice(1)} Jobs`}
                   </h2>
                   <p className="text-sm text-muted-foreground mt-1">
-                    Showing {getJobCount(activeTab)} job{getJobCount(activeTab) !== 1 ? "s" : ""}
+                    Showing {jobs.length} of {viewTotal} job{viewTotal !== 1 ? "s" : ""}
                   </p>
                 </div>
               </div>
@@ -226,7 +303,7 @@ export const JobResultsTable = ({
                   value="all" 
                   className="data-[state=active]:bg-transparent data-[state=active]:shadow-none border-b-2 border-transparent data-[state=active]:border-foreground rounded-none px-0 pb-3 font-semibold text-base"
                 >
-                  All ({jobs.length})
+                  All ({allCount})
                 </TabsTrigger>
                 {searchedSites.includes("linkedin") && (
                   <TabsTrigger 
@@ -261,19 +338,19 @@ export const JobResultsTable = ({
             
             {searchedSites.includes("linkedin") && (
               <TabsContent value="linkedin" className="m-0">
-                {renderJobTable(getJobsBySource("linkedin"))}
+                {renderJobTable(jobs)}
               </TabsContent>
             )}
             
             {searchedSites.includes("indeed") && (
               <TabsContent value="indeed" className="m-0">
-                {renderJobTable(getJobsBySource("indeed"))}
+                {renderJobTable(jobs)}
               </TabsContent>
             )}
             
             {searchedSites.includes("glassdoor") && (
               <TabsContent value="glassdoor" className="m-0">
-                {renderJobTable(getJobsBySource("glassdoor"))}
+                {renderJobTable(jobs)}
               </TabsContent>
             )}
           </Tabs>
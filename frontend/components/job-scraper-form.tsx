@@ -10,6 +10,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 
 interface JobScraperFormProps {
   onSearch: (params: SearchParams) => void
+  onCancel?: () => void
   isLoading: boolean
 }
 
@@ -24,7 +25,7 @@ export interface SearchParams {
 const SUPPORTED_SITES = ["linkedin", "indeed", "glassdoor"]
 const COUNTRIES = ["USA", "Canada", "UK", "Germany", "France", "India", "Australia"]
 
-export const JobScraperForm = ({ onSearch, isLoading }: JobScraperFormProps) => {
+export const JobScraperForm = ({ onSearch, onCancel, isLoading }: JobScraperFormProps) => {
   const [country, setCountry] = useState("USA")
   const [role, setRole] = useState("")
   const [location, setLocation] = useState("")
@@ -171,23 +172,36 @@ export const JobScraperForm = ({ onSearch, isLoading }: JobScraperFormProps) =>
             </p>
           </div>
 
-          <Button
-            type="submit"
-            className="h-11 w-full text-base font-medium"
-            disabled={isLoading || !role.trim() || selectedSites.length === 0}
-          >
-            {isLoading ? (
-              <>
-                <Loader2 className="mr-2 h-5 w-5 animate-spin" />
-                Searching...
-              </>
-            ) : (
-              <>
-                <Search className="mr-2 h-5 w-5" />
-                Search Jobs
-              </>
+          <div className="flex gap-3">
+            {/* Submitting while a search runs replaces it. */}
+            <Button
+              type="submit"
+              className="h-11 flex-1 text-base font-medium"
+              disabled={!role.trim() || selectedSites.length === 0}
+            >
+              {isLoading ? (
+                <>
+                  <Loader2 className="mr-2 h-5 w-5 animate-spin" />
+                  Searching...
+                </>
+              ) : (
+                <>
+                  <Search className="mr-2 h-5 w-5" />
+                  Search Jobs
+                </>
+              )}
+            </Button>
+            {isLoading && onCancel && (
+              <Button
+                type="button"
+                variant="outline"
+                className="h-11 text-base font-medium"
+                onClick={onCancel}
+              >
+                Cancel
+              </Button>
             )}
-          </Button>
+          </div>
         </form>
       </CardContent>
     </Card>
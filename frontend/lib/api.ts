@@ -0,0 +1,62 @@
+export const API_BASE_URL = "http://localhost:8000"
+
+// Rows per request; further pages are fetched from /results/{result_id}.
+export const PAGE_SIZE = 50
+
+export interface JobData {
+  title: string
+  company: string
+  location: string
+  url: string
+  source: string
+}
+
+export interface ScrapeResponse {
+  country: string
+  role: string
+  location?: string
+  sites: string[]
+  dataframe: {
+    columns: string[]
+    rows: JobData[]
+    row_count: number
+  }
+  errors?: Record<string, string>
+  result_id?: string
+  total_rows?: number
+  next_cursor?: string | null
+  source_counts?: Record<string, number>
+  // Seconds since each board's rows were fetched; non-zero when served from cache.
+  data_age?: Record<string, number>
+}
+
+export type SortColumn = "title" | "company" | "location" | "source"
+
+export interface ResultQuery {
+  cursor?: string | null
+  source?: string
+  sort?: SortColumn
+  order?: "asc" | "desc"
+}
+
+export const fetchResultPage = async (
+  resultId: string,
+  { cursor, source, sort, order }: ResultQuery,
+  signal?: AbortSignal
+): Promise<ScrapeResponse> => {
+  const params = new URLSearchParams({ page_size: PAGE_SIZE.toString() })
+  if (cursor) {
+    params.set("cursor", cursor)
+  } else {
+    if (source && source !== "all") params.append("sources", source)
+    if (sort) params.set("sort", sort)
+    if (order) params.set("order", order)
+  }
+
+  const response = await fetch(`${API_BASE_URL}/results/${resultId}?${params.toString()}`, { signal })
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => null)
+    throw new Error(errorData?.detail || `Failed to fetch results: ${response.statusText}`)
+  }
+  return response.json()
+}